@@ -0,0 +1,13 @@
+"""Performance benchmarks for rom_library_organizer.
+
+Run ``python -m benchmarks --help`` from the repository root. The package
+puts ``src`` on ``sys.path`` so benchmarks run against the working tree
+without installing it.
+"""
+
+import sys
+from pathlib import Path
+
+_SRC = str(Path(__file__).resolve().parents[1] / "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
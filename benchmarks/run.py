@@ -0,0 +1,242 @@
+"""Benchmark runner: throughput and peak memory of the core stages.
+
+Each case runs in a freshly spawned interpreter so its peak RSS is not
+inflated by earlier cases. Results are written as JSON and can be compared
+with a previous run to spot regressions between commits::
+
+    python -m benchmarks --files 100000 --output bench.json
+    python -m benchmarks --root /tmp/lib --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from . import synth
+
+Case = Callable[[str], tuple[int, float]]
+CASES: dict[str, Case] = {}
+
+
+def case(name: str) -> Callable[[Case], Case]:
+    """Register a benchmark returning ``(items processed, seconds)``."""
+
+    def register(func: Case) -> Case:
+        CASES[name] = func
+        return func
+
+    return register
+
+
+def _timed(func: Callable[[], int]) -> tuple[int, float]:
+    start = time.perf_counter()
+    count = func()
+    return count, time.perf_counter() - start
+
+
+def _scan(root: str) -> list:
+    from rom_library_organizer.scanner import scan_roms
+
+    return list(scan_roms(root))
+
+
+@case("scan_roms")
+def bench_scan_roms(root: str) -> tuple[int, float]:
+    from rom_library_organizer.scanner import scan_roms
+
+    return _timed(lambda: sum(1 for _ in scan_roms(root)))
+
+
+@case("scan_roms[workers=1]")
+def bench_scan_roms_serial(root: str) -> tuple[int, float]:
+    from rom_library_organizer.scanner import scan_roms
+
+    return _timed(lambda: sum(1 for _ in scan_roms(root, workers=1)))
+
+
+@case("scan_rglob[reference]")
+def bench_scan_rglob(root: str) -> tuple[int, float]:
+    from .bench_scan import scan_rglob
+
+    return _timed(lambda: sum(1 for _ in scan_rglob(root)))
+
+
+@case("sanitize_filename")
+def bench_sanitize(root: str) -> tuple[int, float]:
+    from rom_library_organizer.renamer import sanitize_filename
+
+    names = [rom.name for rom in _scan(root)]
+    return _timed(lambda: sum(1 for name in names if sanitize_filename(name)))
+
+
+@case("parse_name")
+def bench_parse_name(root: str) -> tuple[int, float]:
+    from rom_library_organizer.nointro import parse_names
+
+    names = [os.path.splitext(rom.name)[0] for rom in _scan(root)]
+    return _timed(lambda: len(parse_names(names)))
+
+
+@case("parse_name[uncached]")
+def bench_parse_name_uncached(root: str) -> tuple[int, float]:
+    from rom_library_organizer.nointro import parse_name
+
+    names = [os.path.splitext(rom.name)[0] for rom in _scan(root)]
+    parse = parse_name.__wrapped__
+    return _timed(lambda: sum(1 for name in names if parse(name)))
+
+
+def _rename_case(module: str, cls_name: str) -> Case:
+    def bench(root: str) -> tuple[int, float]:
+        from importlib import import_module
+
+        organizer = getattr(import_module(module), cls_name)()
+        metadata = [dict(rom.metadata(), platform="Super Nintendo", region="USA") for rom in _scan(root)]
+        rename = organizer.rename
+        return _timed(lambda: sum(1 for item in metadata if rename(item)))
+
+    return bench
+
+
+for _name, _cls in (
+    ("batocera", "BatoceraPlatformOrganizer"),
+    ("knulli", "KnulliPlatformOrganizer"),
+    ("nextui", "NextUIPlatformOrganizer"),
+    ("romm", "ROMMPlatformOrganizer"),
+):
+    CASES[f"rename[{_name}]"] = _rename_case(f"rom_library_organizer.platforms.{_name}", _cls)
+
+#: The ROMM layout as a template, to compare with the hand-written ``rename[romm]``.
+ROMM_TEMPLATE = (
+    "{platform|default:Unknown Platform}/{name|default:Unknown Game}[ ({region})]/"
+    "{name|default:Unknown Game}[ ({region})]{extension|raw|default:}"
+)
+
+
+@case("rename[template]")
+def bench_rename_template(root: str) -> tuple[int, float]:
+    from rom_library_organizer.templates import TemplatePlatformOrganizer
+
+    organizer = TemplatePlatformOrganizer(ROMM_TEMPLATE)
+    metadata = [
+        dict(rom.metadata(), platform="Super Nintendo", region="USA") for rom in _scan(root)
+    ]
+    rename = organizer.rename
+    return _timed(lambda: sum(1 for item in metadata if rename(item)))
+
+
+@case("rename_many[template]")
+def bench_rename_many_template(root: str) -> tuple[int, float]:
+    from rom_library_organizer.templates import TemplatePlatformOrganizer
+
+    organizer = TemplatePlatformOrganizer(ROMM_TEMPLATE)
+    metadata = [
+        dict(rom.metadata(), platform="Super Nintendo", region="USA") for rom in _scan(root)
+    ]
+    return _timed(lambda: len(organizer.rename_many(metadata)))
+
+
+def _run_case(name: str, root: str) -> dict[str, float]:
+    """Run ``name`` in the current (spawned) process and collect metrics."""
+
+    import resource
+
+    count, seconds = CASES[name](root)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "items": count,
+        "seconds": seconds,
+        "items_per_sec": count / seconds if seconds else float("inf"),
+        "peak_rss_mb": peak_kb / 1024,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(root: str, names: list[str], repeat: int) -> dict[str, dict[str, float]]:
+    """Run each case ``repeat`` times in a spawned process; keep the best."""
+
+    context = multiprocessing.get_context("spawn")
+    results: dict[str, dict[str, float]] = {}
+    for name in names:
+        best = None
+        for _ in range(repeat):
+            with context.Pool(1) as pool:
+                result = pool.apply(_run_case, (name, root))
+            if best is None or result["seconds"] < best["seconds"]:
+                best = result
+        results[name] = best
+    return results
+
+
+def _print_results(results: dict[str, dict[str, float]], baseline: dict | None) -> None:
+    for name, result in results.items():
+        line = (
+            f"{name:<24} {result['items']:>9} items {result['seconds']:8.3f}s "
+            f"{result['items_per_sec']:>14,.0f}/s {result['peak_rss_mb']:8.1f} MB"
+        )
+        previous = (baseline or {}).get(name)
+        if previous and previous.get("items_per_sec"):
+            line += f"  x{result['items_per_sec'] / previous['items_per_sec']:.2f} vs baseline"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark rom_library_organizer")
+    parser.add_argument("--root", help="Existing library to benchmark (default: generate one)")
+    synth.add_library_arguments(parser, files=20_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best is kept")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="Cases to run")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    args = parser.parse_args(argv)
+    if args.min_size > args.max_size:
+        parser.error("--min-size is larger than --max-size")
+
+    names = args.case or list(CASES)
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+
+    with tempfile.TemporaryDirectory(prefix="rlo-bench-") as tmp:
+        root = args.root
+        if root is None:
+            library = synth.library_arguments(args)
+            root = str(synth.generate_library(Path(tmp) / "library", **library))
+        results = run(root, names, args.repeat)
+
+    _print_results(results, baseline)
+    if args.output:
+        report = {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                "root": args.root,
+                **synth.library_arguments(args),
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Synthetic ROM library generator used by the benchmarks.
+
+Files are created sparse (``truncate`` without writing data), so libraries
+with hundreds of thousands of multi-megabyte "ROMs" cost only inodes.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from pathlib import Path
+from typing import Any, Mapping
+
+_SIZE_SUFFIXES = {"k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+
+#: Default extension mix, weighted roughly like a cartridge-heavy library.
+DEFAULT_EXTENSIONS: dict[str, float] = {
+    ".nes": 3,
+    ".sfc": 3,
+    ".smc": 1,
+    ".gba": 3,
+    ".gb": 2,
+    ".gbc": 2,
+    ".z64": 1,
+    ".n64": 0.5,
+    ".v64": 0.5,
+    ".nds": 1,
+    ".iso": 0.5,
+    ".bin": 1,
+    # Non-ROM files the scanner has to skip.
+    ".txt": 1,
+    ".png": 2,
+}
+
+_REGIONS = ("USA", "Europe", "Japan", "USA, Europe", "World")
+
+
+def _leaf_dirs(root: Path, depth: int, fanout: int) -> list[Path]:
+    dirs = [root]
+    for level in range(depth):
+        dirs = [parent / f"d{level}_{i}" for parent in dirs for i in range(fanout)]
+    return dirs
+
+
+def generate_library(
+    root: str | Path,
+    *,
+    files: int = 10_000,
+    depth: int = 2,
+    fanout: int = 8,
+    extensions: Mapping[str, float] | None = None,
+    min_size: int = 8 << 10,
+    max_size: int = 8 << 20,
+    seed: int = 0,
+) -> Path:
+    """Create a synthetic library of ``files`` sparse files under ``root``.
+
+    Parameters
+    ----------
+    root:
+        Directory to populate. It is created when missing.
+    files:
+        Total number of files, spread evenly over the leaf directories.
+    depth, fanout:
+        Shape of the tree: ``fanout ** depth`` leaf directories.
+    extensions:
+        Mapping of extension to relative weight. Defaults to
+        :data:`DEFAULT_EXTENSIONS`, which includes non-ROM noise.
+    min_size, max_size:
+        Bounds of the apparent file sizes.
+    seed:
+        Seed for the random generator so runs are reproducible.
+    """
+
+    rng = random.Random(seed)
+    mix = dict(extensions or DEFAULT_EXTENSIONS)
+    choices = rng.choices(list(mix), weights=list(mix.values()), k=files)
+    root = Path(root)
+    leaves = _leaf_dirs(root, depth, fanout)
+    for leaf in leaves:
+        leaf.mkdir(parents=True, exist_ok=True)
+    for number, ext in enumerate(choices):
+        region = _REGIONS[number % len(_REGIONS)]
+        disc = f" (Disc {number % 3 + 1})" if ext in (".iso", ".bin") else ""
+        path = leaves[number % len(leaves)] / f"Game {number:07d} ({region}){disc}{ext}"
+        with open(path, "wb") as handle:
+            handle.truncate(rng.randint(min_size, max_size))
+    return root
+
+
+def parse_extensions(text: str) -> dict[str, float]:
+    """Parse an extension mix such as ``.iso=1,.bin=2,.nes=3``.
+
+    Raises
+    ------
+    ValueError
+        If an item is not ``.ext=weight`` or a weight is negative.
+    """
+
+    mix: dict[str, float] = {}
+    for item in text.split(","):
+        ext, sep, weight = item.strip().partition("=")
+        if not sep or not ext.startswith(".") or float(weight) < 0:
+            raise ValueError(f"Invalid extension weight: {item}")
+        mix[ext.lower()] = float(weight)
+    return mix
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte count with an optional ``K``, ``M`` or ``G`` suffix, e.g. ``8M``."""
+
+    text = text.strip().lower().removesuffix("b")
+    scale = _SIZE_SUFFIXES.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def add_library_arguments(parser: Any, *, files: int = 10_000) -> None:
+    """Add the :func:`generate_library` options to an ``argparse`` parser."""
+
+    parser.add_argument("--files", type=int, default=files, help="Files to generate")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument(
+        "--extensions",
+        type=parse_extensions,
+        metavar=".EXT=WEIGHT,...",
+        help="Extension mix, e.g. .iso=1,.nes=3 (default: a cartridge-heavy mix with noise)",
+    )
+    parser.add_argument(
+        "--min-size", type=parse_size, default=8 << 10, metavar="BYTES", help="e.g. 8K"
+    )
+    parser.add_argument(
+        "--max-size", type=parse_size, default=8 << 20, metavar="BYTES", help="e.g. 700M"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def library_arguments(args: Any) -> dict[str, Any]:
+    """Return the :func:`generate_library` keywords parsed by :func:`add_library_arguments`."""
+
+    return {
+        "files": args.files,
+        "depth": args.depth,
+        "fanout": args.fanout,
+        "extensions": args.extensions,
+        "min_size": args.min_size,
+        "max_size": args.max_size,
+        "seed": args.seed,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic ROM library")
+    parser.add_argument("root")
+    add_library_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.min_size > args.max_size:
+        parser.error("--min-size is larger than --max-size")
+    generate_library(args.root, **library_arguments(args))
+    print(f"Generated {args.files} files under {os.path.abspath(args.root)}")
+
+
+if __name__ == "__main__":
+    main()
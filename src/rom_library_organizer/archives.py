@@ -0,0 +1,85 @@
+"""Archive-aware scanning without decompression.
+
+Cartridge-era sets are usually distributed as ``.zip`` files. A zip's
+central directory already records each member's name, uncompressed size and
+CRC32, so :func:`scan_archive` lists members by reading only that directory.
+The stored CRC32 lets :class:`~rom_library_organizer.dat.DatIndex` identify
+a zipped ROM without decompressing or hashing it.
+"""
+
+from __future__ import annotations
+
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .scanner import ARCHIVE_EXTENSIONS, ROM_EXTENSIONS, RomInfo
+
+
+@dataclass(slots=True)
+class ArchiveRomInfo(RomInfo):
+    """A ROM stored inside an archive.
+
+    ``path`` is the archive itself, ``name`` the member's base name and
+    ``size`` its uncompressed size.
+    """
+
+    member: str = ""
+    crc32: str = ""
+
+    def metadata(self) -> dict[str, Any]:
+        """Return ``file_metadata`` for the member rather than the archive."""
+
+        # Zero-argument super() does not work in slotted dataclasses.
+        metadata = RomInfo.metadata(self)
+        metadata["archive"] = self.path
+        metadata["member"] = self.member
+        metadata["crc32"] = self.crc32
+        return metadata
+
+
+def scan_archive(path: str | Path) -> Iterator[ArchiveRomInfo]:
+    """Yield an :class:`ArchiveRomInfo` for each ROM member of ``path``.
+
+    Only the archive's central directory is read. Members whose extension is
+    not in :data:`~rom_library_organizer.scanner.ROM_EXTENSIONS` are skipped,
+    as are unreadable or corrupt archives.
+    """
+
+    archive = Path(path)
+    try:
+        with zipfile.ZipFile(archive) as handle:
+            members = handle.infolist()
+    except (OSError, zipfile.BadZipFile):
+        return
+    for info in members:
+        if info.is_dir():
+            continue
+        name = info.filename.rsplit("/", 1)[-1]
+        ext = os.path.splitext(name)[1].lower()
+        if ext not in ROM_EXTENSIONS:
+            continue
+        yield ArchiveRomInfo(
+            path=archive,
+            extension=ext,
+            size=info.file_size,
+            name=name,
+            member=info.filename,
+            crc32=f"{info.CRC:08x}",
+        )
+
+
+def expand_archives(roms: Iterable[RomInfo]) -> Iterator[RomInfo]:
+    """Replace archives in ``roms`` with the ROM members they contain.
+
+    Intended to follow ``scan_roms(root, archives=True)``; any other record
+    is passed through unchanged.
+    """
+
+    for rom in roms:
+        if rom.extension in ARCHIVE_EXTENSIONS:
+            yield from scan_archive(rom.path)
+        else:
+            yield rom
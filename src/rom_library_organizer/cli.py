@@ -1,35 +1,281 @@
-"""Command-line interface for rom_library_organizer."""
+"""Command-line interface for rom_library_organizer.
+
+The CLI is started very often by watch and cron wrappers, so only
+:mod:`argparse` and the platform registry are imported up front. Scanning,
+moving and organizer modules are imported when a command actually needs
+them, which keeps ``--help`` and ``--list-platforms`` cheap.
+"""
 
 from __future__ import annotations
 
 import argparse
-from importlib import import_module
-from typing import Sequence, Type
+import os
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Sequence, Type
+
+from .registry import UnknownPlatformError, registry
+
+if TYPE_CHECKING:
+    from .collisions import CollisionError
+    from .filters import PathFilter
+    from .mover import Enricher, Move, MoveResult
+    from .platforms import PlatformOrganizer
+    from .scanner import RomInfo
+    from .templates import TemplatePlatformOrganizer
 
-from .platforms import PlatformOrganizer
+#: Values accepted by ``--mode``; mirrors :data:`rom_library_organizer.mover.MODES`.
+MODES = ("move", "copy", "hardlink", "reflink")
+
+#: Values accepted by ``--on-collision``; mirrors
+#: :data:`rom_library_organizer.collisions.POLICIES`.
+COLLISION_POLICIES = ("error", "skip", "suffix")
+
+#: Values accepted by ``--filter-preset``; mirrors the keys of
+#: :data:`rom_library_organizer.filters.PRESETS`.
+FILTER_PRESETS = ("system", "batocera")
 
 
 def load_platform_class(name: str) -> Type[PlatformOrganizer]:
-    """Dynamically import a platform organizer class by name."""
-    module_name = f"rom_library_organizer.platforms.{name}"
-    module = import_module(module_name)
-    for obj in module.__dict__.values():
-        if (
-            isinstance(obj, type)
-            and issubclass(obj, PlatformOrganizer)
-            and obj is not PlatformOrganizer
-        ):
-            return obj
-    raise ValueError(f"No PlatformOrganizer subclass found in {module_name}")
+    """Return the organizer class registered as ``name``, importing it lazily."""
+    return registry.load(name)
+
+
+def _add_identify_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--detect",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help=(
+            "Identify each file's system from its header bytes, reading the start of "
+            "every file (default: off)"
+        ),
+    )
+    parser.add_argument(
+        "--scrape",
+        metavar="URL",
+        help=(
+            "Fill in metadata from a JSON API; URL may contain fields such as {title} "
+            "and {platform}. Responses are cached on disk"
+        ),
+    )
+    parser.add_argument(
+        "--scrape-override",
+        action="store_true",
+        help=(
+            "With --scrape, let scraped name, title, platform, region and disc replace "
+            "the ones parsed from the file name (default: off)"
+        ),
+    )
+    parser.add_argument(
+        "--scrape-rate",
+        type=float,
+        default=1.0,
+        metavar="N",
+        help="With --scrape, maximum requests per second (default: 1)",
+    )
+    parser.add_argument(
+        "--on-collision",
+        choices=COLLISION_POLICIES,
+        default="error",
+        help=(
+            "What to do when several files map to the same destination, compared "
+            "case-insensitively: abort before placing anything, skip the extra files "
+            "or add a numeric suffix (default: error)"
+        ),
+    )
+
+
+def _size(text: str) -> int:
+    from .filters import parse_size
+
+    try:
+        return parse_size(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--exclude",
+        dest="rules",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help=(
+            "Skip paths matching a gitignore-style PATTERN, e.g. 'media/' or '**/*.bak'; "
+            "excluded directories are not scanned at all"
+        ),
+    )
+    parser.add_argument(
+        "--include",
+        dest="rules",
+        action="append",
+        type=lambda pattern: "!" + pattern,
+        metavar="PATTERN",
+        help="Scan paths matching PATTERN again after an earlier --exclude",
+    )
+    parser.add_argument(
+        "--filter-preset",
+        choices=FILTER_PRESETS,
+        help="Exclude the usual non-ROM directories of a system before any --exclude",
+    )
+    parser.add_argument(
+        "--extension",
+        dest="extensions",
+        action="append",
+        metavar="EXT",
+        help="Only scan files with this extension; may be repeated",
+    )
+    parser.add_argument(
+        "--min-size", type=_size, metavar="SIZE", help="Skip files smaller than SIZE, e.g. 64K"
+    )
+    parser.add_argument(
+        "--max-size", type=_size, metavar="SIZE", help="Skip files larger than SIZE, e.g. 4G"
+    )
+
+
+def _path_filter(parser: argparse.ArgumentParser, args: argparse.Namespace) -> PathFilter | None:
+    """Build the scan filter requested by the filter options, if any."""
+
+    sizes = (args.min_size, args.max_size)
+    if not (args.rules or args.filter_preset or args.extensions) and sizes == (None, None):
+        return None
+    from .filters import PRESETS, PathFilter
+
+    rules = [*PRESETS.get(args.filter_preset, ()), *args.rules]
+    try:
+        return PathFilter(
+            rules, extensions=args.extensions, min_size=args.min_size, max_size=args.max_size
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+
+
+def _add_template_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--template",
+        metavar="TEMPLATE",
+        help=(
+            "Also organize into a custom layout named 'template', "
+            "e.g. '{platform}/{name}[ ({region})]{extension}'"
+        ),
+    )
+
+
+def _template(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> TemplatePlatformOrganizer | None:
+    """Compile the ``--template`` layout, if any, before any work starts."""
+
+    if args.template is None:
+        return None
+    from .templates import TemplateError, TemplatePlatformOrganizer
+
+    try:
+        return TemplatePlatformOrganizer(args.template)
+    except TemplateError as exc:
+        parser.error(f"--template: {exc}")
+
+
+def _add_placement_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="move",
+        help=(
+            "How files are placed: move them, or leave the source in place and "
+            "copy, hardlink or reflink it (default: move)"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of files moved concurrently (default: 8)",
+    )
+    # Normalized files are written by a process pool the journal does not see.
+    exclusive = parser.add_mutually_exclusive_group()
+    exclusive.add_argument(
+        "--normalize",
+        action="store_true",
+        help=(
+            "Convert N64 images to big-endian .z64 and strip SNES copier headers "
+            "(to .sfc) while placing them"
+        ),
+    )
+    exclusive.add_argument(
+        "--journal",
+        metavar="FILE",
+        help=(
+            "Record every operation in FILE before performing it; running the same "
+            "command again with the same journal resumes, and 'undo FILE' reverts it"
+        ),
+    )
+
+
+def _add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print time, throughput, system calls and latencies per stage when done",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write a Chrome trace (chrome://tracing, Perfetto) of every operation to FILE",
+    )
+
+
+def _profiled(args: argparse.Namespace, run: Callable[[], None]) -> None:
+    """Call ``run`` with profiling enabled as requested by ``args``."""
+
+    if not (args.profile or args.trace):
+        run()
+        return
+
+    from . import profiling
+
+    profiler = profiling.enable(trace=bool(args.trace))
+    try:
+        run()
+    finally:
+        profiling.disable()
+        if args.profile:
+            print(profiler.summary())
+        if args.trace:
+            profiler.write_trace(args.trace)
 
 
 def main(argv: Sequence[str] | None = None) -> None:
-    """Parse command-line arguments and execute the organizer."""
+    """Parse command-line arguments and execute the organizer.
+
+    ``plan``, ``apply``, ``undo`` and ``sync`` as the first argument select
+    those subcommands; anything else is the classic
+    ``TARGET_DIRECTORY PLATFORM...`` form. A directory with one of those
+    names must be given with a path, e.g. ``./plan``.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in COMMANDS:
+        if os.path.isdir(argv[0]):
+            print(
+                f"Note: running the {argv[0]} command; "
+                f"write ./{argv[0]} to organize the directory of that name."
+            )
+        COMMANDS[argv[0]](argv[1:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Organize a ROM library for selected platforms",
+        epilog=(
+            "Subcommands: plan, apply, undo, sync (see '<command> --help'). "
+            "Write a directory with one of those names as ./plan and so on."
+        ),
     )
     parser.add_argument(
         "target_directory",
+        nargs="?",
         help="Directory containing the ROM files to organize",
     )
     parser.add_argument(
@@ -37,21 +283,556 @@ def main(argv: Sequence[str] | None = None) -> None:
         nargs="*",
         help="Names of the platforms to process",
     )
+    parser.add_argument(
+        "--output",
+        metavar="DIR",
+        help="Place the organized ROMs into DIR",
+    )
+    _add_placement_arguments(parser)
+    _add_identify_arguments(parser)
+    _add_filter_arguments(parser)
+    _add_template_argument(parser)
+    parser.add_argument(
+        "--gamelist",
+        action="store_true",
+        help="Add placed games to each system's gamelist.xml (Batocera, Knulli)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and organize new files as they appear (requires --output)",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="With --watch, how long a file must stay unchanged (default: 2)",
+    )
+    parser.add_argument(
+        "--find-duplicates",
+        action="store_true",
+        help="Report files with identical contents and exit",
+    )
+    parser.add_argument(
+        "--link-duplicates",
+        action="store_true",
+        help="Replace duplicate files with hardlinks to one copy and exit",
+    )
+    _add_profile_arguments(parser)
+    parser.add_argument(
+        "--list-platforms",
+        action="store_true",
+        help="List the available platforms and exit",
+    )
     args = parser.parse_args(argv)
+    _profiled(args, lambda: _run(parser, args))
 
-    print(f"Target directory: {args.target_directory}")
-    organizers: list[PlatformOrganizer] = []
-    for name in args.platforms:
+
+def _load_organizers(
+    names: Iterable[str], template: PlatformOrganizer | None = None
+) -> dict[str, PlatformOrganizer]:
+    """Instantiate the organizers registered as ``names``, reporting failures.
+
+    A ``template`` organizer from ``--template`` is added as ``"template"``.
+    """
+
+    organizers: dict[str, PlatformOrganizer] = {}
+    for name in names:
         try:
             cls = load_platform_class(name)
-            organizers.append(cls())
+            organizers[name] = cls()
             print(f"Loaded platform organizer: {name}")
-        except ModuleNotFoundError:
+        except UnknownPlatformError:
             print(f"Unknown platform: {name}")
         except ValueError as exc:
             print(str(exc))
+    if template is not None:
+        organizers["template"] = template
+        print("Loaded platform organizer: template")
+    return organizers
+
+
+def _enricher(args: argparse.Namespace, stack: ExitStack) -> Enricher | None:
+    """Return the metadata hook requested by ``--scrape``, if any."""
+
+    if not args.scrape:
+        return None
+    from .scraper import DiskCache, JSONProvider, Scraper, default_cache_path
+
+    cache = stack.enter_context(DiskCache(default_cache_path()))
+    provider = JSONProvider(args.scrape, rate=args.scrape_rate)
+    scraper = Scraper([provider], cache=cache, override=args.scrape_override)
+    return stack.enter_context(scraper).enrich
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Execute the command described by the parsed ``args``."""
+
+    if args.list_platforms:
+        for name in registry.names():
+            print(name)
+        return
+    if args.target_directory is None:
+        parser.error("the following arguments are required: target_directory")
+    path_filter = _path_filter(parser, args)
+    template = _template(parser, args)
+    if args.find_duplicates or args.link_duplicates:
+        report_duplicates(
+            args.target_directory, link=args.link_duplicates, path_filter=path_filter
+        )
+        return
+
+    print(f"Target directory: {args.target_directory}")
+    organizers = _load_organizers(args.platforms, template)
     if not organizers:
         print("No platforms selected.")
+        return
+    if args.watch and not args.output:
+        print("--watch requires --output.")
+        return
+    if args.output and len(organizers) > 1 and args.mode == "move":
+        print("Multiple platforms need --mode copy, hardlink or reflink.")
+        return
+    with ExitStack() as stack:
+        enrich = _enricher(args, stack)
+        if args.output:
+            from .scanner import scan_roms
+
+            organize(
+                _identify(
+                    scan_roms(args.target_directory, path_filter=path_filter), args.detect
+                ),
+                organizers,
+                args.output,
+                mode=args.mode,
+                workers=args.workers,
+                on_collision=args.on_collision,
+                journal=args.journal,
+                normalize=args.normalize,
+                gamelist=args.gamelist,
+                enrich=enrich,
+            )
+        if args.watch:
+            from .scanner import scan_paths
+            from .watch import Watcher
+
+            watcher = Watcher(
+                args.target_directory,
+                settle=args.settle,
+                exclude=[args.output],
+                path_filter=path_filter,
+            )
+            print(f"Watching {args.target_directory} ({watcher.backend}); press Ctrl+C to stop.")
+            try:
+                with watcher:
+                    while True:
+                        paths = watcher.poll()
+                        organize(
+                            _identify(
+                                scan_paths(
+                                    paths,
+                                    path_filter=path_filter,
+                                    root=args.target_directory,
+                                ),
+                                args.detect,
+                            ),
+                            organizers,
+                            args.output,
+                            mode=args.mode,
+                            workers=args.workers,
+                            on_collision=args.on_collision,
+                            journal=args.journal,
+                            normalize=args.normalize,
+                            gamelist=args.gamelist,
+                            enrich=enrich,
+                        )
+            except KeyboardInterrupt:
+                print("Stopped watching.")
+
+
+def plan_command(argv: Sequence[str]) -> None:
+    """``plan``: scan a library and save the planned layout as JSON Lines."""
+    parser = argparse.ArgumentParser(
+        prog="rom-library-organizer plan",
+        description="Scan a library and write what the organizers would do to a plan file",
+    )
+    parser.add_argument("target_directory", help="Directory containing the ROM files")
+    parser.add_argument("platforms", nargs="*", help="Names of the platforms to plan for")
+    parser.add_argument("--output", required=True, metavar="FILE", help="Plan file to write")
+    _add_identify_arguments(parser)
+    _add_filter_arguments(parser)
+    _add_template_argument(parser)
+    _add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    path_filter = _path_filter(parser, args)
+    template = _template(parser, args)
+
+    def run() -> None:
+        organizers = _load_organizers(args.platforms, template)
+        if not organizers:
+            print("No platforms selected.")
+            return
+
+        from .collisions import CollisionError
+        from .plan import write_plan
+        from .scanner import scan_roms
+
+        with ExitStack() as stack:
+            roms = _identify(
+                scan_roms(args.target_directory, ordered=True, path_filter=path_filter),
+                args.detect,
+            )
+            try:
+                count = write_plan(
+                    args.output,
+                    roms,
+                    organizers,
+                    args.target_directory,
+                    enrich=_enricher(args, stack),
+                    on_collision=args.on_collision,
+                )
+            except CollisionError as exc:
+                _print_collisions(exc)
+                return
+        print(f"Planned {count} files into {args.output}.")
+
+    _profiled(args, run)
+
+
+def apply_command(argv: Sequence[str]) -> None:
+    """``apply``: carry out a plan written by ``plan``."""
+    parser = argparse.ArgumentParser(
+        prog="rom-library-organizer apply",
+        description="Place files as described by a plan file",
+    )
+    parser.add_argument("plan", help="Plan file written by the plan command")
+    parser.add_argument(
+        "--output", required=True, metavar="DIR", help="Place the organized ROMs into DIR"
+    )
+    parser.add_argument(
+        "--source-root",
+        metavar="DIR",
+        help="Where the planned library is mounted on this machine (default: as planned)",
+    )
+    parser.add_argument(
+        "--start",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Skip the first N entries of the plan, e.g. to continue a partial run",
+    )
+    _add_placement_arguments(parser)
+    _add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    def run() -> None:
+        from .plan import PlanReader
+
+        try:
+            reader = PlanReader(args.plan)
+        except (OSError, ValueError) as exc:
+            print(f"Cannot read plan: {exc}")
+            return
+        if len(reader.platforms) > 1 and args.mode == "move":
+            print("Multiple platforms need --mode copy, hardlink or reflink.")
+            return
+        moves = reader.moves(args.output, start=args.start, source_root=args.source_root)
+        _place(
+            moves,
+            mode=args.mode,
+            workers=args.workers,
+            journal=args.journal,
+            normalize=args.normalize,
+        )
+
+    _profiled(args, run)
+
+
+def undo_command(argv: Sequence[str]) -> None:
+    """``undo``: revert the operations recorded in a journal."""
+    parser = argparse.ArgumentParser(
+        prog="rom-library-organizer undo",
+        description="Revert every operation recorded in a journal, newest first",
+    )
+    parser.add_argument("journal", help="Journal written with --journal")
+    args = parser.parse_args(argv)
+
+    from .journal import Journal, undo
+
+    reverted = failed = 0
+    with Journal(args.journal) as journal:
+        for result in undo(journal):
+            if result.ok:
+                reverted += 1
+            else:
+                failed += 1
+                print(f"Failed to revert {result.move.source}: {result.error}")
+    print(f"Reverted {reverted} files ({failed} failed).")
+
+
+def sync_command(argv: Sequence[str]) -> None:
+    """``sync``: copy what changed in a platform layout to device mounts."""
+    parser = argparse.ArgumentParser(
+        prog="rom-library-organizer sync",
+        description=(
+            "Bring devices in line with a platform layout, copying only new or changed "
+            "files and deleting files the layout no longer has"
+        ),
+    )
+    parser.add_argument("target_directory", help="Directory containing the ROM files")
+    parser.add_argument("platform", help="Name of the platform whose layout the devices use")
+    parser.add_argument(
+        "--device",
+        dest="devices",
+        action="append",
+        required=True,
+        metavar="DIR",
+        help="Mount point of a device to sync; may be repeated",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of files copied concurrently across all devices (default: 8)",
+    )
+    parser.add_argument(
+        "--per-device",
+        type=int,
+        default=2,
+        metavar="N",
+        help="Number of files copied concurrently to each device (default: 2)",
+    )
+    parser.add_argument(
+        "--hash",
+        action="store_true",
+        help="Record SHA1 digests and skip touched files whose contents did not change",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would be copied and deleted without changing any device",
+    )
+    _add_identify_arguments(parser)
+    _add_filter_arguments(parser)
+    _add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    path_filter = _path_filter(parser, args)
+
+    def run() -> None:
+        organizers = _load_organizers([args.platform])
+        if not organizers:
+            return
+
+        from .collisions import CollisionError
+        from .scanner import scan_roms
+        from .sync import plan_layout, sync_devices
+
+        with ExitStack() as stack:
+            roms = _identify(
+                scan_roms(args.target_directory, path_filter=path_filter), args.detect
+            )
+            try:
+                layout = plan_layout(
+                    roms,
+                    organizers[args.platform],
+                    on_collision=args.on_collision,
+                    enrich=_enricher(args, stack),
+                )
+            except CollisionError as exc:
+                _print_collisions(exc)
+                return
+        reports = sync_devices(
+            layout,
+            args.devices,
+            workers=args.workers,
+            per_device=args.per_device,
+            hashes=args.hash,
+            dry_run=args.dry_run,
+        )
+        verb = "Would copy" if args.dry_run else "Copied"
+        for report in reports:
+            for name, error in report.errors:
+                print(f"Failed to sync {report.device / name}: {error}")
+            for name in report.unmanaged:
+                print(f"Not replacing {report.device / name}: not placed by sync")
+            print(
+                f"{report.device}: {verb} {report.copied} files ({report.bytes_copied} bytes), "
+                f"deleted {report.deleted}, {report.unchanged} unchanged, "
+                f"{len(report.errors)} failed."
+            )
+
+    _profiled(args, run)
+
+
+#: Subcommands selected by the first command-line argument.
+COMMANDS: dict[str, Callable[[Sequence[str]], None]] = {
+    "plan": plan_command,
+    "apply": apply_command,
+    "undo": undo_command,
+    "sync": sync_command,
+}
+
+
+def _identify(roms: Iterable[RomInfo], detect: bool) -> Iterable[RomInfo]:
+    """Apply the optional identification stages to ``roms``."""
+
+    if not detect:
+        return roms
+    from .detect import detect_platforms
+
+    return detect_platforms(roms)
+
+
+def report_duplicates(
+    directory: str, *, link: bool = False, path_filter: PathFilter | None = None
+) -> None:
+    """Print the duplicate sets below ``directory`` and optionally link them."""
+
+    from .dedupe import find_duplicates, hardlink_duplicates
+    from .scanner import scan_roms
+
+    report = find_duplicates(scan_roms(directory, path_filter=path_filter))
+    for dup in report.sets:
+        print(f"{dup.sha1}  {dup.size} bytes")
+        for rom in dup.files:
+            print(f"  {rom.path}")
+    print(
+        f"Found {len(report.sets)} duplicate sets, {report.wasted} bytes reclaimable "
+        f"(read {report.bytes_read} of {report.bytes_scanned} bytes)."
+    )
+    if link:
+        failed: list[MoveResult] = []
+        reclaimed = hardlink_duplicates(report.sets, failed=failed)
+        for result in failed:
+            print(f"Failed to link {result.move.destination}: {result.error}")
+        print(f"Reclaimed {reclaimed} bytes ({len(failed)} failed).")
+
+
+def organize(
+    roms: Iterable[RomInfo],
+    organizers: dict[str, PlatformOrganizer],
+    destination: str,
+    *,
+    mode: str = "move",
+    workers: int = 8,
+    on_collision: str = "error",
+    enrich: Enricher | None = None,
+    journal: str | None = None,
+    normalize: bool = False,
+    gamelist: bool = False,
+) -> None:
+    """Place supported ``roms`` into ``destination``.
+
+    A single organizer writes directly into ``destination``; with several,
+    each layout is placed in a subdirectory named after its platform. The
+    whole plan is checked for destination collisions before anything is
+    placed. ``enrich`` is passed on to the planner, e.g. to add scraped
+    metadata. With ``journal``, every operation is recorded in that file
+    first, see :mod:`rom_library_organizer.journal`, and with ``normalize``
+    N64 and SNES images are converted while placed. With ``gamelist``,
+    placed games are merged into the frontends' ``gamelist.xml`` files.
+    """
+
+    from .collisions import CollisionError, resolve_collisions
+    from .mover import plan_fanout, plan_moves
+
+    if len(organizers) == 1:
+        organizer = next(iter(organizers.values()))
+        planned = plan_moves(roms, organizer, destination, enrich=enrich)
+    else:
+        planned = plan_fanout(roms, organizers, destination, enrich=enrich)
+    if normalize:
+        from .normalize import plan_normalized
+
+        # Check collisions under the names the files will actually get.
+        planned = plan_normalized(planned)
+    already: list[Move] = []
+    done: set[Move] = set()
+    if journal is not None and os.path.exists(journal):
+        from .journal import Journal, applied_moves, finish_interrupted
+
+        # Resuming: what the interrupted run placed is not in the way, and
+        # moves it left half done are completed first.
+        with Journal(journal) as log:
+            finish_interrupted(log)
+        done = applied_moves(journal)
+    try:
+        moves = resolve_collisions(planned, policy=on_collision, placed=already, done=done)
+    except CollisionError as exc:
+        _print_collisions(exc)
+        return
+    if already:
+        print(f"Skipped {len(already)} files already placed by an earlier run.")
+    placed = _place(
+        moves,
+        mode=mode,
+        workers=workers,
+        journal=journal,
+        normalize=normalize,
+        collect=gamelist,
+    )
+    if gamelist:
+        from .gamelist import update_gamelists
+
+        updated = 0
+        for name, organizer in organizers.items():
+            root = Path(destination) if len(organizers) == 1 else Path(destination, name)
+            mine = [path for path in placed if path.is_relative_to(root)]
+            updated += len(update_gamelists(root, organizer, mine))
+        print(f"Updated {updated} gamelists.")
+
+
+def _print_collisions(exc: CollisionError) -> None:
+    for collision in exc.collisions:
+        print(f"Collision: {collision}")
+    print(f"{len(exc.collisions)} destination collisions; nothing was placed.")
+
+
+def _place(
+    moves: Iterable[Move],
+    *,
+    mode: str,
+    workers: int,
+    journal: str | None = None,
+    normalize: bool = False,
+    collect: bool = False,
+) -> list[Path]:
+    """Apply ``moves``, journaled if ``journal`` is given, and print a summary.
+
+    With ``normalize`` files are converted by
+    :func:`~rom_library_organizer.normalize.normalize_moves`. With
+    ``collect`` the destinations placed are returned.
+    """
+
+    from .mover import apply_moves
+
+    destinations: list[Path] = []
+    placed = failed = 0
+    with ExitStack() as stack:
+        if normalize:
+            from .normalize import normalize_moves
+
+            results = normalize_moves(moves, mode=mode, workers=workers)
+        elif journal is None:
+            results = apply_moves(moves, mode=mode, workers=workers)
+        else:
+            from .journal import Journal, apply_journaled
+
+            log = stack.enter_context(Journal(journal))
+            results = apply_journaled(moves, log, mode=mode, workers=workers)
+        for result in results:
+            if result.ok:
+                placed += 1
+                if collect:
+                    destinations.append(result.move.destination)
+            else:
+                failed += 1
+                print(f"Failed to place {result.move.source}: {result.error}")
+    if journal is not None and log.skipped:
+        print(f"Skipped {log.skipped} files already placed according to the journal.")
+    print(f"Placed {placed} files ({failed} failed).")
+    return destinations
 
 
 if __name__ == "__main__":
@@ -0,0 +1,258 @@
+"""Detect and resolve destination collisions before any file is touched.
+
+Two sources can be planned onto the same destination: regions that sanitize
+to the same name, or names that differ only in case or Unicode composition.
+The FAT and exFAT cards used by handheld frontends compare names
+case-insensitively, so ``Game.gba`` and ``game.gba`` are the same file there.
+
+:class:`CollisionIndex` keys every destination by its NFC-normalized,
+case-folded path and groups a whole plan in a single pass. Files already
+present in the destination directories are included, each directory being
+listed once; one that is the very file a move would place there, left by an
+earlier run, is not a collision, so organizing again is harmless.
+:func:`resolve_collisions` then applies a deterministic policy,
+so a collision is reported at planning time rather than hours into
+:func:`~rom_library_organizer.mover.apply_moves`.
+"""
+
+from __future__ import annotations
+
+import filecmp
+import os
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Collection, Iterable
+
+from .mover import Move
+
+#: Supported values for the ``policy`` argument of :func:`resolve_collisions`.
+POLICIES = ("error", "skip", "suffix")
+
+
+def collision_key(path: str | Path, *, case_insensitive: bool = True) -> str:
+    """Return the key under which ``path`` is compared with other paths."""
+
+    key = unicodedata.normalize("NFC", str(path))
+    return key.casefold() if case_insensitive else key
+
+
+def already_placed(move: Move, existing: str | Path) -> bool:
+    """Whether ``existing`` is ``move``'s source as placed by an earlier run.
+
+    That is the case for the same inode, as a hardlink or a rename leaves
+    it, or for a copy with the same contents. Size and modification time,
+    which :func:`~rom_library_organizer.mover.copy_file` preserves, only
+    select the files worth comparing byte for byte: TorrentZip and
+    cartridge dumps share timestamps and power-of-two sizes, so a different
+    dump can match both.
+    """
+
+    try:
+        source = os.stat(move.source)
+        target = os.stat(existing)
+    except OSError:
+        return False
+    if (source.st_dev, source.st_ino) == (target.st_dev, target.st_ino):
+        return True
+    if (source.st_size, source.st_mtime_ns) != (target.st_size, target.st_mtime_ns):
+        return False
+    try:
+        return filecmp.cmp(move.source, existing, shallow=False)
+    except OSError:
+        return False
+
+
+@dataclass
+class Collision:
+    """Moves whose destinations are the same file, in source order.
+
+    ``existing`` is the file already at the destination, if any.
+    """
+
+    moves: list[Move]
+    existing: Path | None = None
+
+    def __str__(self) -> str:
+        sources = ", ".join(str(move.source) for move in self.moves)
+        target = self.existing or self.moves[0].destination
+        return f"{target} <- {sources}"
+
+
+class CollisionError(ValueError):
+    """Raised by the ``"error"`` policy; ``collisions`` lists every one found."""
+
+    def __init__(self, collisions: list[Collision]) -> None:
+        super().__init__(f"{len(collisions)} destination collisions")
+        self.collisions = collisions
+
+
+class CollisionIndex:
+    """Group planned moves by destination key.
+
+    Parameters
+    ----------
+    case_insensitive:
+        Fold case when comparing destinations, as FAT and exFAT do.
+    check_existing:
+        Treat files already present at a destination as colliding, unless
+        :func:`already_placed` holds for them. Each destination directory is
+        listed once, on first use.
+    done:
+        Moves known to have been applied, e.g. recorded in a journal; the
+        file at their destination is theirs.
+    """
+
+    def __init__(
+        self,
+        *,
+        case_insensitive: bool = True,
+        check_existing: bool = True,
+        done: Collection[Move] = (),
+    ) -> None:
+        self.case_insensitive = case_insensitive
+        self.check_existing = check_existing
+        self.done = done
+        self._moves: dict[str, list[Move]] = {}
+        self._existing: dict[str, Path] = {}
+        self._listed: set[str] = set()
+        #: Moves whose destination already holds their file, filled in by
+        #: :meth:`collisions`.
+        self.placed: set[Move] = set()
+
+    def key(self, path: str | Path) -> str:
+        return collision_key(path, case_insensitive=self.case_insensitive)
+
+    def _list(self, directory: Path) -> None:
+        # Listed by exact name: on a case-sensitive filesystem ``Tetris`` and
+        # ``tetris`` are two directories whose files all need checking.
+        name = str(directory)
+        if name in self._listed:
+            return
+        self._listed.add(name)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    self._existing.setdefault(self.key(entry.path), Path(entry.path))
+        except OSError:
+            pass
+
+    def add(self, move: Move) -> None:
+        """Record ``move``. Repeating an identical move is not a collision."""
+
+        if self.check_existing:
+            self._list(move.destination.parent)
+        group = self._moves.setdefault(self.key(move.destination), [])
+        if move not in group:
+            group.append(move)
+
+    def existing(self, path: str | Path) -> Path | None:
+        """Return the file already present under ``path``'s key, if listed."""
+
+        return self._existing.get(self.key(path))
+
+    def taken(self, path: str | Path) -> bool:
+        """Return ``True`` if ``path`` is planned or already exists."""
+
+        key = self.key(path)
+        return key in self._moves or key in self._existing
+
+    def collisions(self) -> list[Collision]:
+        """Return every collision, ordered by destination."""
+
+        found = []
+        for key, moves in self._moves.items():
+            existing = self._existing.get(key)
+            if existing is not None:
+                done = [
+                    move
+                    for move in moves
+                    if move in self.done or already_placed(move, existing)
+                ]
+                if done:
+                    self.placed.update(done)
+                    moves = [move for move in moves if move not in done]
+                    if not moves:
+                        continue
+            if len(moves) > 1 or existing is not None:
+                found.append(Collision(sorted(moves, key=lambda m: str(m.source)), existing))
+        found.sort(key=lambda collision: str(collision.moves[0].destination))
+        return found
+
+
+def _suffixed(destination: Path, number: int) -> Path:
+    return destination.with_name(f"{destination.stem} ({number}){destination.suffix}")
+
+
+def resolve_collisions(
+    moves: Iterable[Move],
+    *,
+    policy: str = "error",
+    case_insensitive: bool = True,
+    check_existing: bool = True,
+    placed: list[Move] | None = None,
+    done: Collection[Move] = (),
+) -> list[Move]:
+    """Return the moves of a whole plan with collisions resolved.
+
+    Within a collision the move with the smallest source path keeps the
+    destination, unless a file already exists there. The other moves are,
+    depending on ``policy``:
+
+    ``"error"``
+        rejected by raising :class:`CollisionError` listing every collision;
+    ``"skip"``
+        dropped;
+    ``"suffix"``
+        renamed to ``Name (2).ext``, ``Name (3).ext`` and so on, choosing
+        numbers that collide with nothing else in the plan.
+
+    Identical duplicate moves are dropped, and so are moves whose file an
+    earlier run already placed at the destination (see
+    :func:`already_placed`) or that are in ``done``, e.g. because a journal
+    records them; those are appended to ``placed`` when given.
+    The order of ``moves`` is kept.
+    """
+
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown collision policy: {policy}")
+    index = CollisionIndex(
+        case_insensitive=case_insensitive, check_existing=check_existing, done=done
+    )
+    planned: list[Move] = []
+    for move in moves:
+        index.add(move)
+        planned.append(move)
+    collisions = index.collisions()
+    if policy == "error" and collisions:
+        raise CollisionError(collisions)
+    done = set(index.placed)
+    replaced: dict[Move, Move | None] = {}
+    for collision in collisions:
+        losers = collision.moves if collision.existing is not None else collision.moves[1:]
+        for move in losers:
+            if policy == "skip":
+                replaced[move] = None
+                continue
+            number = 2
+            while index.taken(_suffixed(move.destination, number)):
+                # An earlier run with this policy may have placed it already.
+                existing = index.existing(_suffixed(move.destination, number))
+                if existing is not None and already_placed(move, existing):
+                    done.add(move)
+                    break
+                number += 1
+            else:
+                renamed = Move(move.source, _suffixed(move.destination, number))
+                index.add(renamed)
+                replaced[move] = renamed
+    replaced.update(dict.fromkeys(done))
+    if placed is not None:
+        placed.extend(move for move in dict.fromkeys(planned) if move in done)
+
+    resolved = []
+    for move in dict.fromkeys(planned):
+        move = replaced.get(move, move)
+        if move is not None:
+            resolved.append(move)
+    return resolved
@@ -0,0 +1,190 @@
+"""No-Intro/Redump DAT parsing and hash based ROM identification.
+
+DAT files are streamed with :func:`xml.etree.ElementTree.iterparse` and each
+``<game>`` element is discarded once its ``<rom>`` entries have been read, so
+memory stays bounded regardless of the DAT size. :class:`DatIndex` keeps a
+compact in-memory index keyed by ``(size, CRC32)`` and by SHA1 for O(1)
+lookups, plus a set of known sizes used to skip hashing files that cannot
+match any entry.
+"""
+
+from __future__ import annotations
+
+import sys
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .archives import ArchiveRomInfo
+from .hashing import HashCache, RomHashes, hash_roms
+from .nointro import parse_name
+from .scanner import RomInfo
+
+
+@dataclass(frozen=True)
+class DatEntry:
+    """A single ``<rom>`` record from a DAT file."""
+
+    game: str
+    rom_name: str
+    platform: str
+    size: int
+    crc32: str
+    sha1: str
+
+    def metadata(self) -> dict[str, Any]:
+        """Return ``file_metadata`` for :meth:`PlatformOrganizer.rename`.
+
+        Title, region, disc and the other tags come from the game name via
+        :func:`~rom_library_organizer.nointro.parse_name`.
+        """
+
+        metadata = parse_name(self.game).metadata()
+        metadata["platform"] = self.platform
+        metadata["extension"] = Path(self.rom_name).suffix.lower()
+        return metadata
+
+
+def _platform_from_header(name: str) -> str:
+    """Return the system name from a DAT header such as ``Sony - PlayStation``."""
+
+    return name.split(" - ", 1)[-1].strip() if name else "Unknown Platform"
+
+
+def _stored_hashes(rom: RomInfo) -> RomHashes | None:
+    """Return the CRC32 an archive stores for ``rom``, if it is a member."""
+
+    if isinstance(rom, ArchiveRomInfo):
+        return RomHashes(crc32=rom.crc32, md5="", sha1="")
+    return None
+
+
+def parse_dat(path: str | Path) -> Iterator[DatEntry]:
+    """Yield every ``<rom>`` entry of the DAT file at ``path``.
+
+    Both ``<game>`` and MAME style ``<machine>`` elements are accepted.
+    Entries without a size and CRC32 are skipped.
+    """
+
+    platform = "Unknown Platform"
+    context = ET.iterparse(str(path), events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end":
+            continue
+        if elem.tag == "header":
+            platform = sys.intern(_platform_from_header(elem.findtext("name", "")))
+            root.clear()
+        elif elem.tag in ("game", "machine"):
+            game = elem.get("name", "")
+            for rom in elem.iter("rom"):
+                size = rom.get("size")
+                crc = rom.get("crc")
+                if not size or not crc:
+                    continue
+                yield DatEntry(
+                    game=game,
+                    rom_name=rom.get("name", game),
+                    platform=platform,
+                    size=int(size),
+                    crc32=crc.lower(),
+                    sha1=(rom.get("sha1") or "").lower(),
+                )
+            root.clear()
+
+
+class DatIndex:
+    """In-memory index of DAT entries for O(1) identification.
+
+    Keys are stored in their compact binary form: CRC32 as an integer and
+    SHA1 as 20 raw bytes. Entries are only held by the hash maps, so an entry
+    that wins no key is not kept at all.
+    """
+
+    def __init__(self, entries: Iterable[DatEntry] = ()) -> None:
+        self._count = 0
+        self._by_size_crc: dict[tuple[int, int], DatEntry] = {}
+        self._by_sha1: dict[bytes, DatEntry] = {}
+        self._sizes: set[int] = set()
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def from_files(cls, *paths: str | Path) -> DatIndex:
+        """Build an index from one or more DAT files."""
+
+        index = cls()
+        for path in paths:
+            index.load(path)
+        return index
+
+    def load(self, path: str | Path) -> None:
+        """Add every entry of the DAT file at ``path``."""
+
+        for entry in parse_dat(path):
+            self.add(entry)
+
+    def add(self, entry: DatEntry) -> None:
+        """Add ``entry`` to the index. The first entry for a key wins."""
+
+        self._count += 1
+        self._by_size_crc.setdefault((entry.size, int(entry.crc32, 16)), entry)
+        if entry.sha1:
+            self._by_sha1.setdefault(bytes.fromhex(entry.sha1), entry)
+        self._sizes.add(entry.size)
+
+    def __len__(self) -> int:
+        """Return the number of entries added, duplicates included."""
+
+        return self._count
+
+    def has_size(self, size: int) -> bool:
+        """Return ``True`` if any entry has exactly ``size`` bytes.
+
+        Files failing this check cannot match and need not be hashed.
+        """
+
+        return size in self._sizes
+
+    def lookup(
+        self, size: int, crc32: str | None = None, sha1: str | None = None
+    ) -> DatEntry | None:
+        """Return the entry matching ``sha1`` or ``(size, crc32)``."""
+
+        entry = None
+        if sha1:
+            entry = self._by_sha1.get(bytes.fromhex(sha1))
+        if entry is None and crc32:
+            entry = self._by_size_crc.get((size, int(crc32, 16)))
+        return entry
+
+    def match(self, rom: RomInfo, hashes: RomHashes) -> DatEntry | None:
+        """Return the entry for ``rom`` given its content ``hashes``."""
+
+        return self.lookup(rom.size, crc32=hashes.crc32, sha1=hashes.sha1)
+
+    def identify(
+        self,
+        roms: Iterable[RomInfo],
+        *,
+        cache: HashCache | None = None,
+        processes: int | None = None,
+    ) -> Iterator[tuple[RomInfo, DatEntry | None]]:
+        """Hash and identify ``roms`` against the index.
+
+        Files whose size matches no entry are dropped without being read.
+        Everything else goes through a single
+        :func:`~rom_library_organizer.hashing.hash_roms` stream, so its
+        process pool is created once and stays busy. Archive members
+        (:class:`~rom_library_organizer.archives.ArchiveRomInfo`) pass
+        through it with the CRC32 stored in the archive instead of being
+        hashed, and come out as soon as they go in. Each candidate is
+        yielded with its matching entry, or ``None`` when it is unknown.
+        """
+
+        candidates = (rom for rom in roms if rom.size in self._sizes)
+        for rom, hashes in hash_roms(
+            candidates, cache=cache, processes=processes, stored=_stored_hashes
+        ):
+            yield rom, self.match(rom, hashes)
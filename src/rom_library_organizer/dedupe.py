@@ -0,0 +1,229 @@
+"""Find duplicate ROM files and optionally replace extras with hardlinks.
+
+Hashing every byte of a large library is too slow, so candidates are
+narrowed in stages and each stage only looks at what is still colliding:
+
+1. Files are grouped by size; a file with a unique size has no duplicate.
+2. Files already hardlinked to each other are hashed only once.
+3. The first and last :data:`SAMPLE_SIZE` bytes are hashed. Files no larger
+   than two samples are read in full here, so the sample is their digest.
+4. Only files whose samples still collide are hashed in full, through
+   :func:`~rom_library_organizer.hashing.hash_roms` and its optional cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import secrets
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from .hashing import HashCache, hash_roms
+from .mover import Move, MoveResult
+from .scanner import RomInfo
+
+#: Bytes read from each end of a file during the partial hashing stage.
+SAMPLE_SIZE = 64 << 10
+
+
+@dataclass
+class DuplicateSet:
+    """Files with identical contents. The first file is the one to keep.
+
+    ``files`` includes paths that are already hardlinked to each other;
+    ``copies`` counts the distinct inodes among them.
+    """
+
+    size: int
+    sha1: str
+    files: list[RomInfo]
+    copies: int
+
+    @property
+    def wasted(self) -> int:
+        """Bytes that hardlinking the extras would reclaim."""
+
+        return self.size * (self.copies - 1)
+
+
+@dataclass
+class DedupeReport:
+    """Duplicate sets plus how much data had to be read to find them."""
+
+    sets: list[DuplicateSet] = field(default_factory=list)
+    files_scanned: int = 0
+    bytes_scanned: int = 0
+    bytes_read: int = 0
+
+    @property
+    def wasted(self) -> int:
+        return sum(dup.wasted for dup in self.sets)
+
+
+def _sample(path: Path, size: int, sample_size: int) -> tuple[str, bool]:
+    """Return the SHA1 of ``path``'s ends and whether it covered the file."""
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        if size <= 2 * sample_size:
+            digest.update(handle.read())
+            return digest.hexdigest(), True
+        digest.update(handle.read(sample_size))
+        handle.seek(size - sample_size)
+        digest.update(handle.read(sample_size))
+    return digest.hexdigest(), False
+
+
+def _unique_inodes(group: list[RomInfo]) -> dict[tuple[int, int], list[RomInfo]]:
+    """Group the files of ``group`` that are hardlinks of each other."""
+
+    links: dict[tuple[int, int], list[RomInfo]] = {}
+    for rom in group:
+        try:
+            stat = os.stat(rom.path)
+        except OSError:
+            continue
+        links.setdefault((stat.st_dev, stat.st_ino), []).append(rom)
+    return links
+
+
+def find_duplicates(
+    roms: Iterable[RomInfo],
+    *,
+    sample_size: int = SAMPLE_SIZE,
+    cache: HashCache | None = None,
+    processes: int | None = None,
+) -> DedupeReport:
+    """Return the sets of files in ``roms`` that have identical contents.
+
+    ``cache`` and ``processes`` are passed to
+    :func:`~rom_library_organizer.hashing.hash_roms` for the final stage.
+    Within a set files are ordered by path.
+    """
+
+    report = DedupeReport()
+    by_size: dict[int, list[RomInfo]] = defaultdict(list)
+    for rom in roms:
+        report.files_scanned += 1
+        report.bytes_scanned += rom.size
+        if rom.size:
+            by_size[rom.size].append(rom)
+
+    # Every stage below works on one representative path per inode.
+    aliases: dict[Path, list[RomInfo]] = {}
+
+    def duplicate_set(size: int, sha1: str, matches: list[RomInfo]) -> DuplicateSet:
+        files = [alias for rom in matches for alias in aliases[rom.path]]
+        return DuplicateSet(size, sha1, sorted(files, key=_path_key), len(matches))
+
+    full_candidates: dict[tuple[int, str], list[RomInfo]] = defaultdict(list)
+    for size, group in by_size.items():
+        if len(group) < 2:
+            continue
+        links = _unique_inodes(group)
+        if len(links) < 2:
+            continue
+        group = []
+        for linked in links.values():
+            aliases[linked[0].path] = linked
+            group.append(linked[0])
+        by_sample: dict[str, list[RomInfo]] = defaultdict(list)
+        complete = False
+        for rom in group:
+            try:
+                key, complete = _sample(rom.path, size, sample_size)
+            except OSError:
+                continue
+            report.bytes_read += min(size, 2 * sample_size)
+            by_sample[key].append(rom)
+        for key, matches in by_sample.items():
+            if len(matches) < 2:
+                continue
+            if complete:
+                report.sets.append(duplicate_set(size, key, matches))
+            else:
+                full_candidates[(size, key)].extend(matches)
+
+    by_digest: dict[tuple[int, str], list[RomInfo]] = defaultdict(list)
+    pending = [rom for matches in full_candidates.values() for rom in matches]
+    for rom, hashes in hash_roms(pending, cache=cache, processes=processes):
+        report.bytes_read += rom.size
+        by_digest[(rom.size, hashes.sha1)].append(rom)
+    for (size, sha1), matches in by_digest.items():
+        if len(matches) > 1:
+            report.sets.append(duplicate_set(size, sha1, matches))
+
+    report.sets.sort(key=lambda dup: _path_key(dup.files[0]))
+    return report
+
+
+def _path_key(rom: RomInfo) -> str:
+    return str(rom.path)
+
+
+def _link_over(keeper: Path, path: Path) -> None:
+    """Replace ``path`` with a hardlink to ``keeper`` without it disappearing."""
+
+    while True:
+        # A unique name, so a link left by an interrupted run is never in the way.
+        partial = path.with_name(f".{path.name}.{secrets.token_hex(4)}.dedupe")
+        try:
+            os.link(keeper, partial)
+            break
+        except FileExistsError:
+            continue
+    try:
+        os.replace(partial, path)
+    except OSError:
+        partial.unlink(missing_ok=True)
+        raise
+
+
+def hardlink_duplicates(
+    sets: Iterable[DuplicateSet],
+    *,
+    dry_run: bool = False,
+    failed: list[MoveResult] | None = None,
+) -> int:
+    """Replace every extra file in ``sets`` with a hardlink to the first.
+
+    Each replacement links the kept file under a unique temporary name next
+    to the extra and renames it over the extra, so the path never
+    disappears. Files on a different device than the kept file are left
+    alone. Errors, e.g. a file that vanished since the scan, only skip the
+    files concerned; each is appended to ``failed`` when given, as a
+    :class:`~rom_library_organizer.mover.MoveResult` from the kept file to
+    the extra. Returns the number of bytes reclaimed (or that would be, with
+    ``dry_run``).
+    """
+
+    reclaimed = 0
+    for dup in sets:
+        keeper = dup.files[0].path
+        try:
+            keeper_stat = os.stat(keeper)
+        except OSError as exc:
+            if failed is not None:
+                failed.extend(
+                    MoveResult(Move(keeper, rom.path), "hardlink", exc) for rom in dup.files[1:]
+                )
+            continue
+        relinked: set[int] = set()
+        for rom in dup.files[1:]:
+            try:
+                stat = os.stat(rom.path)
+                if stat.st_dev != keeper_stat.st_dev or stat.st_ino == keeper_stat.st_ino:
+                    continue
+                if not dry_run:
+                    _link_over(keeper, rom.path)
+            except OSError as exc:
+                if failed is not None:
+                    failed.append(MoveResult(Move(keeper, rom.path), "hardlink", exc))
+                continue
+            if stat.st_ino not in relinked:
+                relinked.add(stat.st_ino)
+                reclaimed += dup.size
+    return reclaimed
@@ -0,0 +1,194 @@
+"""Identify a ROM's system from magic bytes at fixed header offsets.
+
+Extensions such as ``.bin`` and ``.iso`` are shared by many systems. Most
+formats, however, carry a recognisable marker at a fixed position: the
+iNES header, the Sega header at ``0x100``, the Nintendo logo in Game Boy
+and DS headers, the N64 byte-order marker or the ISO9660 primary volume
+descriptor at ``0x8000``.
+
+:class:`SignatureTable` compiles a list of :class:`Signature` rules into a
+handful of coalesced read windows, so classifying a file costs a few
+:func:`os.pread` calls of at most a few hundred bytes each and never reads
+the file in full. :func:`detect_platforms` classifies a stream of scanned
+ROMs in directory order to keep the reads close together on disk.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from . import profiling
+from .archives import ArchiveRomInfo
+from .scanner import RomInfo
+
+# Compressed Nintendo logo present in Game Boy Advance and DS headers.
+_GBA_LOGO = b"\x24\xff\xae\x51\x69\x9a\xa2\x21"
+# Start of the Nintendo logo in Game Boy and Game Boy Color headers.
+_GB_LOGO = b"\xce\xed\x66\x66\xcc\x0d\x00\x0b"
+# Offset of the primary volume descriptor in raw 2352-byte Mode 2 images:
+# sector 16 plus the 16-byte sync/header and 8-byte subheader.
+_RAW_PVD = 16 * 2352 + 24
+
+
+@dataclass(frozen=True)
+class Signature:
+    """All ``checks`` (``(offset, magic)`` pairs) must match for ``platform``."""
+
+    platform: str
+    checks: tuple[tuple[int, bytes], ...]
+
+
+def _sig(platform: str, *checks: tuple[int, bytes]) -> Signature:
+    return Signature(platform, checks)
+
+
+#: Built-in rules. The first matching signature wins, so more specific rules
+#: come before the general ones they overlap with; Sega disc images also carry
+#: a Mega Drive style header at ``0x100`` and are therefore listed first.
+SIGNATURES: tuple[Signature, ...] = (
+    _sig("Nintendo Entertainment System", (0, b"NES\x1a")),
+    _sig("Nintendo 64", (0, b"\x80\x37\x12\x40")),
+    _sig("Nintendo 64", (0, b"\x37\x80\x40\x12")),
+    _sig("Nintendo 64", (0, b"\x40\x12\x37\x80")),
+    _sig("Game Boy Advance", (0x04, _GBA_LOGO), (0xB2, b"\x96")),
+    _sig("Nintendo DS", (0xC0, _GBA_LOGO)),
+    _sig("Game Boy Color", (0x104, _GB_LOGO), (0x143, b"\xc0")),
+    _sig("Game Boy Color", (0x104, _GB_LOGO), (0x143, b"\x80")),
+    _sig("Game Boy", (0x104, _GB_LOGO)),
+    _sig("Sega Saturn", (0x00, b"SEGA SEGASATURN ")),
+    _sig("Sega Saturn", (0x10, b"SEGA SEGASATURN ")),
+    _sig("Sega CD", (0x00, b"SEGADISCSYSTEM")),
+    _sig("Sega CD", (0x10, b"SEGADISCSYSTEM")),
+    _sig("Sega Dreamcast", (0x00, b"SEGA SEGAKATANA")),
+    _sig("Sega Dreamcast", (0x10, b"SEGA SEGAKATANA")),
+    _sig("Sega 32X", (0x100, b"SEGA 32X")),
+    _sig("Sega Genesis", (0x100, b"SEGA")),
+    _sig("Sega Genesis", (0x101, b"SEGA")),
+    _sig("Nintendo GameCube", (0x1C, b"\xc2\x33\x9f\x3d")),
+    _sig("Nintendo Wii", (0x18, b"\x5d\x1c\x9e\xa3")),
+    _sig("Sony PlayStation Portable", (0x8000, b"\x01CD001"), (0x8008, b"PSP GAME")),
+    _sig("Sony PlayStation", (0x8000, b"\x01CD001"), (0x8008, b"PLAYSTATION")),
+    _sig("Sony PlayStation", (_RAW_PVD, b"\x01CD001"), (_RAW_PVD + 8, b"PLAYSTATION")),
+)
+
+
+class SignatureTable:
+    """Signatures compiled into coalesced read windows.
+
+    Checks closer together than ``gap`` bytes share one read, so the
+    built-in table needs three :func:`os.pread` calls for a large image and
+    a single one for a small cartridge.
+    """
+
+    def __init__(self, signatures: Sequence[Signature] = SIGNATURES, *, gap: int = 512) -> None:
+        spans = sorted(
+            {(offset, offset + len(magic)) for sig in signatures for offset, magic in sig.checks}
+        )
+        windows: list[list[int]] = []
+        for start, end in spans:
+            if windows and start - windows[-1][1] <= gap:
+                windows[-1][1] = max(windows[-1][1], end)
+            else:
+                windows.append([start, end])
+        self.windows: tuple[tuple[int, int], ...] = tuple((s, e - s) for s, e in windows)
+
+        starts = [start for start, _ in self.windows]
+
+        def locate(offset: int) -> tuple[int, int]:
+            index = max(i for i, start in enumerate(starts) if start <= offset)
+            return index, offset - starts[index]
+
+        # Each rule becomes (platform, ((window, start, end, magic), ...)).
+        self._rules: tuple[tuple[str, tuple[tuple[int, int, int, bytes], ...]], ...] = tuple(
+            (
+                sig.platform,
+                tuple(
+                    (window, rel, rel + len(magic), magic)
+                    for offset, magic in sig.checks
+                    for window, rel in (locate(offset),)
+                ),
+            )
+            for sig in signatures
+        )
+
+    def classify_fd(self, fd: int, size: int) -> str | None:
+        """Return the platform of the open file ``fd`` of ``size`` bytes."""
+
+        blocks: list[bytes] = []
+        for start, length in self.windows:
+            blocks.append(os.pread(fd, length, start) if start < size else b"")
+        for platform, checks in self._rules:
+            for window, begin, end, magic in checks:
+                if blocks[window][begin:end] != magic:
+                    break
+            else:
+                return platform
+        return None
+
+    def classify(self, path: str | Path) -> str | None:
+        """Return the platform of the file at ``path``, or ``None``."""
+
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return self.classify_fd(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+
+
+_DEFAULT_TABLE = SignatureTable()
+
+
+def detect_platform(path: str | Path) -> str | None:
+    """Return the platform of ``path`` using the built-in signatures."""
+
+    return _DEFAULT_TABLE.classify(path)
+
+
+def detect_platforms(
+    roms: Iterable[RomInfo],
+    *,
+    table: SignatureTable | None = None,
+    batch_size: int = 4096,
+) -> Iterator[RomInfo]:
+    """Set :attr:`RomInfo.platform` from file headers and yield each ROM.
+
+    ``roms`` is consumed in batches of ``batch_size`` and each batch is
+    classified in directory order so reads stay close together on disk.
+    ROMs whose platform is already known, archive members and unreadable
+    files are passed through unchanged.
+    """
+
+    table = table or _DEFAULT_TABLE
+    roms = iter(roms)
+    while True:
+        batch = list(islice(roms, batch_size))
+        if not batch:
+            return
+        batch.sort(key=lambda rom: str(rom.path))
+        for rom in batch:
+            if rom.platform or isinstance(rom, ArchiveRomInfo):
+                yield rom
+                continue
+            profiler = profiling.active
+            start = time.perf_counter() if profiler is not None else 0.0
+            try:
+                fd = os.open(rom.path, os.O_RDONLY)
+            except OSError:
+                yield rom
+                continue
+            try:
+                rom.platform = table.classify_fd(fd, rom.size) or None
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+            if profiler is not None:
+                reads = sum(1 for offset, _ in table.windows if offset < rom.size)
+                syscalls = {"open": 1, "pread": reads}
+                profiler.record("detect", start, time.perf_counter(), items=1, syscalls=syscalls)
+            yield rom
@@ -0,0 +1,237 @@
+"""Gitignore-style include and exclude rules for scanning.
+
+Rules follow ``.gitignore`` syntax, matched against paths relative to the
+scan root with ``/`` separators:
+
+* ``*`` and ``?`` match within one path component, ``[...]`` a character
+  class and ``**`` any number of directories (``**/cache``, ``saves/**``,
+  ``a/**/b``);
+* a pattern containing a ``/`` other than a trailing one is anchored at the
+  root, otherwise it matches a name at any depth;
+* a trailing ``/`` matches directories only;
+* a leading ``!`` re-includes what an earlier rule excluded, and the last
+  matching rule wins;
+* a backslash escapes the next character, e.g. ``\\#snapshot/``.
+
+:class:`PathFilter` compiles all rules into two regular expressions, one
+for directories and one for files, once. The scanner consults it for every
+directory before descending into it, so an excluded subtree is never
+listed. As with git, files below an excluded directory cannot be
+re-included. Extension and size bounds are checked in the same pass.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, Sequence
+
+#: Rules for files that are never ROMs on common NAS and desktop systems.
+SYSTEM_RULES = (
+    ".git/",
+    ".svn/",
+    "@eaDir/",
+    "\\#snapshot/",
+    ".snapshot/",
+    ".snapshots/",
+    "\\#recycle/",
+    "$RECYCLE.BIN/",
+    "System Volume Information/",
+    ".Trash-*/",
+    ".thumbnails/",
+    "._*",
+)
+
+#: Named rule sets for ``--filter-preset``.
+PRESETS: dict[str, tuple[str, ...]] = {
+    "system": SYSTEM_RULES,
+    # Scraped artwork, manuals and saves that Batocera keeps next to the ROMs.
+    "batocera": SYSTEM_RULES
+    + (
+        "images/",
+        "videos/",
+        "manuals/",
+        "media/",
+        "downloaded_images/",
+        "downloaded_videos/",
+        "saves/",
+        "/bios/",
+        "/screenshots/",
+    ),
+}
+
+_SIZE_SUFFIXES = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte count such as ``"4096"``, ``"512K"``, ``"4M"`` or ``"1.5G"``.
+
+    Raises
+    ------
+    ValueError
+        If ``text`` is not a non-negative size.
+    """
+
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*", text, re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * _SIZE_SUFFIXES[match.group(2).upper()])
+
+
+def _translate(pattern: str) -> str:
+    """Return a regular expression for the path part of one rule."""
+
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/") if pattern.startswith("/") else pattern
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        elif pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+            if i + 2 == n:
+                out.append(".*")
+                i += 2
+            elif pattern[i + 2] == "/":
+                out.append("(?:.*/)?")
+                i += 3
+            else:
+                out.append("[^/]*")
+                i += 2
+        elif char == "*":
+            out.append("[^/]*")
+            i += 1
+        elif char == "?":
+            out.append("[^/]")
+            i += 1
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(char))
+                i += 1
+                continue
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        else:
+            out.append(re.escape(char))
+            i += 1
+    regex = "".join(out)
+    return regex if anchored else "(?:.*/)?" + regex
+
+
+class PathFilter:
+    """Decide which directories and files a scan visits.
+
+    Parameters
+    ----------
+    rules:
+        Gitignore-style patterns in order; ``!pattern`` re-includes.
+    extensions:
+        If given, only files with one of these extensions (with the dot,
+        any case) are kept.
+    min_size, max_size:
+        Inclusive bounds on the file size in bytes.
+
+    Raises
+    ------
+    ValueError
+        If a rule is empty or the size bounds are reversed.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[str] = (),
+        *,
+        extensions: Iterable[str] | None = None,
+        min_size: int | None = None,
+        max_size: int | None = None,
+    ) -> None:
+        self.rules = [rule for rule in rules if rule.strip() and not rule.startswith("#")]
+        self.extensions = (
+            None if extensions is None else {self._extension(ext) for ext in extensions}
+        )
+        if min_size is not None and max_size is not None and min_size > max_size:
+            raise ValueError(f"Minimum size {min_size} exceeds maximum size {max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+
+        dir_rules: list[tuple[str, bool]] = []
+        file_rules: list[tuple[str, bool]] = []
+        for rule in self.rules:
+            negated = rule.startswith("!")
+            pattern = rule[1:] if negated else rule
+            if not pattern.endswith("\\ "):
+                pattern = pattern.rstrip()
+            directory_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                raise ValueError(f"Empty filter rule: {rule!r}")
+            regex = _translate(pattern)
+            dir_rules.append((regex, negated))
+            if not directory_only:
+                file_rules.append((regex, negated))
+        self._dirs, self._dir_negated = self._compile(dir_rules)
+        self._files, self._file_negated = self._compile(file_rules)
+
+    @staticmethod
+    def _extension(ext: str) -> str:
+        ext = ext.lower()
+        return ext if ext.startswith(".") else "." + ext
+
+    @staticmethod
+    def _compile(rules: Sequence[tuple[str, bool]]) -> tuple[re.Pattern[str] | None, list[bool]]:
+        """Combine ``rules`` into one pattern whose matching group is the last rule.
+
+        Alternatives are tried in order, so listing the rules newest first
+        makes the first successful alternative the last matching rule.
+        """
+
+        if not rules:
+            return None, []
+        ordered = list(reversed(rules))
+        combined = "|".join(f"({regex})" for regex, _ in ordered)
+        return re.compile(combined, re.DOTALL), [negated for _, negated in ordered]
+
+    @staticmethod
+    def _excluded(pattern: re.Pattern[str] | None, negated: list[bool], path: str) -> bool:
+        if pattern is None:
+            return False
+        match = pattern.fullmatch(path)
+        return match is not None and not negated[match.lastindex - 1]
+
+    def admits_dir(self, path: str) -> bool:
+        """Whether the scan should descend into the directory ``path``."""
+
+        return not self._excluded(self._dirs, self._dir_negated, path)
+
+    def admits_file(self, path: str) -> bool:
+        """Whether the rules and extensions keep the file ``path``."""
+
+        if self.extensions is not None:
+            dot = path.rfind(".")
+            if dot <= path.rfind("/") or path[dot:].lower() not in self.extensions:
+                return False
+        return not self._excluded(self._files, self._file_negated, path)
+
+    def admits_size(self, size: int) -> bool:
+        """Whether ``size`` is within the configured bounds."""
+
+        if self.min_size is not None and size < self.min_size:
+            return False
+        return self.max_size is None or size <= self.max_size
+
+    def admits(self, path: str, size: int) -> bool:
+        """Check a file ``path`` with all its parent directories, and ``size``.
+
+        For files found without walking the tree, e.g. by the watcher.
+        """
+
+        parts = path.split("/")
+        for depth in range(1, len(parts)):
+            if not self.admits_dir("/".join(parts[:depth])):
+                return False
+        return self.admits_file(path) and self.admits_size(size)
@@ -0,0 +1,341 @@
+"""Keep EmulationStation ``gamelist.xml`` files in sync with placed ROMs.
+
+Batocera and Knulli list the games of each system folder in a
+``gamelist.xml`` next to them, with paths relative to that folder::
+
+    <gameList>
+        <game>
+            <path>./Zelda (USA).sfc</path>
+            <name>Zelda</name>
+        </game>
+    </gameList>
+
+These files often carry scraped descriptions and artwork references and grow
+to tens of megabytes, so they are merged rather than regenerated.
+:func:`merge_gamelist` streams the existing document with
+:func:`xml.etree.ElementTree.iterparse`, holding one top-level element at a
+time. It drops removed games, rewrites the path of moved ones, fills in
+missing fields of added games that are already listed, appends the rest and
+leaves every other element as it was. Everything before the root element
+(the XML declaration, comments, a doctype) and the root start tag with its
+attributes are copied verbatim, comments and processing instructions inside
+the root are kept in place and the declared encoding is used for the
+output. Only content after the closing root tag is lost. The result is
+written to a temporary file that replaces the original only when complete.
+
+When games are only added and none of them is listed yet, the file is not
+parsed at all: the existing paths are checked with one regular expression
+over a memory map, the document is copied in the kernel (a reflink where the
+filesystem supports it) and the new entries are written in place of the
+closing tag.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Mapping
+from xml.sax.saxutils import escape
+
+from .mover import copy_file
+from .nointro import parse_name
+from .platforms import PlatformOrganizer
+
+GAMELIST_NAME = "gamelist.xml"
+
+_HEADER = '<?xml version="1.0"?>\n'
+_CLOSING = b"</gameList>"
+
+_BOM = rb"(?:\xef\xbb\xbf)?"
+#: The declared encoding of a document.
+_ENCODING = re.compile(_BOM + rb"<\?xml[^>]*?encoding\s*=\s*[\"']([A-Za-z0-9._-]+)")
+#: Everything up to and including the root start tag; ``empty`` is set for ``<root/>``.
+_PROLOG = re.compile(
+    _BOM
+    + rb"\s*(?:(?:<\?.*?\?>|<!--.*?-->|<!DOCTYPE(?:[^\[>]|\[.*?\])*>)\s*)*"
+    + rb"<(?P<tag>[^\s/>?!]+)(?:\s+[^\s=/>]+\s*=\s*(?:\"[^\"]*\"|'[^']*'))*\s*(?P<empty>/?)>",
+    re.DOTALL,
+)
+
+
+@dataclass
+class Game:
+    """One ``<game>`` entry; ``path`` is relative to the gamelist's folder."""
+
+    path: str
+    #: Child elements other than ``<path>``, e.g. ``{"name": "Zelda"}``.
+    fields: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_metadata(cls, path: str, metadata: Mapping[str, Any] | None = None) -> Game:
+        """Build an entry for ``path`` from ``file_metadata`` style fields.
+
+        Without metadata the title is parsed from the file name.
+        """
+
+        if metadata is None:
+            metadata = parse_name(os.path.splitext(os.path.basename(path))[0]).metadata()
+        fields = {"name": str(metadata.get("name") or os.path.basename(path))}
+        if metadata.get("region"):
+            fields["region"] = str(metadata["region"])
+        if metadata.get("languages"):
+            fields["lang"] = ",".join(metadata["languages"]).lower()
+        return cls(normalize_path(path), fields)
+
+    def element(self) -> ET.Element:
+        game = ET.Element("game")
+        ET.SubElement(game, "path").text = self.path
+        for tag, text in self.fields.items():
+            ET.SubElement(game, tag).text = text
+        return game
+
+
+@dataclass
+class GamelistStats:
+    """What :func:`merge_gamelist` changed."""
+
+    added: int = 0
+    updated: int = 0
+    moved: int = 0
+    removed: int = 0
+    #: Whether the append-only fast path was used.
+    appended: bool = False
+
+
+def normalize_path(path: str) -> str:
+    """Return ``path`` in the ``./relative/name`` form used by gamelists."""
+
+    path = path.replace(os.sep, "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return "./" + path
+
+
+def read_games(path: str | Path) -> Iterator[Game]:
+    """Yield the games of the gamelist at ``path`` one at a time."""
+
+    for element in _top_level(path):
+        if element.tag == "game":
+            yield _game(element)
+
+
+def _top_level(path: str | Path) -> Iterator[ET.Element]:
+    """Yield each child of the root element, discarding it afterwards.
+
+    Comments and processing instructions directly inside the root are
+    yielded too, as :func:`~xml.etree.ElementTree.Comment` and
+    :func:`~xml.etree.ElementTree.ProcessingInstruction` elements.
+    """
+
+    depth = 0
+    root = None
+    events = ("start", "end", "comment", "pi")
+    for event, element in ET.iterparse(str(path), events=events):
+        if event in ("comment", "pi"):
+            # These are not inserted into the tree, so there is nothing to clear.
+            if depth == 1:
+                yield element
+            continue
+        if event == "start":
+            depth += 1
+            if root is None:
+                root = element
+            continue
+        depth -= 1
+        if depth == 1:
+            yield element
+            # Drop finished children so memory stays bounded by one entry.
+            root.clear()
+
+
+def _game(element: ET.Element) -> Game:
+    fields = {child.tag: child.text or "" for child in element if child.tag != "path"}
+    return Game(normalize_path(element.findtext("path") or ""), fields)
+
+
+def _encoding(data: bytes | mmap.mmap) -> str:
+    """Return the encoding declared at the start of ``data``, or UTF-8."""
+
+    declared = _ENCODING.match(data)
+    return declared.group(1).decode("ascii") if declared else "utf-8"
+
+
+def _prolog(path: Path) -> tuple[str, str, str]:
+    """Return the text of ``path`` up to its first child, its closing tag and encoding.
+
+    The text ends with the root start tag, copied verbatim apart from a
+    self-closing ``<gameList/>`` becoming ``<gameList>``. Documents whose
+    start cannot be recognised get a plain UTF-8 header.
+    """
+
+    with open(path, "rb") as handle:
+        data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    with data:
+        match = _PROLOG.match(data)
+        if match is None:
+            return _HEADER + "<gameList>\n", "</gameList>\n", "utf-8"
+        encoding = _encoding(data)
+        head = match.group(0)
+        tag = match.group("tag").decode(encoding)
+        if match.group("empty"):
+            head = head[:-2] + b">"
+    return head.decode(encoding).lstrip("\ufeff") + "\n", f"</{tag}>\n", encoding
+
+
+def _write_element(handle: IO[str], element: ET.Element) -> None:
+    element.tail = None
+    handle.write("\t" + ET.tostring(element, encoding="unicode") + "\n")
+
+
+def _try_append(path: Path, added: Mapping[str, Game], stats: GamelistStats) -> bool:
+    """Append ``added`` without parsing ``path``; ``False`` if a full merge is needed."""
+
+    names = [escape(game.path[2:]) for game in added.values()]
+    if any(name != game.path[2:] for name, game in zip(names, added.values())):
+        # Entities could be spelled differently in the existing file.
+        return False
+    alternatives = b"|".join(re.escape(name.encode()) for name in names)
+    listed = re.compile(rb"<path>\s*(?:\./)?(?:" + alternatives + rb")\s*</path>")
+    with open(path, "rb") as handle:
+        data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    with data:
+        closing = data.rfind(_CLOSING)
+        if closing == -1 or data[closing + len(_CLOSING) :].strip() or listed.search(data):
+            return False
+        encoding = _encoding(data)
+
+    partial = path.with_name(f".{path.name}.part")
+    try:
+        copy_file(path, partial, reflink=True, replace=True)
+        with open(partial, "r+b") as handle:
+            handle.seek(closing)
+            for game in added.values():
+                element = ET.tostring(game.element(), encoding=encoding, xml_declaration=False)
+                handle.write(b"\t" + element + b"\n")
+            handle.write(_CLOSING + b"\n")
+            handle.truncate()
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    stats.added = len(added)
+    stats.appended = True
+    return True
+
+
+def merge_gamelist(
+    path: str | Path,
+    *,
+    added: Iterable[Game] = (),
+    moved: Mapping[str, str] | None = None,
+    removed: Iterable[str] = (),
+) -> GamelistStats:
+    """Apply changes to the gamelist at ``path``, creating it if missing.
+
+    Parameters
+    ----------
+    path:
+        The ``gamelist.xml`` to update.
+    added:
+        Games placed in the folder. A game whose path is already listed
+        keeps its entry, and only fields the entry lacks are added.
+    moved:
+        Old path to new path for games renamed within the folder.
+    removed:
+        Paths of games no longer present.
+
+    Paths may be given with or without the leading ``./``. The declaration,
+    root attributes and comments of the existing file are kept; see the
+    module documentation.
+
+    Raises
+    ------
+    xml.etree.ElementTree.ParseError
+        If the existing file is not well-formed; it is left unchanged.
+    """
+
+    path = Path(path)
+    stats = GamelistStats()
+    pending = {}
+    for game in added:
+        game = replace(game, path=normalize_path(game.path))
+        pending[game.path] = game
+    renames = {normalize_path(old): normalize_path(new) for old, new in (moved or {}).items()}
+    dropped = {normalize_path(name) for name in removed}
+    if not (pending or renames or dropped):
+        return stats
+    exists = path.exists() and path.stat().st_size > 0
+    if exists and pending and not renames and not dropped and _try_append(path, pending, stats):
+        return stats
+
+    if exists:
+        head, tail, encoding = _prolog(path)
+    else:
+        head, tail, encoding = _HEADER + "<gameList>\n", "</gameList>\n", "utf-8"
+    partial = path.with_name(f".{path.name}.part")
+    try:
+        with open(partial, "w", encoding=encoding, errors="xmlcharrefreplace") as handle:
+            handle.write(head)
+            for element in _top_level(path) if exists else ():
+                if element.tag == "game":
+                    entry = normalize_path(element.findtext("path") or "")
+                    if entry in dropped:
+                        stats.removed += 1
+                        continue
+                    if entry in renames:
+                        entry = renames[entry]
+                        element.find("path").text = entry  # type: ignore[union-attr]
+                        stats.moved += 1
+                    game = pending.pop(entry, None)
+                    if game is not None:
+                        present = {child.tag for child in element}
+                        missing = [tag for tag in game.fields if tag not in present]
+                        for tag in missing:
+                            ET.SubElement(element, tag).text = game.fields[tag]
+                        stats.updated += bool(missing)
+                _write_element(handle, element)
+            for game in pending.values():
+                _write_element(handle, game.element())
+                stats.added += 1
+            handle.write(tail)
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return stats
+
+
+def update_gamelists(
+    destination_root: str | Path,
+    organizer: PlatformOrganizer,
+    placed: Iterable[str | Path],
+    *,
+    metadata: Mapping[str, Mapping[str, Any]] | None = None,
+) -> dict[Path, GamelistStats]:
+    """Add files placed below ``destination_root`` to their folders' gamelists.
+
+    The folder holding each file's gamelist comes from
+    :meth:`PlatformOrganizer.gamelist_dir`; files it returns ``None`` for,
+    such as BIOS images, are ignored. ``metadata`` optionally maps a placed
+    path to its ``file_metadata``. Returns the changes per gamelist.
+    """
+
+    root = Path(destination_root)
+    grouped: dict[str, list[Game]] = defaultdict(list)
+    for destination in placed:
+        relative = Path(os.path.relpath(destination, root)).as_posix()
+        folder = organizer.gamelist_dir(relative)
+        if folder is None:
+            continue
+        inside = relative[len(folder) :].lstrip("/")
+        fields = metadata.get(str(destination)) if metadata is not None else None
+        grouped[folder].append(Game.from_metadata(inside, fields))
+    return {
+        root / folder / GAMELIST_NAME: merge_gamelist(root / folder / GAMELIST_NAME, added=games)
+        for folder, games in grouped.items()
+    }
@@ -0,0 +1,225 @@
+"""Content hashing for scanned ROM files.
+
+:func:`hash_file` computes CRC32, MD5 and SHA1 in a single streaming pass
+over a file using one reusable buffer. :func:`hash_roms` is an optional stage
+that can be chained after :func:`~rom_library_organizer.scanner.scan_roms`;
+it hashes small files inline, spreads large disc images across a process
+pool and consults a :class:`HashCache` so unchanged files are never read
+twice.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .scanner import RomInfo
+
+#: Size of the read buffer used while hashing.
+CHUNK_SIZE = 1 << 20
+
+#: Extensions of disc images that are always hashed in the process pool.
+LARGE_FILE_EXTENSIONS: set[str] = {".iso", ".bin"}
+
+#: Files at least this large are hashed in the process pool.
+LARGE_FILE_THRESHOLD = 64 << 20
+
+
+@dataclass(frozen=True)
+class RomHashes:
+    """Hex digests of a file's contents."""
+
+    crc32: str
+    md5: str
+    sha1: str
+
+
+def hash_file(path: str | Path, chunk_size: int = CHUNK_SIZE) -> RomHashes:
+    """Return the CRC32, MD5 and SHA1 digests of ``path``.
+
+    The file is read once in ``chunk_size`` blocks into a single reused
+    buffer; every digest is updated from the same block.
+    """
+
+    crc = 0
+    md5 = hashlib.md5()
+    sha1 = hashlib.sha1()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as handle:
+        while True:
+            read = handle.readinto(buffer)
+            if not read:
+                break
+            chunk = view[:read]
+            crc = zlib.crc32(chunk, crc)
+            md5.update(chunk)
+            sha1.update(chunk)
+    return RomHashes(crc32=f"{crc:08x}", md5=md5.hexdigest(), sha1=sha1.hexdigest())
+
+
+class HashCache:
+    """SQLite cache of file hashes keyed by device, inode, size and mtime.
+
+    An entry is only returned while the file's size and modification time
+    still match the values recorded when it was hashed.
+    """
+
+    def __init__(self, db_path: str | Path, *, commit_every: int = 500) -> None:
+        self.db_path = Path(db_path)
+        self._commit_every = commit_every
+        self._pending = 0
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " device INTEGER NOT NULL, inode INTEGER NOT NULL,"
+            " size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " crc32 TEXT NOT NULL, md5 TEXT NOT NULL, sha1 TEXT NOT NULL,"
+            " PRIMARY KEY (device, inode))"
+        )
+
+    def get(self, stat: os.stat_result) -> RomHashes | None:
+        """Return cached hashes for the file described by ``stat``."""
+
+        row = self._conn.execute(
+            "SELECT crc32, md5, sha1 FROM hashes"
+            " WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ?",
+            (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        return RomHashes(*row) if row else None
+
+    def put(self, stat: os.stat_result, hashes: RomHashes) -> None:
+        """Record ``hashes`` for the file described by ``stat``."""
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                stat.st_dev,
+                stat.st_ino,
+                stat.st_size,
+                stat.st_mtime_ns,
+                hashes.crc32,
+                hashes.md5,
+                hashes.sha1,
+            ),
+        )
+        self._pending += 1
+        if self._pending >= self._commit_every:
+            self.commit()
+
+    def commit(self) -> None:
+        """Flush pending cache writes to disk."""
+
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        """Commit outstanding entries and close the database."""
+
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self) -> HashCache:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _is_large(rom: RomInfo, threshold: int) -> bool:
+    return rom.extension in LARGE_FILE_EXTENSIONS or rom.size >= threshold
+
+
+def hash_roms(
+    roms: Iterable[RomInfo],
+    *,
+    cache: HashCache | None = None,
+    processes: int | None = None,
+    threshold: int = LARGE_FILE_THRESHOLD,
+    stored: Callable[[RomInfo], RomHashes | None] | None = None,
+) -> Iterator[tuple[RomInfo, RomHashes]]:
+    """Yield ``(rom, hashes)`` pairs for ``roms``.
+
+    Parameters
+    ----------
+    roms:
+        ROM records, typically produced by ``scan_roms``.
+    cache:
+        Optional :class:`HashCache`. Cached files are not read and newly
+        computed hashes are stored.
+    processes:
+        Size of the process pool used for large files. ``None`` uses the CPU
+        count and ``0`` hashes everything in the calling process.
+    threshold:
+        Files at least this many bytes, and any file with an extension in
+        :data:`LARGE_FILE_EXTENSIONS`, are sent to the process pool.
+    stored:
+        Optional callable returning hashes already known for a record, such
+        as the CRC32 an archive stores for its members. Records it answers
+        are yielded at once without being read or even stat'ed.
+
+    Yields
+    ------
+    tuple
+        Each ROM with its hashes. Small and cached files are yielded as soon
+        as they are processed, so the output order may differ from the input
+        order. Files that disappear before they are hashed are skipped.
+    """
+
+    limit = (processes or os.cpu_count() or 1) * 2
+    pool: ProcessPoolExecutor | None = None
+    in_flight: dict[Future[RomHashes], tuple[RomInfo, os.stat_result]] = {}
+
+    def finish(futures: Iterable[Future[RomHashes]]) -> Iterator[tuple[RomInfo, RomHashes]]:
+        for future in futures:
+            rom, stat = in_flight.pop(future)
+            try:
+                hashes = future.result()
+            except OSError:
+                continue
+            if cache is not None:
+                cache.put(stat, hashes)
+            yield rom, hashes
+
+    try:
+        for rom in roms:
+            known = stored(rom) if stored is not None else None
+            if known is not None:
+                yield rom, known
+                continue
+            try:
+                stat = os.stat(rom.path)
+            except OSError:
+                continue
+            cached = cache.get(stat) if cache is not None else None
+            if cached is not None:
+                yield rom, cached
+                continue
+            if processes != 0 and _is_large(rom, threshold):
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=processes)
+                if len(in_flight) >= limit:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    yield from finish(done)
+                in_flight[pool.submit(hash_file, rom.path)] = (rom, stat)
+                continue
+            try:
+                hashes = hash_file(rom.path)
+            except OSError:
+                continue
+            if cache is not None:
+                cache.put(stat, hashes)
+            yield rom, hashes
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from finish(done)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
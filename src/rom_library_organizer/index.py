@@ -0,0 +1,216 @@
+"""Persistent scan index used to rescan libraries incrementally.
+
+:class:`ScanIndex` stores every directory and ROM file seen by a scan in a
+SQLite database together with its modification time, size and inode. A
+rescan only lists directories whose modification time changed since the
+previous run; the contents of unchanged directories are taken from the index.
+
+Because a directory's modification time only changes when entries are added,
+removed or renamed inside it, a file rewritten in place is not noticed in an
+unchanged directory. Pass ``full=True`` to :meth:`ScanIndex.rescan` to list
+every directory when such changes must be detected.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+from .scanner import RomInfo, _list_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+"""
+
+
+@dataclass
+class ScanChanges:
+    """Differences found by :meth:`ScanIndex.rescan`."""
+
+    added: list[RomInfo] = field(default_factory=list)
+    removed: list[RomInfo] = field(default_factory=list)
+    modified: list[RomInfo] = field(default_factory=list)
+    #: Number of directories whose contents had to be listed.
+    listed_dirs: int = 0
+    #: Number of directories reused from the index without listing.
+    skipped_dirs: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+def _rom_from_row(path: str, name: str, extension: str, size: int) -> RomInfo:
+    return RomInfo(path=Path(path), extension=extension, size=size, name=name)
+
+
+def _subtree_bounds(path: str) -> tuple[str, str]:
+    """Return a half-open key range covering everything below ``path``."""
+
+    prefix = path.rstrip(os.sep) + os.sep
+    # ``os.sep`` followed by the next code point bounds every descendant.
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+class ScanIndex:
+    """On-disk index of scanned directories and ROM files.
+
+    Parameters
+    ----------
+    db_path:
+        Location of the SQLite database. It is created when missing.
+    """
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db_path = Path(db_path)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+
+        self._conn.close()
+
+    def __enter__(self) -> ScanIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def roms(self, root_path: str | Path | None = None) -> Iterator[RomInfo]:
+        """Yield indexed ROM files, optionally limited to ``root_path``."""
+
+        if root_path is None:
+            rows = self._conn.execute("SELECT path, name, extension, size FROM files ORDER BY path")
+        else:
+            root = os.path.abspath(root_path)
+            low, high = _subtree_bounds(root)
+            rows = self._conn.execute(
+                "SELECT path, name, extension, size FROM files"
+                " WHERE path >= ? AND path < ? ORDER BY path",
+                (low, high),
+            )
+        for row in rows:
+            yield _rom_from_row(*row)
+
+    def rescan(
+        self,
+        root_path: str | Path,
+        *,
+        full: bool = False,
+        skip: Callable[[str], bool] | None = None,
+    ) -> ScanChanges:
+        """Bring the index up to date with ``root_path`` and report changes.
+
+        Directories whose modification time matches the index are not listed
+        unless ``full`` is ``True``; their subdirectories are still visited so
+        changes deeper in the tree are found. Subdirectories for which
+        ``skip`` returns ``True`` are neither listed nor indexed.
+        """
+
+        root = os.path.abspath(root_path)
+        changes = ScanChanges()
+        with self._conn:
+            if not os.path.isdir(root):
+                self._drop_subtree(root, changes)
+                return changes
+
+            pending = [root]
+            while pending:
+                directory = pending.pop()
+                try:
+                    mtime_ns = os.stat(directory).st_mtime_ns
+                except OSError:
+                    self._drop_subtree(directory, changes)
+                    continue
+                row = self._conn.execute(
+                    "SELECT mtime_ns FROM dirs WHERE path = ?", (directory,)
+                ).fetchone()
+                if row is not None and row[0] == mtime_ns and not full:
+                    changes.skipped_dirs += 1
+                    pending.extend(
+                        path
+                        for (path,) in self._conn.execute(
+                            "SELECT path FROM dirs WHERE parent = ?", (directory,)
+                        )
+                    )
+                    continue
+                changes.listed_dirs += 1
+                subdirs = self._refresh_dir(directory, mtime_ns, changes)
+                pending.extend(d for d in subdirs if skip is None or not skip(d))
+        return changes
+
+    def _refresh_dir(self, directory: str, mtime_ns: int, changes: ScanChanges) -> list[str]:
+        """List ``directory``, record differences and return its subdirectories."""
+
+        files, subdirs = _list_dir(directory, False)
+        known = {
+            path: (size, mtime, inode, name, ext)
+            for path, size, mtime, inode, name, ext in self._conn.execute(
+                "SELECT path, size, mtime_ns, inode, name, extension FROM files WHERE dir = ?",
+                (directory,),
+            )
+        }
+        rows = []
+        for entry, ext, stat in files:
+            rom = RomInfo(path=Path(entry.path), extension=ext, size=stat.st_size, name=entry.name)
+            previous = known.pop(entry.path, None)
+            if previous is None:
+                changes.added.append(rom)
+            elif previous[:3] != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+                changes.modified.append(rom)
+            else:
+                continue
+            rows.append(
+                (entry.path, directory, entry.name, ext, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            )
+        for path, (size, _, _, name, ext) in known.items():
+            changes.removed.append(_rom_from_row(path, name, ext, size))
+        self._conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in known])
+        self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+        current = set(subdirs)
+        for (path,) in self._conn.execute(
+            "SELECT path FROM dirs WHERE parent = ?", (directory,)
+        ).fetchall():
+            if path not in current:
+                self._drop_subtree(path, changes)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)",
+            (directory, os.path.dirname(directory), mtime_ns),
+        )
+        return subdirs
+
+    def _drop_subtree(self, directory: str, changes: ScanChanges) -> None:
+        """Forget ``directory`` and everything below it, reporting removals."""
+
+        low, high = _subtree_bounds(directory)
+        file_where = "dir = ? OR (dir >= ? AND dir < ?)"
+        for row in self._conn.execute(
+            f"SELECT path, name, extension, size FROM files WHERE {file_where}",
+            (directory, low, high),
+        ):
+            changes.removed.append(_rom_from_row(*row))
+        self._conn.execute(f"DELETE FROM files WHERE {file_where}", (directory, low, high))
+        self._conn.execute(
+            "DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (directory, low, high)
+        )
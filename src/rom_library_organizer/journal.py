@@ -0,0 +1,442 @@
+"""Write-ahead journal for file placement, with resume and undo.
+
+Before a move is performed its intent is appended to a JSON Lines journal;
+after it succeeds a ``done`` record follows::
+
+    {"id": 1, "mode": "move", "source": "/in/Zelda.sfc", "destination": "/out/snes/Zelda.sfc",
+     "absent": true}
+    {"done": 1, "method": "rename", "inode": [2049, 131075]}
+
+Intents are written for a whole batch of moves and made durable with a
+single :func:`os.fsync` before any of them is applied, and ``done`` and
+``failed`` records ride along with the next batch, so a run costs one fsync
+per batch instead of one per file. After an interruption the journal still
+names every operation that may have started. Intents without an outcome are
+reconciled against the filesystem, but only for destinations that did not
+exist when the intent was written (``absent``), since nothing is ever
+overwritten: :func:`apply_journaled` skips work that is already finished
+when the same run is repeated and completes moves interrupted between copy
+and unlink, and :func:`undo` puts every applied operation back in reverse
+order, leaving alone any file that is not the one a ``done`` record names.
+"""
+
+from __future__ import annotations
+
+import errno
+import filecmp
+import json
+import os
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator
+
+from .mover import MODES, Move, MoveResult, apply_moves, move_file
+
+
+@dataclass
+class JournalEntry:
+    """One journaled operation and how far it got."""
+
+    id: int
+    mode: str
+    source: Path
+    destination: Path
+    #: ``"pending"``, ``"done"``, ``"failed"`` or ``"undone"``.
+    state: str = "pending"
+    method: str | None = None
+    #: Whether the destination was missing when the intent was written.
+    absent: bool = False
+    #: Device and inode of the placed file, from the ``done`` record.
+    inode: tuple[int, int] | None = None
+
+    @property
+    def move(self) -> Move:
+        return Move(self.source, self.destination)
+
+    def applied(self) -> bool:
+        """Whether the filesystem shows this operation as carried out.
+
+        Used for intents without an outcome, and only when the destination
+        was :attr:`absent` at the time: a move has its source gone and its
+        destination present, a hardlink shares the source's inode, and a
+        copy has the source's contents, compared byte for byte.
+        """
+
+        if not self.absent:
+            return False
+        try:
+            destination = os.stat(self.destination)
+        except FileNotFoundError:
+            return False
+        try:
+            source = os.stat(self.source)
+        except FileNotFoundError:
+            return self.mode == "move"
+        if (source.st_dev, source.st_ino) == (destination.st_dev, destination.st_ino):
+            return self.mode != "move"
+        if self.mode == "move":
+            return False
+        return _same_contents(self.source, self.destination)
+
+    def half_moved(self) -> bool:
+        """Whether this move was copied across devices but its source not removed."""
+
+        if self.mode != "move" or not self.absent:
+            return False
+        try:
+            source = os.stat(self.source)
+            destination = os.stat(self.destination)
+        except FileNotFoundError:
+            return False
+        if (source.st_dev, source.st_ino) == (destination.st_dev, destination.st_ino):
+            return False
+        return _same_contents(self.source, self.destination)
+
+
+def _same_contents(a: Path, b: Path) -> bool:
+    try:
+        return filecmp.cmp(a, b, shallow=False)
+    except OSError:
+        return False
+
+
+def _inode(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = os.lstat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def read_journal(path: str | Path) -> list[JournalEntry]:
+    """Return the entries of the journal at ``path`` in the order written.
+
+    A final line cut short by a crash is ignored.
+    """
+
+    entries: dict[int, JournalEntry] = {}
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "id" in record:
+                entries[record["id"]] = JournalEntry(
+                    id=record["id"],
+                    mode=record["mode"],
+                    source=Path(record["source"]),
+                    destination=Path(record["destination"]),
+                    absent=record.get("absent", False),
+                )
+            elif "done" in record:
+                entry = entries[record["done"]]
+                entry.state, entry.method = "done", record.get("method")
+                inode = record.get("inode")
+                entry.inode = (inode[0], inode[1]) if inode else None
+            elif "failed" in record:
+                entries[record["failed"]].state = "failed"
+            elif "undone" in record:
+                entries[record["undone"]].state = "undone"
+    return list(entries.values())
+
+
+def applied_moves(path: str | Path) -> set[Move]:
+    """Return the moves the journal at ``path`` shows as carried out.
+
+    These are the entries recorded as done, and pending intents for which
+    :meth:`JournalEntry.applied` holds. Run :func:`finish_interrupted` first
+    so that moves interrupted before their unlink count as well.
+    """
+
+    return {
+        entry.move
+        for entry in read_journal(path)
+        if entry.state == "done" or (entry.state == "pending" and entry.applied())
+    }
+
+
+class Journal:
+    """Append-only journal file with group commit.
+
+    Opening an existing journal loads its entries, drops a torn final line
+    and continues numbering after the last intent.
+
+    Parameters
+    ----------
+    path:
+        Journal file; created if missing.
+    batch_size:
+        Number of moves whose intents share one fsync in
+        :func:`apply_journaled`, and number of reversals per fsync in
+        :func:`undo`.
+    """
+
+    def __init__(self, path: str | Path, *, batch_size: int = 256) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.entries: list[JournalEntry] = []
+        if self.path.exists():
+            self.entries = read_journal(self.path)
+            self._truncate_torn_line()
+        self._next_id = max((entry.id for entry in self.entries), default=0) + 1
+        created = not self.path.exists()
+        self._handle: IO[str] = open(self.path, "a", encoding="utf-8")
+        if created:
+            self._fsync_directory()
+        #: Number of fsyncs so far.
+        self.syncs = 0
+        #: Moves skipped as already done by the last :func:`apply_journaled`.
+        self.skipped = 0
+
+    def _truncate_torn_line(self) -> None:
+        with open(self.path, "rb+") as handle:
+            data = handle.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                handle.truncate(end)
+
+    def _fsync_directory(self) -> None:
+        # Make the new file's directory entry durable too; not possible on Windows.
+        if os.name != "posix":
+            return
+        fd = os.open(self.path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _append(self, record: dict[str, Any]) -> None:
+        self._handle.write(json.dumps(record) + "\n")
+
+    def intend(self, moves: Iterable[Move], mode: str) -> list[JournalEntry]:
+        """Record the intent to apply ``moves`` and make it durable.
+
+        Every record written so far, including buffered ``done`` records,
+        is committed with the same fsync.
+        """
+
+        added = []
+        for move in moves:
+            entry = JournalEntry(
+                self._next_id,
+                mode,
+                move.source,
+                move.destination,
+                absent=not os.path.lexists(move.destination),
+            )
+            self._next_id += 1
+            self._append(
+                {
+                    "id": entry.id,
+                    "mode": mode,
+                    "source": str(entry.source),
+                    "destination": str(entry.destination),
+                    "absent": entry.absent,
+                }
+            )
+            added.append(entry)
+        self.entries.extend(added)
+        self.commit()
+        return added
+
+    def complete(self, entry: JournalEntry, method: str | None) -> None:
+        """Buffer a ``done`` record for ``entry``; durable at the next commit.
+
+        The record names the inode now at the destination, so :func:`undo`
+        can tell the placed file from one put there later.
+        """
+
+        entry.state, entry.method = "done", method
+        entry.inode = _inode(entry.destination)
+        self._append({"done": entry.id, "method": method, "inode": entry.inode})
+
+    def fail(self, entry: JournalEntry, error: OSError) -> None:
+        """Buffer a ``failed`` record for ``entry``."""
+
+        entry.state = "failed"
+        self._append({"failed": entry.id, "error": str(error)})
+
+    def revert(self, entry: JournalEntry) -> None:
+        """Buffer an ``undone`` record for ``entry``."""
+
+        entry.state = "undone"
+        self._append({"undone": entry.id})
+
+    def commit(self) -> None:
+        """Flush buffered records and fsync the journal."""
+
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self.syncs += 1
+
+    def close(self) -> None:
+        if not self._handle.closed:
+            self.commit()
+            self._handle.close()
+
+    def __enter__(self) -> Journal:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def apply_journaled(
+    moves: Iterable[Move],
+    journal: Journal,
+    *,
+    mode: str = "move",
+    workers: int = 8,
+    per_source_device: int = 2,
+    per_destination_device: int = 2,
+) -> Iterator[MoveResult]:
+    """Apply ``moves`` like :func:`~rom_library_organizer.mover.apply_moves`, journaled.
+
+    Moves are taken in batches of ``journal.batch_size``; the intents of a
+    batch are committed with one fsync before any of them is handed to the
+    thread pool, and a ``done`` record is buffered for each success.
+
+    Moves the journal already records as done are skipped, as are pending
+    intents the filesystem shows as applied (which are marked done), so
+    repeating an interrupted run with the same journal resumes it; moves
+    stopped between copy and unlink are finished first with
+    :func:`finish_interrupted`, and other pending intents are reused rather
+    than written again. Skipped moves produce no result; their number is
+    available as :attr:`Journal.skipped` afterwards. Failures get a
+    ``failed`` record and are tried again by the next run.
+    """
+
+    if mode not in MODES:
+        raise ValueError(f"Unknown transfer mode: {mode}")
+    finish_interrupted(journal)
+    finished = set()
+    pending: dict[Move, JournalEntry] = {}
+    for entry in journal.entries:
+        if entry.state == "done":
+            finished.add(entry.move)
+        elif entry.state == "pending" and entry.mode == mode:
+            pending[entry.move] = entry
+    journal.skipped = 0
+    in_flight: deque[JournalEntry] = deque()
+
+    def intended() -> Iterator[Move]:
+        remaining = iter(moves)
+        while batch := list(islice(remaining, journal.batch_size)):
+            todo: list[tuple[Move, JournalEntry | None]] = []
+            for move in batch:
+                entry = pending.pop(move, None)
+                if move in finished or (entry is not None and entry.applied()):
+                    if entry is not None:
+                        journal.complete(entry, entry.method)
+                    journal.skipped += 1
+                    continue
+                # An intent left pending by an earlier run is already durable.
+                todo.append((move, entry))
+            fresh = [move for move, entry in todo if entry is None]
+            created = iter(journal.intend(fresh, mode) if fresh else ())
+            for move, entry in todo:
+                in_flight.append(entry if entry is not None else next(created))
+                yield move
+
+    try:
+        for result in apply_moves(
+            intended(),
+            mode=mode,
+            workers=workers,
+            per_source_device=per_source_device,
+            per_destination_device=per_destination_device,
+        ):
+            entry = in_flight.popleft()
+            if result.ok:
+                journal.complete(entry, result.method)
+            elif result.error is not None:
+                journal.fail(entry, result.error)
+            yield result
+    finally:
+        journal.commit()
+
+
+def finish_interrupted(journal: Journal) -> int:
+    """Remove the sources of moves interrupted between copy and unlink.
+
+    A move across devices copies the file and then unlinks the source; an
+    interruption in between leaves both. Such pending intents, whose
+    destination was absent beforehand and now holds the source's contents,
+    are completed and marked done. Returns their number.
+    """
+
+    finished = 0
+    for entry in journal.entries:
+        if entry.state == "pending" and entry.half_moved():
+            try:
+                os.unlink(entry.source)
+            except OSError:
+                continue
+            journal.complete(entry, "copy")
+            finished += 1
+    if finished:
+        journal.commit()
+    return finished
+
+
+def _reverted(entry: JournalEntry) -> bool:
+    """Whether ``entry`` already looks undone, e.g. by an interrupted undo."""
+
+    if os.path.lexists(entry.destination):
+        return False
+    return entry.mode != "move" or os.path.lexists(entry.source)
+
+
+def undo(journal: Journal) -> Iterator[MoveResult]:
+    """Reverse every applied operation in ``journal``, newest first.
+
+    Moved files are moved back to their source; copies and links are
+    removed, leaving the source untouched. Pending intents are reversed only
+    if :meth:`JournalEntry.applied` holds, and a file whose inode differs
+    from the one its ``done`` record names is reported as an error rather
+    than touched. Each reversal is recorded as
+    ``undone`` and committed every ``journal.batch_size`` operations, so an
+    interrupted undo can simply be run again.
+
+    Yields
+    ------
+    MoveResult
+        One result per reversal, whose move goes from the placed file back
+        to the source. Failures are reported, not raised.
+    """
+
+    since_commit = 0
+    try:
+        for entry in reversed(journal.entries):
+            if entry.state in ("undone", "failed") or (
+                entry.state == "pending" and not entry.applied()
+            ):
+                continue
+            move = Move(entry.destination, entry.source)
+            if _reverted(entry):
+                journal.revert(entry)
+                continue
+            if entry.inode is not None and _inode(entry.destination) != entry.inode:
+                message = "Not the file this run placed"
+                yield MoveResult(move, error=OSError(errno.EEXIST, message, str(entry.destination)))
+                continue
+            try:
+                if entry.mode == "move":
+                    method = move_file(entry.destination, entry.source)
+                else:
+                    os.unlink(entry.destination)
+                    method = "unlink"
+            except OSError as exc:
+                yield MoveResult(move=move, error=exc)
+                continue
+            journal.revert(entry)
+            since_commit += 1
+            if since_commit >= journal.batch_size:
+                journal.commit()
+                since_commit = 0
+            yield MoveResult(move=move, method=method)
+    finally:
+        journal.commit()
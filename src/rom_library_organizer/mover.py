@@ -0,0 +1,521 @@
+"""Plan and apply file moves produced by platform organizers.
+
+:func:`plan_moves` turns scanned ROMs into :class:`Move` operations using an
+organizer's :meth:`~rom_library_organizer.platforms.PlatformOrganizer.rename`.
+:func:`apply_moves` performs them on a bounded thread pool. Moves within one
+filesystem are a single atomic rename that never replaces an existing file;
+moves across filesystems copy data inside the kernel with
+:func:`os.copy_file_range` or :func:`os.sendfile` and only fall back to a
+chunked user-space copy when neither is available. Copies are limited per source device and per
+destination device so one slow SD card cannot be flooded with writers.
+
+Besides moving, :func:`apply_moves` can materialise a layout without
+touching the source: as hardlinks, as reflinks (``FICLONE``) on filesystems
+that share extents, or as plain copies. :func:`plan_fanout` plans several
+platform layouts from a single pass over the scan so one copy of the data
+can back every frontend.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import errno
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+from . import profiling
+from .platforms import PlatformOrganizer
+from .scanner import RomInfo
+
+#: Buffer size used by the user-space copy fallback.
+COPY_CHUNK_SIZE = 1 << 20
+
+#: Supported values for the ``mode`` argument of :func:`apply_moves`.
+MODES = ("move", "copy", "hardlink", "reflink")
+
+# ``FICLONE`` from <linux/fs.h>; exposed by :mod:`fcntl` only on Python 3.12+.
+_FICLONE = getattr(fcntl, "FICLONE", 0x40049409)
+
+# Errors meaning a kernel copy primitive is unavailable for this pair of
+# files, in which case the next strategy is tried.
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.EBADF,
+    errno.ENOTTY,
+}
+
+# Errors from :func:`os.link` after which a copy is attempted instead, e.g.
+# cross-device links or filesystems such as exFAT without hardlinks.
+_NO_LINK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP, errno.ENOSYS}
+
+# ``RENAME_NOREPLACE`` from <linux/fs.h> and ``AT_FDCWD`` from <fcntl.h>.
+_RENAME_NOREPLACE = 1
+_AT_FDCWD = -100
+
+
+def _load_renameat2() -> Callable[..., int] | None:
+    """Return libc's ``renameat2``, or ``None`` where it does not exist."""
+
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        function = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return None
+    path = ctypes.c_char_p
+    function.argtypes = [ctypes.c_int, path, ctypes.c_int, path, ctypes.c_uint]
+    function.restype = ctypes.c_int
+    return function
+
+
+_renameat2 = _load_renameat2()
+
+#: Batch hook that returns updated ``file_metadata`` mappings in order, such
+#: as :meth:`rom_library_organizer.scraper.Scraper.enrich`.
+Enricher = Callable[[list[dict[str, Any]]], list[dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class Move:
+    """A single file operation from ``source`` to ``destination``."""
+
+    source: Path
+    destination: Path
+
+
+@dataclass
+class MoveResult:
+    """Outcome of applying a :class:`Move`."""
+
+    move: Move
+    #: How the data was moved, e.g. ``"rename"`` or ``"copy_file_range"``.
+    method: str | None = None
+    error: OSError | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def plan_moves(
+    roms: Iterable[RomInfo],
+    organizer: PlatformOrganizer,
+    destination_root: str | Path,
+    *,
+    batch_size: int = 1024,
+    enrich: Enricher | None = None,
+) -> Iterator[Move]:
+    """Yield a :class:`Move` for every ROM ``organizer`` supports.
+
+    Destinations are computed with :meth:`PlatformOrganizer.rename_many` in
+    batches of ``batch_size`` while the input is consumed as a stream.
+    ``enrich``, when given, is called with each batch of metadata before
+    renaming, e.g. to add scraped fields.
+    """
+
+    root = Path(destination_root)
+    supported = (rom for rom in roms if organizer.is_supported(rom.path))
+    while True:
+        batch = list(islice(supported, batch_size))
+        if not batch:
+            return
+        metadata = [rom.metadata() for rom in batch]
+        if enrich is not None:
+            metadata = enrich(metadata)
+        destinations = organizer.rename_many(metadata)
+        for rom, destination in zip(batch, destinations):
+            yield Move(source=rom.path, destination=root / destination)
+
+
+def plan_fanout(
+    roms: Iterable[RomInfo],
+    organizers: Mapping[str, PlatformOrganizer],
+    destination_root: str | Path,
+    *,
+    batch_size: int = 1024,
+    enrich: Enricher | None = None,
+) -> Iterator[Move]:
+    """Yield moves placing every ROM in each of ``organizers``' layouts.
+
+    ``roms`` is consumed once; each ROM is offered to every organizer and
+    placed under ``destination_root/<name>`` where ``name`` is the
+    organizer's key in ``organizers``. Apply the result with a non-moving
+    mode such as ``"hardlink"`` so every tree shares the source data.
+    ``enrich`` is applied as in :func:`plan_moves`.
+    """
+
+    root = Path(destination_root)
+    roms = iter(roms)
+    while True:
+        batch = list(islice(roms, batch_size))
+        if not batch:
+            return
+        metadata = [rom.metadata() for rom in batch]
+        if enrich is not None:
+            metadata = enrich(metadata)
+        for name, organizer in organizers.items():
+            selected = [i for i, rom in enumerate(batch) if organizer.is_supported(rom.path)]
+            destinations = organizer.rename_many(metadata[i] for i in selected)
+            for i, destination in zip(selected, destinations):
+                yield Move(source=batch[i].path, destination=root / name / destination)
+
+
+def _clone_fd(source: int, destination: int) -> bool:
+    """Share ``source``'s extents with ``destination``; ``False`` if unsupported."""
+
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(destination, _FICLONE, source)
+    except OSError as exc:
+        if exc.errno in _UNSUPPORTED_ERRNOS:
+            return False
+        raise
+    return True
+
+
+def _copy_fd(source: int, destination: int, size: int) -> str:
+    """Copy ``size`` bytes between descriptors and return the method used.
+
+    A kernel copy that stops short is finished with a user-space copy from
+    the same offset.
+
+    Raises
+    ------
+    OSError
+        With ``EIO`` if fewer than ``size`` bytes could be read, e.g. because
+        the source was truncated during the copy.
+    """
+
+    if hasattr(os, "copy_file_range"):
+        copied = 0
+        try:
+            while copied < size:
+                sent = os.copy_file_range(source, destination, size - copied)
+                if not sent:
+                    break
+                copied += sent
+        except OSError as exc:
+            if copied or exc.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+        else:
+            if copied == size:
+                return "copy_file_range"
+            return _copy_rest(source, destination, copied, size)
+
+    if hasattr(os, "sendfile"):
+        copied = 0
+        try:
+            while copied < size:
+                sent = os.sendfile(destination, source, copied, size - copied)
+                if not sent:
+                    break
+                copied += sent
+        except OSError as exc:
+            if copied or exc.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+        else:
+            if copied == size:
+                return "sendfile"
+            # sendfile with an offset leaves the source position untouched.
+            os.lseek(source, copied, os.SEEK_SET)
+            return _copy_rest(source, destination, copied, size)
+
+    return _copy_rest(source, destination, 0, size)
+
+
+def _copy_rest(source: int, destination: int, copied: int, size: int) -> str:
+    """Copy from the current offsets to end of file in user space."""
+
+    buffer = bytearray(COPY_CHUNK_SIZE)
+    view = memoryview(buffer)
+    while True:
+        read = os.readv(source, [buffer])
+        if not read:
+            break
+        written = 0
+        while written < read:
+            written += os.write(destination, view[written:read])
+        copied += read
+    if copied < size:
+        raise OSError(errno.EIO, f"Short copy: {copied} of {size} bytes")
+    return "copy"
+
+
+def rename_noreplace(source: str | Path, destination: str | Path) -> None:
+    """Rename ``source`` to ``destination`` unless ``destination`` exists.
+
+    Unlike :func:`os.rename`, an existing destination is never replaced,
+    even one created concurrently: the check and the rename are a single
+    ``renameat2(RENAME_NOREPLACE)`` call, or a hardlink followed by removing
+    ``source`` where that call is unavailable. On filesystems without either,
+    the destination is first reserved with an exclusive create.
+
+    Raises
+    ------
+    FileExistsError
+        If ``destination`` exists.
+    OSError
+        With ``EXDEV`` if the paths are on different filesystems.
+    """
+
+    if _renameat2 is not None:
+        result = _renameat2(
+            _AT_FDCWD, os.fsencode(source), _AT_FDCWD, os.fsencode(destination), _RENAME_NOREPLACE
+        )
+        if result == 0:
+            return
+        code = ctypes.get_errno()
+        if code not in (errno.ENOSYS, errno.EINVAL):
+            raise OSError(code, os.strerror(code), str(source), None, str(destination))
+    try:
+        os.link(source, destination)
+    except OSError as exc:
+        if exc.errno not in _NO_LINK_ERRNOS or exc.errno == errno.EXDEV:
+            raise
+    else:
+        os.unlink(source)
+        return
+    os.close(os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+    try:
+        os.replace(source, destination)
+    except BaseException:
+        os.unlink(destination)
+        raise
+
+
+def copy_file(
+    source: str | Path,
+    destination: str | Path,
+    *,
+    reflink: bool = False,
+    replace: bool = False,
+) -> str:
+    """Copy ``source`` to ``destination`` and return the method used.
+
+    Data is written to a uniquely named hidden temporary file next to
+    ``destination`` which is renamed into place once complete, so an
+    interrupted copy never leaves a truncated file under the final name and
+    concurrent copies never share data. Permissions and timestamps are
+    preserved. With ``reflink`` the copy first tries to share extents with
+    the source, which is instant on Btrfs, XFS and similar filesystems.
+
+    Raises
+    ------
+    FileExistsError
+        If ``destination`` exists, unless ``replace`` is true.
+    """
+
+    destination = Path(destination)
+    fd, partial = tempfile.mkstemp(
+        prefix=f".{destination.name}.", suffix=".part", dir=destination.parent
+    )
+    try:
+        with open(source, "rb") as src, open(fd, "wb") as dst:
+            if reflink and _clone_fd(src.fileno(), dst.fileno()):
+                method = "reflink"
+            else:
+                method = _copy_fd(src.fileno(), dst.fileno(), os.fstat(src.fileno()).st_size)
+        shutil.copystat(source, partial)
+        if replace:
+            os.replace(partial, destination)
+        else:
+            rename_noreplace(partial, destination)
+    except BaseException:
+        Path(partial).unlink(missing_ok=True)
+        raise
+    return method
+
+
+def _prepare_destination(destination: str | Path) -> Path:
+    """Create the parent of ``destination``, failing early if a file is there.
+
+    This only avoids wasted work; placing the file must still refuse to
+    replace one created in the meantime.
+    """
+
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists():
+        raise FileExistsError(errno.EEXIST, "Destination exists", str(destination))
+    return destination
+
+
+def link_file(source: str | Path, destination: str | Path) -> str:
+    """Hardlink ``source`` at ``destination`` and return the method used.
+
+    When the filesystem cannot link the two paths the file is copied, with a
+    reflink attempt first.
+    """
+
+    destination = _prepare_destination(destination)
+    try:
+        os.link(source, destination)
+        return "hardlink"
+    except OSError as exc:
+        if exc.errno not in _NO_LINK_ERRNOS:
+            raise
+    return copy_file(source, destination, reflink=True)
+
+
+def transfer_file(source: str | Path, destination: str | Path, mode: str = "move") -> str:
+    """Place ``source`` at ``destination`` using ``mode`` from :data:`MODES`."""
+
+    if mode == "move":
+        return move_file(source, destination)
+    if mode == "hardlink":
+        return link_file(source, destination)
+    if mode in ("copy", "reflink"):
+        return copy_file(source, _prepare_destination(destination), reflink=mode == "reflink")
+    raise ValueError(f"Unknown transfer mode: {mode}")
+
+
+def move_file(source: str | Path, destination: str | Path) -> str:
+    """Move ``source`` to ``destination`` and return the method used.
+
+    Existing destinations are never overwritten. A same-filesystem move is a
+    single :func:`rename_noreplace`; otherwise the file is copied with
+    :func:`copy_file` and the source removed afterwards.
+    """
+
+    destination = _prepare_destination(destination)
+    try:
+        rename_noreplace(source, destination)
+        return "rename"
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+    method = copy_file(source, destination)
+    os.unlink(source)
+    return method
+
+
+def _device_of(path: Path) -> int:
+    """Return the device of ``path`` or of its nearest existing ancestor."""
+
+    for candidate in (path, *path.parents):
+        try:
+            return os.stat(candidate).st_dev
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(errno.ENOENT, "No existing ancestor", str(path))
+
+
+class DeviceLimiter:
+    """Bound concurrent transfers per source and per destination device."""
+
+    def __init__(self, per_source_device: int, per_destination_device: int) -> None:
+        self._limits = {"dst": per_destination_device, "src": per_source_device}
+        self._semaphores: dict[tuple[str, int], threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, key: tuple[str, int]) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self._limits[key[0]])
+                self._semaphores[key] = semaphore
+            return semaphore
+
+    @contextmanager
+    def hold(self, source_device: int, destination_device: int) -> Iterator[None]:
+        """Hold a transfer slot on both devices for the duration of the block.
+
+        Slots are always acquired in sorted key order so two transfers in
+        opposite directions cannot deadlock.
+        """
+
+        keys = sorted({("src", source_device), ("dst", destination_device)})
+        with ExitStack() as stack:
+            for key in keys:
+                stack.enter_context(self._semaphore(key))
+            yield
+
+
+def _apply_one(move: Move, mode: str, limiter: DeviceLimiter) -> MoveResult:
+    profiler = profiling.active
+    start = time.perf_counter() if profiler is not None else 0.0
+    try:
+        source = os.stat(move.source)
+        destination_device = _device_of(move.destination.parent)
+        # Renames, links and clones on one device do not transfer data.
+        if source.st_dev == destination_device and mode != "copy":
+            method = transfer_file(move.source, move.destination, mode)
+        else:
+            with limiter.hold(source.st_dev, destination_device):
+                method = transfer_file(move.source, move.destination, mode)
+    except OSError as exc:
+        if profiler is not None:
+            profiler.record("apply", start, time.perf_counter(), syscalls={"error": 1})
+        return MoveResult(move=move, error=exc)
+    if profiler is not None:
+        profiler.record(
+            "apply", start, time.perf_counter(), items=1, bytes=source.st_size, syscalls={method: 1}
+        )
+    return MoveResult(move=move, method=method)
+
+
+def apply_moves(
+    moves: Iterable[Move],
+    *,
+    mode: str = "move",
+    workers: int = 8,
+    per_source_device: int = 2,
+    per_destination_device: int = 2,
+) -> Iterator[MoveResult]:
+    """Apply ``moves`` on a thread pool and yield a result for each one.
+
+    Parameters
+    ----------
+    moves:
+        Operations to perform, typically from :func:`plan_moves`. The input
+        is consumed lazily with a bounded number of moves in flight.
+    mode:
+        One of :data:`MODES`. ``"move"`` relocates the source; the other
+        modes leave it in place and create a copy, hardlink or reflink,
+        falling back to a copy when the filesystem cannot link or clone.
+    workers:
+        Number of threads performing moves.
+    per_source_device, per_destination_device:
+        Maximum number of concurrent cross-device copies reading from, or
+        writing to, any single device. Same-device renames, links and clones
+        are not limited.
+
+    Yields
+    ------
+    MoveResult
+        One result per move in input order. Failures are reported through
+        :attr:`MoveResult.error` rather than raised.
+    """
+
+    if mode not in MODES:
+        raise ValueError(f"Unknown transfer mode: {mode}")
+    limiter = DeviceLimiter(per_source_device, per_destination_device)
+    limit = max(1, workers) * 4
+    pending: deque[Future[MoveResult]] = deque()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="apply_moves") as pool:
+        for move in moves:
+            pending.append(pool.submit(_apply_one, move, mode, limiter))
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
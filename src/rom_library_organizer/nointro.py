@@ -0,0 +1,160 @@
+"""Parse No-Intro and Redump style file names into structured fields.
+
+Names such as ``Game (USA, Europe) (En,Fr,De) (Disc 2) (Rev A) [!]`` carry
+their metadata as parenthesised and bracketed tags. :func:`parse_name` walks
+them in one pass with a single precompiled pattern and classifies each tag
+as regions, languages, disc, revision or a remaining flag. Organizers render
+region and disc themselves, so the ``name`` handed to them keeps every other
+tag and ``Zelda (USA) (Rev 1)`` and ``Zelda (USA) (Beta)`` stay distinct.
+Results are memoised, since a library repeats the same names across platforms, discs
+and rescans, and :func:`parse_roms` applies the parser to scan output.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from .scanner import RomInfo
+
+#: Maximum number of distinct names remembered by :func:`parse_name`.
+PARSE_CACHE_SIZE = 1 << 16
+
+#: Region names used by No-Intro and Redump.
+REGIONS = frozenset(
+    {
+        "World", "USA", "Europe", "Japan", "Asia", "Australia", "Brazil", "Canada",
+        "China", "Denmark", "Finland", "France", "Germany", "Greece", "Hong Kong",
+        "India", "Ireland", "Israel", "Italy", "Korea", "Latin America", "Mexico",
+        "Netherlands", "New Zealand", "Norway", "Poland", "Portugal", "Russia",
+        "Scandinavia", "South Africa", "Spain", "Sweden", "Switzerland", "Taiwan",
+        "UK", "Unknown",
+    }
+)
+
+# One alternation matches both tag styles; group 1 is a "(...)" tag and
+# group 2 a "[...]" tag.
+_TAG_RE = re.compile(r"\(([^()]*)\)|\[([^\[\]]*)\]")
+_LANGUAGE_RE = re.compile(r"[A-Z][a-z](?:-[A-Z][a-z]+)?")
+_DISC_RE = re.compile(r"Dis[ck]\s+(\w+)(?:\s+of\s+\w+)?", re.IGNORECASE)
+_REVISION_RE = re.compile(r"Rev\s+([\w.]+)", re.IGNORECASE)
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedName:
+    """Fields extracted from a file name without its extension."""
+
+    title: str
+    regions: tuple[str, ...] = ()
+    languages: tuple[str, ...] = ()
+    disc: str | None = None
+    revision: str | None = None
+    #: Other tags verbatim, e.g. ``"Beta"`` or ``"!"`` from ``[!]``.
+    flags: tuple[str, ...] = ()
+    #: The name without its region and disc tags, e.g. ``"Zelda (Rev 1) [!]"``;
+    #: empty when it equals :attr:`title`.
+    label: str = field(default="", compare=False)
+
+    @property
+    def region(self) -> str | None:
+        """Regions joined as in the name, e.g. ``"USA, Europe"``."""
+
+        return ", ".join(self.regions) or None
+
+    def metadata(self) -> dict[str, Any]:
+        """Return the fields as ``file_metadata`` keys, omitting empty ones.
+
+        ``name`` is :attr:`label`, which organizers complete with region and
+        disc, and ``title`` the bare title.
+        """
+
+        metadata: dict[str, Any] = {"name": self.label or self.title, "title": self.title}
+        if self.regions:
+            metadata["region"] = self.region
+        if self.disc:
+            metadata["disc"] = self.disc
+        if self.revision:
+            metadata["revision"] = self.revision
+        if self.languages:
+            metadata["languages"] = self.languages
+        if self.flags:
+            metadata["flags"] = self.flags
+        return metadata
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_name(name: str) -> ParsedName:
+    """Split ``name`` (without extension) into its title and tags.
+
+    The title is the text outside any tag with whitespace collapsed, or the
+    whole name if nothing is left. A
+    parenthesised tag is a region list when every comma separated part is in
+    :data:`REGIONS`, a language list when every part looks like ``En`` or
+    ``Pt-Br``, a disc for ``Disc N`` and a revision for ``Rev X``; anything
+    else, and every bracketed tag, is kept as a flag. The label keeps every
+    tag except the region and disc ones.
+    """
+
+    title: list[str] = []
+    # The name with only the region and disc tags cut out.
+    label: list[str] = []
+    regions: tuple[str, ...] = ()
+    languages: tuple[str, ...] = ()
+    disc = revision = None
+    flags: list[str] = []
+    position = 0
+    label_position = 0
+    for match in _TAG_RE.finditer(name):
+        title.append(name[position : match.start()])
+        position = match.end()
+        tag = match.group(1)
+        if tag is None:
+            flags.append(match.group(2).strip())
+            continue
+        tag = tag.strip()
+        parts = [part.strip() for part in tag.split(",")]
+        if not regions and all(part in REGIONS for part in parts):
+            regions = tuple(parts)
+        elif disc is None and (found := _DISC_RE.fullmatch(tag)):
+            disc = found.group(1)
+        else:
+            if not languages and all(_LANGUAGE_RE.fullmatch(part) for part in parts):
+                languages = tuple(parts)
+            elif revision is None and (found := _REVISION_RE.fullmatch(tag)):
+                revision = found.group(1)
+            else:
+                flags.append(tag)
+            continue
+        label.append(name[label_position : match.start()])
+        label_position = match.end()
+    title.append(name[position:])
+    label.append(name[label_position:])
+    bare = " ".join("".join(title).split()) or name.strip()
+    full = " ".join("".join(label).split())
+    return ParsedName(
+        title=bare,
+        regions=regions,
+        languages=languages,
+        disc=disc,
+        revision=revision,
+        flags=tuple(flags),
+        label="" if full == bare else full,
+    )
+
+
+def parse_names(names: Iterable[str]) -> list[ParsedName]:
+    """Parse every name of ``names``, in order."""
+
+    return [parse_name(name) for name in names]
+
+
+def parse_roms(roms: Iterable[RomInfo]) -> Iterator[tuple[RomInfo, ParsedName]]:
+    """Yield each scanned ROM with its parsed file name."""
+
+    splitext = os.path.splitext
+    for rom in roms:
+        yield rom, parse_name(splitext(rom.name)[0])
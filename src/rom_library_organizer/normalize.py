@@ -0,0 +1,274 @@
+"""Normalize ROM images to the canonical dumps that DATs and emulators expect.
+
+Two kinds of files are rewritten as they are placed:
+
+* Nintendo 64 images in byte-swapped (``.v64``) or little-endian (``.n64``)
+  order become big-endian ``.z64`` files. The order is recognised from the
+  first word of the header, whatever the extension says.
+* SNES images carrying a 512-byte copier header (size ``512`` modulo
+  ``1024``) lose it and become ``.sfc`` files.
+
+:func:`normalize_file` streams the data in chunks read straight into an
+:class:`array.array`, swaps every 16- or 32-bit word at once with
+:meth:`array.array.byteswap` and writes the chunk through a
+:class:`memoryview`, so no Python code runs per byte. :func:`normalize_moves`
+applies a plan like :func:`~rom_library_organizer.mover.apply_moves`, sending
+files that need rewriting to a process pool.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .mover import Move, MoveResult, _prepare_destination, apply_moves, rename_noreplace
+
+#: Bytes read per chunk; a multiple of every word size.
+CHUNK_SIZE = 1 << 20
+
+#: Size of an SNES copier header.
+SMC_HEADER_SIZE = 512
+
+# Array type codes holding 2- and 4-byte words on this platform.
+_WORD16 = "H"
+_WORD32 = "I" if array("I").itemsize == 4 else "L"
+
+# First word of an N64 image in each byte order, with the swap that makes it
+# big-endian.
+_N64_ORDERS = {
+    b"\x80\x37\x12\x40": None,
+    b"\x37\x80\x40\x12": _WORD16,
+    b"\x40\x12\x37\x80": _WORD32,
+}
+
+_SNES_EXTENSIONS = {".smc", ".sfc", ".swc", ".fig"}
+
+
+@dataclass(frozen=True)
+class Normalization:
+    """How to rewrite one file."""
+
+    #: ``"n64-byteswap"``, ``"n64-wordswap"``, ``"smc-header"`` or, for a
+    #: big-endian image with another extension, ``"z64-rename"``.
+    kind: str
+    #: Extension of the normalized file.
+    extension: str
+    #: Bytes dropped from the start of the file.
+    skip: int = 0
+    #: Array type code of the words to byte-swap, if any.
+    swap: str | None = None
+
+    @property
+    def rewrites(self) -> bool:
+        """Whether the contents change, rather than only the extension."""
+
+        return bool(self.skip or self.swap)
+
+
+def inspect(path: str | Path) -> Normalization | None:
+    """Return what :func:`normalize_file` would do to ``path``, or ``None``.
+
+    Reads at most the first four bytes.
+    """
+
+    path = Path(path)
+    size = os.stat(path).st_size
+    if path.suffix.lower() in _SNES_EXTENSIONS:
+        if size % 1024 == SMC_HEADER_SIZE:
+            return Normalization("smc-header", ".sfc", skip=SMC_HEADER_SIZE)
+        return None
+    with open(path, "rb") as handle:
+        magic = handle.read(4)
+    if magic not in _N64_ORDERS:
+        return None
+    swap = _N64_ORDERS[magic]
+    if swap is None:
+        # Already big-endian; only the extension may be wrong.
+        return None if path.suffix.lower() == ".z64" else Normalization("z64-rename", ".z64")
+    kind = "n64-byteswap" if swap == _WORD16 else "n64-wordswap"
+    return Normalization(kind, ".z64", swap=swap)
+
+
+def _stream(source: str | Path, destination: str | Path, normalization: Normalization) -> None:
+    """Write the normalized contents of ``source`` to ``destination``."""
+
+    code = normalization.swap or "B"
+    buffer = array(code, bytes(CHUNK_SIZE))
+    view = memoryview(buffer).cast("B")
+    width = buffer.itemsize
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        src.seek(normalization.skip)
+        while True:
+            read = src.readinto(view)
+            if not read:
+                break
+            if normalization.swap is not None:
+                # A truncated final word is copied as it is.
+                aligned = read - read % width
+                tail = bytes(view[aligned:read])
+                buffer.byteswap()
+                dst.write(view[:aligned])
+                dst.write(tail)
+            else:
+                dst.write(view[:read])
+
+
+def normalize_file(
+    source: str | Path,
+    destination: str | Path,
+    normalization: Normalization | None = None,
+    *,
+    replace: bool = False,
+) -> Normalization | None:
+    """Write a normalized copy of ``source`` to ``destination``.
+
+    ``normalization`` defaults to :func:`inspect`; when there is nothing to
+    do, nothing is written and ``None`` is returned. Data goes to a uniquely
+    named hidden temporary file that is renamed to ``destination`` once
+    complete, and the source's permissions and timestamps are kept.
+
+    Raises
+    ------
+    FileExistsError
+        If ``destination`` exists, unless ``replace`` is true.
+    """
+
+    if normalization is None:
+        normalization = inspect(source)
+        if normalization is None:
+            return None
+    destination = Path(destination)
+    fd, partial = tempfile.mkstemp(
+        prefix=f".{destination.name}.", suffix=".part", dir=destination.parent
+    )
+    os.close(fd)
+    try:
+        _stream(source, partial, normalization)
+        shutil.copystat(source, partial)
+        if replace:
+            os.replace(partial, destination)
+        else:
+            rename_noreplace(partial, destination)
+    except BaseException:
+        Path(partial).unlink(missing_ok=True)
+        raise
+    return normalization
+
+
+def _place_normalized(move: Move, normalization: Normalization, remove_source: bool) -> str:
+    """Process pool job: write ``move`` normalized and return the method used."""
+
+    normalize_file(move.source, _prepare_destination(move.destination), normalization)
+    if remove_source:
+        os.unlink(move.source)
+    return normalization.kind
+
+
+def normalized_move(move: Move, normalization: Normalization) -> Move:
+    """Return ``move`` with the destination extension of ``normalization``."""
+
+    return replace(move, destination=move.destination.with_suffix(normalization.extension))
+
+
+def plan_normalized(moves: Iterable[Move]) -> Iterator[Move]:
+    """Yield ``moves`` with the extension each file will have once normalized.
+
+    Apply this before
+    :func:`~rom_library_organizer.collisions.resolve_collisions`, so that for
+    example ``Mario.v64`` and ``Mario.z64`` are seen to share ``Mario.z64``.
+    """
+
+    for move in moves:
+        try:
+            normalization = inspect(move.source)
+        except OSError:
+            normalization = None
+        yield move if normalization is None else normalized_move(move, normalization)
+
+
+def normalize_moves(
+    moves: Iterable[Move],
+    *,
+    mode: str = "move",
+    workers: int = 8,
+    processes: int | None = None,
+) -> Iterator[MoveResult]:
+    """Apply ``moves``, normalizing the files that need it.
+
+    Files :func:`inspect` finds nothing to do for, and big-endian N64 images
+    that only need the ``.z64`` extension, are placed with
+    :func:`~rom_library_organizer.mover.apply_moves` using ``mode`` and
+    ``workers``. The others are written normalized, under the new extension,
+    by a pool of ``processes`` processes (``None`` for the CPU count, ``0``
+    to run them in the calling process); whatever the mode, the result is a
+    new file, and the source is removed afterwards only in ``"move"`` mode.
+    Their :attr:`MoveResult.method` is the :attr:`Normalization.kind`.
+
+    Destinations are never replaced. Plan them with :func:`plan_normalized`
+    so collisions are resolved under the normalized names; files whose
+    destination already has the normalized extension keep it.
+
+    Results are yielded as they complete, so the order may differ from the
+    input order.
+    """
+
+    limit = (processes or os.cpu_count() or 1) * 2
+    pool: ProcessPoolExecutor | None = None
+    in_flight: dict[Future[str], Move] = {}
+    finished: deque[MoveResult] = deque()
+
+    def collect(futures: Iterable[Future[str]]) -> None:
+        for future in futures:
+            move = in_flight.pop(future)
+            try:
+                finished.append(MoveResult(move=move, method=future.result()))
+            except OSError as exc:
+                finished.append(MoveResult(move=move, error=exc))
+
+    def plain() -> Iterator[Move]:
+        nonlocal pool
+        for move in moves:
+            try:
+                normalization = inspect(move.source)
+            except OSError:
+                normalization = None
+            if normalization is None:
+                yield move
+                continue
+            target = normalized_move(move, normalization)
+            if not normalization.rewrites:
+                yield target
+                continue
+            if processes == 0:
+                try:
+                    method = _place_normalized(target, normalization, mode == "move")
+                    finished.append(MoveResult(move=target, method=method))
+                except OSError as exc:
+                    finished.append(MoveResult(move=target, error=exc))
+                continue
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=processes)
+            if len(in_flight) >= limit:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            future = pool.submit(_place_normalized, target, normalization, mode == "move")
+            in_flight[future] = target
+
+    try:
+        for result in apply_moves(plain(), mode=mode, workers=workers):
+            yield result
+            while finished:
+                yield finished.popleft()
+        collect(list(in_flight))
+        while finished:
+            yield finished.popleft()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
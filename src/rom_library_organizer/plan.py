@@ -0,0 +1,346 @@
+"""Save organizer plans as JSON Lines and apply them later, elsewhere.
+
+A plan file starts with a header line naming the source root and the
+platforms, followed by one line per scanned file::
+
+    {"format": "rom-library-organizer-plan", "version": 1, "root": "/srv/roms",
+     "platforms": ["batocera"]}
+    {"source": "snes/Zelda (USA).sfc", "extension": ".sfc", "size": 1048576,
+     "name": "Zelda (USA).sfc", "platform": null,
+     "destinations": {"batocera": "snes/Zelda (USA).sfc"}}
+
+Sources are relative to the root, so a plan made on one machine can be
+applied on another where the library is mounted elsewhere.
+:func:`write_plan` renames in batches and writes each line as it goes;
+destination collisions are then resolved over the whole plan with the
+policies of :func:`~rom_library_organizer.collisions.resolve_collisions`,
+using a temporary SQLite index of the planned names instead of memory.
+:class:`PlanReader` reads one line at a time, optionally skipping to any
+entry. Memory use of both does not grow with the size of the library.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Mapping
+
+from .collisions import POLICIES, Collision, CollisionError, collision_key
+from .mover import Enricher, Move
+from .platforms import PlatformOrganizer
+from .scanner import RomInfo
+
+PLAN_FORMAT = "rom-library-organizer-plan"
+PLAN_VERSION = 1
+
+
+@dataclass
+class PlanEntry:
+    """One planned file: its scan record and destination per platform."""
+
+    rom: RomInfo
+    destinations: dict[str, str] = field(default_factory=dict)
+
+
+class PlanWriter:
+    """Write a plan line by line to ``handle``."""
+
+    def __init__(self, handle: IO[str], root: str | Path, platforms: Iterable[str]) -> None:
+        self.handle = handle
+        self.root = os.path.abspath(root)
+        self.platforms = list(platforms)
+        self.entries = 0
+        header = {
+            "format": PLAN_FORMAT,
+            "version": PLAN_VERSION,
+            "root": self.root,
+            "platforms": self.platforms,
+        }
+        handle.write(json.dumps(header) + "\n")
+
+    def write(self, rom: RomInfo, destinations: Mapping[str, str]) -> str:
+        """Write the line for ``rom`` and return its source relative to the root."""
+
+        record = {
+            "source": os.path.relpath(rom.path, self.root),
+            "extension": rom.extension,
+            "size": rom.size,
+            "name": rom.name,
+            "platform": rom.platform,
+            "destinations": dict(destinations),
+        }
+        # ASCII escapes keep undecodable file names (lone surrogates) intact.
+        self.handle.write(json.dumps(record) + "\n")
+        self.entries += 1
+        return record["source"]
+
+
+class _Claims:
+    """Planned destinations in a temporary on-disk SQLite database.
+
+    Memory use stays flat however many files are planned: the rows live in
+    SQLite's page cache and spill to a temporary file.
+    """
+
+    def __init__(self) -> None:
+        # An empty name opens a private temporary database backed by a file.
+        self._conn = sqlite3.connect("")
+        self._conn.execute(
+            "CREATE TABLE claims (platform TEXT, key TEXT, source TEXT, destination TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE changes (source TEXT, platform TEXT, destination TEXT,"
+            " PRIMARY KEY (source, platform))"
+        )
+
+    def add(self, rows: Iterable[tuple[str, str, str]]) -> None:
+        """Record ``(platform, source, destination)`` rows."""
+
+        self._conn.executemany(
+            "INSERT INTO claims VALUES (?, ?, ?, ?)",
+            ((platform, collision_key(dest), source, dest) for platform, source, dest in rows),
+        )
+
+    def resolve(self, policy: str, root: str) -> bool:
+        """Apply ``policy`` to every collision; return whether any entry changed.
+
+        As in :func:`~rom_library_organizer.collisions.resolve_collisions`,
+        the smallest source path keeps a destination, and suffixed names
+        avoid every other planned name.
+
+        Raises
+        ------
+        CollisionError
+            With the ``"error"`` policy, listing every collision.
+        """
+
+        conn = self._conn
+        conn.execute("CREATE INDEX claims_key ON claims (platform, key, source)")
+        if policy == "error":
+            collisions = []
+            for platform, key in conn.execute(
+                "SELECT platform, key FROM claims GROUP BY platform, key"
+                " HAVING COUNT(*) > 1 ORDER BY platform, MIN(destination)"
+            ).fetchall():
+                rows = conn.execute(
+                    "SELECT source, destination FROM claims"
+                    " WHERE platform = ? AND key = ? ORDER BY source",
+                    (platform, key),
+                )
+                moves = [Move(Path(root, src), Path(platform, dest)) for src, dest in rows]
+                collisions.append(Collision(moves))
+            if collisions:
+                raise CollisionError(collisions)
+            return False
+        # Losers are read in chunks; renamed claims go into the same table.
+        conn.execute(
+            "CREATE TEMP TABLE losers AS SELECT c.platform, c.key, c.source, c.destination"
+            " FROM claims c JOIN (SELECT platform, key, MIN(source) AS keeper FROM claims"
+            " GROUP BY platform, key HAVING COUNT(*) > 1) g"
+            " ON c.platform = g.platform AND c.key = g.key AND c.source > g.keeper"
+            " ORDER BY c.platform, c.key, c.source"
+        )
+        changed = False
+        last = 0
+        while True:
+            rows = conn.execute(
+                "SELECT rowid, platform, source, destination FROM losers"
+                " WHERE rowid > ? ORDER BY rowid LIMIT 1024",
+                (last,),
+            ).fetchall()
+            if not rows:
+                return changed
+            for last, platform, source, destination in rows:
+                changed = True
+                renamed = None
+                if policy == "suffix":
+                    renamed = self._suffix(platform, source, destination)
+                conn.execute(
+                    "INSERT OR REPLACE INTO changes VALUES (?, ?, ?)",
+                    (source, platform, renamed),
+                )
+
+    def _suffix(self, platform: str, source: str, destination: str) -> str:
+        planned = Path(destination)
+        number = 2
+        while True:
+            renamed = str(planned.with_name(f"{planned.stem} ({number}){planned.suffix}"))
+            taken = self._conn.execute(
+                "SELECT 1 FROM claims WHERE platform = ? AND key = ? LIMIT 1",
+                (platform, collision_key(renamed)),
+            ).fetchone()
+            if taken is None:
+                self.add([(platform, source, renamed)])
+                return renamed
+            number += 1
+
+    def changed(self, source: str, platform: str, destination: str) -> str | None:
+        """Return the destination ``source`` gets for ``platform``; ``None`` if dropped."""
+
+        row = self._conn.execute(
+            "SELECT destination FROM changes WHERE source = ? AND platform = ?",
+            (source, platform),
+        ).fetchone()
+        return destination if row is None else row[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def write_plan(
+    path: str | Path,
+    roms: Iterable[RomInfo],
+    organizers: Mapping[str, PlatformOrganizer],
+    root: str | Path,
+    *,
+    batch_size: int = 1024,
+    enrich: Enricher | None = None,
+    on_collision: str = "error",
+) -> int:
+    """Plan ``roms`` for every organizer and write the plan to ``path``.
+
+    ``roms`` is consumed in batches of ``batch_size``; ``enrich`` is applied
+    to each batch of metadata as in
+    :func:`~rom_library_organizer.mover.plan_moves`.
+    Destinations that collide within a platform are handled with the
+    ``on_collision`` policy of
+    :func:`~rom_library_organizer.collisions.resolve_collisions`, the
+    smallest source path keeping the name; files at the destination are not
+    known yet and not checked. Planned destinations are kept in a temporary
+    SQLite database rather than in memory. The file is written under a
+    temporary name, rewritten if collisions changed any entry, and only
+    replaces ``path`` once complete. Returns the number of entries.
+
+    Raises
+    ------
+    CollisionError
+        With the ``"error"`` policy, after the whole input was planned, if
+        any destination collided. ``path`` is left untouched.
+    """
+
+    if on_collision not in POLICIES:
+        raise ValueError(f"Unknown collision policy: {on_collision}")
+    path = Path(path)
+    partial = path.with_name(f".{path.name}.part")
+    resolved = path.with_name(f".{path.name}.resolved")
+    claims = _Claims()
+    roms = iter(roms)
+    try:
+        with open(partial, "w", encoding="utf-8") as handle:
+            writer = PlanWriter(handle, root, organizers)
+            while True:
+                batch = list(islice(roms, batch_size))
+                if not batch:
+                    break
+                metadata = [rom.metadata() for rom in batch]
+                if enrich is not None:
+                    metadata = enrich(metadata)
+                planned: list[dict[str, str]] = [{} for _ in batch]
+                for name, organizer in organizers.items():
+                    selected = [
+                        i for i, rom in enumerate(batch) if organizer.is_supported(rom.path)
+                    ]
+                    renamed = organizer.rename_many(metadata[i] for i in selected)
+                    for i, destination in zip(selected, renamed):
+                        planned[i][name] = destination
+                for rom, destinations in zip(batch, planned):
+                    if destinations:
+                        source = writer.write(rom, destinations)
+                        claims.add((name, source, dest) for name, dest in destinations.items())
+        if not claims.resolve(on_collision, writer.root):
+            os.replace(partial, path)
+            return writer.entries
+        with open(partial, encoding="utf-8") as source, open(
+            resolved, "w", encoding="utf-8"
+        ) as handle:
+            handle.write(source.readline())
+            entries = 0
+            for line in source:
+                record = json.loads(line)
+                destinations = {}
+                for name, destination in record["destinations"].items():
+                    destination = claims.changed(record["source"], name, destination)
+                    if destination is not None:
+                        destinations[name] = destination
+                if destinations:
+                    record["destinations"] = destinations
+                    handle.write(json.dumps(record) + "\n")
+                    entries += 1
+        os.replace(resolved, path)
+        partial.unlink()
+        return entries
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        resolved.unlink(missing_ok=True)
+        raise
+    finally:
+        claims.close()
+
+
+class PlanReader:
+    """Read a plan file written by :func:`write_plan`.
+
+    The header is read on construction; :meth:`entries` and :meth:`moves`
+    then stream the remaining lines.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, encoding="utf-8") as handle:
+            header = json.loads(handle.readline() or "{}")
+        if header.get("format") != PLAN_FORMAT:
+            raise ValueError(f"{self.path} is not a plan file")
+        if header.get("version") != PLAN_VERSION:
+            raise ValueError(f"Unsupported plan version: {header.get('version')}")
+        self.root = header["root"]
+        self.platforms: list[str] = header["platforms"]
+
+    def entries(
+        self, *, start: int = 0, source_root: str | Path | None = None
+    ) -> Iterator[PlanEntry]:
+        """Yield the entries from index ``start`` on.
+
+        ``source_root`` replaces the root recorded in the plan, for applying
+        on a machine where the library is mounted at a different path.
+        """
+
+        root = str(source_root) if source_root is not None else self.root
+        with open(self.path, encoding="utf-8") as handle:
+            lines = islice(handle, 1 + start, None)
+            for line in lines:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                rom = RomInfo(
+                    path=Path(root, record["source"]),
+                    extension=record["extension"],
+                    size=record["size"],
+                    name=record["name"],
+                    platform=record.get("platform"),
+                )
+                yield PlanEntry(rom, record["destinations"])
+
+    def moves(
+        self,
+        destination_root: str | Path,
+        *,
+        start: int = 0,
+        source_root: str | Path | None = None,
+    ) -> Iterator[Move]:
+        """Yield the planned moves below ``destination_root``.
+
+        A single-platform plan writes directly into ``destination_root``;
+        with several platforms each one gets a subdirectory, as with
+        :func:`~rom_library_organizer.mover.plan_fanout`.
+        """
+
+        root = Path(destination_root)
+        nested = len(self.platforms) > 1
+        for entry in self.entries(start=start, source_root=source_root):
+            for name, destination in entry.destinations.items():
+                target = root / name / destination if nested else root / destination
+                yield Move(source=entry.rom.path, destination=target)
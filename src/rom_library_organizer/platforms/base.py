@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping
+
+from .. import profiling
+from ..renamer import sanitize_component
+from ..scanner import ROM_EXTENSIONS
+
+#: Extensions handled by the organizers: every format the scanner reports plus
+#: ``.cue`` sheets that accompany disc images.
+DEFAULT_EXTENSIONS: frozenset[str] = frozenset(ROM_EXTENSIONS | {".cue"})
 
 
 class PlatformOrganizer(ABC):
     """Abstract base class for platform-specific ROM organization."""
 
+    SUPPORTED_EXTENSIONS: frozenset[str] = DEFAULT_EXTENSIONS
+
+    #: Shared, memoised component sanitiser used by every organizer.
+    _sanitize = staticmethod(sanitize_component)
+
     @classmethod
     @abstractmethod
     def is_supported(cls, file: Path) -> bool:
@@ -16,3 +30,31 @@ class PlatformOrganizer(ABC):
     @abstractmethod
     def rename(self, file_metadata: Mapping[str, Any]) -> str:
         """Return the new filename for ``file_metadata``."""
+
+    def rename_many(self, items: Iterable[Mapping[str, Any]]) -> list[str]:
+        """Return the destination of every mapping in ``items``, in order.
+
+        Planning a whole scan in one call avoids the per-call dispatch of
+        invoking :meth:`rename` from a Python loop at the call site.
+        """
+
+        rename = self.rename
+        profiler = profiling.active
+        if profiler is None:
+            return [rename(item) for item in items]
+        destinations = []
+        clock = time.perf_counter
+        for item in items:
+            start = clock()
+            destinations.append(rename(item))
+            profiler.record("rename", start, clock(), items=1)
+        return destinations
+
+    def gamelist_dir(self, destination: str) -> str | None:
+        """Return the folder whose ``gamelist.xml`` lists ``destination``.
+
+        ``destination`` is a path returned by :meth:`rename`. Frontends
+        without gamelists return ``None``, the default.
+        """
+
+        return None
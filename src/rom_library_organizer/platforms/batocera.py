@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-import re
 from pathlib import Path
 from typing import Any, Mapping
 
-from .base import PlatformOrganizer
+from .base import DEFAULT_EXTENSIONS, PlatformOrganizer
 
 
 class BatoceraPlatformOrganizer(PlatformOrganizer):
@@ -20,21 +19,7 @@ class BatoceraPlatformOrganizer(PlatformOrganizer):
     # formats shared with the rest of this project. BIOS files often use the
     # same extensions as ROMs (e.g. ``.bin``) so they are included here as
     # well.
-    SUPPORTED_EXTENSIONS = {
-        ".nes",
-        ".sfc",
-        ".smc",
-        ".gba",
-        ".gb",
-        ".gbc",
-        ".n64",
-        ".z64",
-        ".v64",
-        ".nds",
-        ".iso",
-        ".bin",
-        ".cue",
-    }
+    SUPPORTED_EXTENSIONS = DEFAULT_EXTENSIONS
 
     #: Mapping of human readable platform names to Batocera folder names.
     #: Only a handful are required for the tests but the mapping can easily be
@@ -45,6 +30,21 @@ class BatoceraPlatformOrganizer(PlatformOrganizer):
         "playstation": "psx",
         "snes": "snes",
         "super nintendo": "snes",
+        "super nintendo entertainment system": "snes",
+        "nintendo entertainment system": "nes",
+        "game boy": "gb",
+        "game boy color": "gbc",
+        "game boy advance": "gba",
+        "nintendo ds": "nds",
+        "nintendo gamecube": "gamecube",
+        "nintendo wii": "wii",
+        "sega genesis": "megadrive",
+        "sega mega drive": "megadrive",
+        "sega 32x": "sega32x",
+        "sega cd": "segacd",
+        "sega saturn": "saturn",
+        "sega dreamcast": "dreamcast",
+        "sony playstation portable": "psp",
     }
 
     @classmethod
@@ -53,19 +53,13 @@ class BatoceraPlatformOrganizer(PlatformOrganizer):
 
         return file.suffix.lower() in cls.SUPPORTED_EXTENSIONS
 
-    @staticmethod
-    def _sanitize(value: str) -> str:
-        """Return a filesystem-safe version of ``value``."""
-
-        value = re.sub(r"[<>:\"/\\|?*]", " ", value)
-        value = re.sub(r"\s+", " ", value)
-        return value.strip()
-
     def _platform_folder(self, platform: str) -> str:
         """Return the Batocera folder name for ``platform``."""
 
-        key = platform.lower()
-        return self.PLATFORM_MAP.get(key, self._sanitize(platform).lower().replace(" ", ""))
+        folder = self.PLATFORM_MAP.get(platform.lower())
+        if folder is None:
+            folder = self._sanitize(platform).lower().replace(" ", "")
+        return folder
 
     def rename(self, file_metadata: Mapping[str, Any]) -> str:
         """Return destination path for ``file_metadata``.
@@ -96,3 +90,9 @@ class BatoceraPlatformOrganizer(PlatformOrganizer):
         base_name = self._sanitize(base_name)
 
         return f"{platform_dir}/{base_name}{extension}"
+
+    def gamelist_dir(self, destination: str) -> str | None:
+        """Return the system folder of ``destination``; BIOS files are not listed."""
+
+        folder, _, rest = destination.partition("/")
+        return None if folder == "bios" or not rest else folder
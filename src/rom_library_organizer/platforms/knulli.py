@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-import re
 from pathlib import Path
 from typing import Any, Mapping
 
-from .base import PlatformOrganizer
+from .base import DEFAULT_EXTENSIONS, PlatformOrganizer
 
 
 class KnulliPlatformOrganizer(PlatformOrganizer):
@@ -17,21 +16,7 @@ class KnulliPlatformOrganizer(PlatformOrganizer):
     ``/userdata`` so the caller can place the file in the appropriate location.
     """
 
-    SUPPORTED_EXTENSIONS = {
-        ".nes",
-        ".sfc",
-        ".smc",
-        ".gba",
-        ".gb",
-        ".gbc",
-        ".n64",
-        ".z64",
-        ".v64",
-        ".nds",
-        ".iso",
-        ".bin",
-        ".cue",
-    }
+    SUPPORTED_EXTENSIONS = DEFAULT_EXTENSIONS
 
     PLATFORM_MAP = {
         "nintendo 64": "n64",
@@ -39,6 +24,21 @@ class KnulliPlatformOrganizer(PlatformOrganizer):
         "playstation": "psx",
         "snes": "snes",
         "super nintendo": "snes",
+        "super nintendo entertainment system": "snes",
+        "nintendo entertainment system": "nes",
+        "game boy": "gb",
+        "game boy color": "gbc",
+        "game boy advance": "gba",
+        "nintendo ds": "nds",
+        "nintendo gamecube": "gamecube",
+        "nintendo wii": "wii",
+        "sega genesis": "megadrive",
+        "sega mega drive": "megadrive",
+        "sega 32x": "sega32x",
+        "sega cd": "segacd",
+        "sega saturn": "saturn",
+        "sega dreamcast": "dreamcast",
+        "sony playstation portable": "psp",
     }
 
     @classmethod
@@ -47,19 +47,13 @@ class KnulliPlatformOrganizer(PlatformOrganizer):
 
         return file.suffix.lower() in cls.SUPPORTED_EXTENSIONS
 
-    @staticmethod
-    def _sanitize(value: str) -> str:
-        """Return a filesystem-safe version of ``value``."""
-
-        value = re.sub(r"[<>:\"/\\|?*]", " ", value)
-        value = re.sub(r"\s+", " ", value)
-        return value.strip()
-
     def _platform_folder(self, platform: str) -> str:
         """Return the Knulli folder name for ``platform``."""
 
-        key = platform.lower()
-        return self.PLATFORM_MAP.get(key, self._sanitize(platform).lower().replace(" ", ""))
+        folder = self.PLATFORM_MAP.get(platform.lower())
+        if folder is None:
+            folder = self._sanitize(platform).lower().replace(" ", "")
+        return folder
 
     def rename(self, file_metadata: Mapping[str, Any]) -> str:
         """Return destination path for ``file_metadata``.
@@ -88,3 +82,11 @@ class KnulliPlatformOrganizer(PlatformOrganizer):
         base_name = self._sanitize(base_name)
 
         return f"roms/{platform_dir}/{base_name}{extension}"
+
+    def gamelist_dir(self, destination: str) -> str | None:
+        """Return ``roms/<system>`` for games; BIOS files are not listed."""
+
+        parts = destination.split("/")
+        if len(parts) < 3 or parts[0] != "roms":
+            return None
+        return f"roms/{parts[1]}"
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-import re
 from pathlib import Path
 from typing import Any, Mapping
 
-from .base import PlatformOrganizer
+from .base import DEFAULT_EXTENSIONS, PlatformOrganizer
 
 
 class NextUIPlatformOrganizer(PlatformOrganizer):
@@ -15,21 +14,7 @@ class NextUIPlatformOrganizer(PlatformOrganizer):
     sanitised to ensure filesystem compatibility.
     """
 
-    SUPPORTED_EXTENSIONS = {
-        ".nes",
-        ".sfc",
-        ".smc",
-        ".gba",
-        ".gb",
-        ".gbc",
-        ".n64",
-        ".z64",
-        ".v64",
-        ".nds",
-        ".iso",
-        ".bin",
-        ".cue",
-    }
+    SUPPORTED_EXTENSIONS = DEFAULT_EXTENSIONS
 
     @classmethod
     def is_supported(cls, file: Path) -> bool:
@@ -37,14 +22,6 @@ class NextUIPlatformOrganizer(PlatformOrganizer):
 
         return file.suffix.lower() in cls.SUPPORTED_EXTENSIONS
 
-    @staticmethod
-    def _sanitize(value: str) -> str:
-        """Return a filesystem-safe version of ``value``."""
-
-        value = re.sub(r"[<>:\"/\\|?*]", " ", value)
-        value = re.sub(r"\s+", " ", value)
-        return value.strip()
-
     def rename(self, file_metadata: Mapping[str, Any]) -> str:
         """Return destination path for ``file_metadata``.
 
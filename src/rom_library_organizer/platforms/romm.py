@@ -1,42 +1,22 @@
 from __future__ import annotations
 
-import re
 from pathlib import Path
 from typing import Any, Mapping
 
+from ..scanner import ROM_EXTENSIONS
 from .base import PlatformOrganizer
 
 
 class ROMMPlatformOrganizer(PlatformOrganizer):
     """Organize ROMs following ROMM's folder structure."""
 
-    SUPPORTED_EXTENSIONS = {
-        ".nes",
-        ".sfc",
-        ".smc",
-        ".gba",
-        ".gb",
-        ".gbc",
-        ".n64",
-        ".z64",
-        ".v64",
-        ".nds",
-        ".iso",
-        ".bin",
-    }
+    SUPPORTED_EXTENSIONS = frozenset(ROM_EXTENSIONS)
 
     @classmethod
     def is_supported(cls, file: Path) -> bool:
         """Return ``True`` if ``file`` has a recognised ROM extension."""
         return file.suffix.lower() in cls.SUPPORTED_EXTENSIONS
 
-    @staticmethod
-    def _sanitize(value: str) -> str:
-        """Return a filesystem-safe version of ``value``."""
-        value = re.sub(r"[<>:\"/\\|?*]", " ", value)
-        value = re.sub(r"\s+", " ", value)
-        return value.strip()
-
     def rename(self, file_metadata: Mapping[str, Any]) -> str:
         """Return destination path for ``file_metadata``.
 
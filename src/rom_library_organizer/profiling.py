@@ -0,0 +1,180 @@
+"""Per-stage instrumentation for scanning, planning and applying.
+
+Instrumented code reads the module attribute :data:`active` and does nothing
+more when it is ``None``, so disabled profiling costs one global lookup per
+directory, batch or file operation. :func:`enable` installs a
+:class:`Profiler` that records, for every stage:
+
+* busy wall time, items and bytes, from which rates are derived;
+* system call counts, as reported by the stage (e.g. ``scandir`` and
+  ``stat`` for the scanner, or the transfer method for the mover);
+* a log2 histogram of per-item latencies.
+
+With ``trace=True`` every recorded operation is also kept as a Chrome trace
+event, which :meth:`Profiler.write_trace` saves for ``chrome://tracing`` or
+Perfetto.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Mapping
+
+#: The installed profiler, or ``None`` when profiling is disabled.
+active: Profiler | None = None
+
+
+class Histogram:
+    """Latency histogram with power-of-two microsecond buckets.
+
+    Bucket ``i`` counts samples below ``2**i`` microseconds, which keeps
+    recording O(1) and the memory constant regardless of the sample count.
+    """
+
+    BUCKETS = 40
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        """Add ``count`` samples of ``seconds`` each."""
+
+        micros = int(seconds * 1e6)
+        self.counts[min(micros.bit_length(), self.BUCKETS - 1)] += count
+        self.total += count
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper bound in seconds of the bucket holding ``fraction``."""
+
+        if not self.total:
+            return 0.0
+        threshold = fraction * self.total
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return (1 << bucket) / 1e6
+        return (1 << (self.BUCKETS - 1)) / 1e6
+
+
+@dataclass
+class StageStats:
+    """Totals recorded for one stage."""
+
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    items: int = 0
+    bytes: int = 0
+    syscalls: Counter[str] = field(default_factory=Counter)
+    latency: Histogram = field(default_factory=Histogram)
+
+    def rate(self, amount: int) -> float:
+        return amount / self.seconds if self.seconds else 0.0
+
+
+class Profiler:
+    """Collect stage statistics, and trace events when ``trace`` is set."""
+
+    def __init__(self, *, trace: bool = False) -> None:
+        self.trace = trace
+        self.stages: dict[str, StageStats] = {}
+        self.events: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def record(
+        self,
+        stage: str,
+        start: float,
+        end: float,
+        *,
+        items: int = 0,
+        bytes: int = 0,
+        syscalls: Mapping[str, int] | None = None,
+        args: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Record one operation of ``stage`` between two :func:`time.perf_counter` values.
+
+        The operation's latency is divided evenly among its ``items``.
+        """
+
+        elapsed = end - start
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(stage)
+            stats.calls += 1
+            stats.seconds += elapsed
+            stats.items += items
+            stats.bytes += bytes
+            if syscalls:
+                stats.syscalls.update(syscalls)
+            if items > 1:
+                stats.latency.record(elapsed / items, items)
+            else:
+                stats.latency.record(elapsed)
+            if self.trace:
+                event = {
+                    "name": stage,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": elapsed * 1e6,
+                    "pid": self._pid,
+                    "tid": threading.get_ident(),
+                }
+                if args:
+                    event["args"] = dict(args)
+                self.events.append(event)
+
+    def summary(self) -> str:
+        """Return a table with one line per stage."""
+
+        elapsed = time.perf_counter() - self._origin
+        lines = [
+            f"Profile ({elapsed:.3f} s elapsed)",
+            f"{'stage':<10} {'calls':>8} {'busy s':>9} {'items':>9} {'items/s':>11}"
+            f" {'MB/s':>9} {'p50 ms':>8} {'p99 ms':>8}  syscalls",
+        ]
+        with self._lock:
+            for stats in self.stages.values():
+                syscalls = ", ".join(f"{name}={n}" for name, n in stats.syscalls.most_common())
+                lines.append(
+                    f"{stats.name:<10} {stats.calls:>8} {stats.seconds:>9.3f} {stats.items:>9}"
+                    f" {stats.rate(stats.items):>11.0f} {stats.rate(stats.bytes) / 1e6:>9.1f}"
+                    f" {stats.latency.percentile(0.5) * 1e3:>8.3f}"
+                    f" {stats.latency.percentile(0.99) * 1e3:>8.3f}  {syscalls}".rstrip()
+                )
+        return "\n".join(lines)
+
+    def write_trace(self, path: str | Path) -> None:
+        """Write the recorded events as Chrome trace JSON."""
+
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w") as handle:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, handle)
+
+
+def enable(*, trace: bool = False) -> Profiler:
+    """Install and return a new :class:`Profiler`."""
+
+    global active
+    active = Profiler(trace=trace)
+    return active
+
+
+def disable() -> Profiler | None:
+    """Uninstall the active profiler and return it."""
+
+    global active
+    profiler, active = active, None
+    return profiler
@@ -0,0 +1,160 @@
+"""Registry of platform organizers with lazy loading.
+
+Platforms are declared as ``"module:ClassName"`` targets. The built-in ones
+are listed in :data:`BUILTIN_PLATFORMS`; third-party packages add their own
+through the ``rom_library_organizer.platforms`` entry point group::
+
+    [project.entry-points."rom_library_organizer.platforms"]
+    mister = "my_package.mister:MiSTerPlatformOrganizer"
+
+Discovering entry points means scanning every installed distribution, so
+the result is cached in a small JSON manifest. The manifest is reused while
+the modification times of the directories on :data:`sys.path` are unchanged,
+which is the case until a package is installed or removed. Listing
+platforms therefore imports nothing, and an organizer module is imported
+only when that organizer is requested.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from importlib import import_module
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .platforms import PlatformOrganizer
+
+#: Entry point group scanned for third-party platforms.
+ENTRY_POINT_GROUP = "rom_library_organizer.platforms"
+
+#: Platforms shipped with the package, available even when it is not
+#: installed (e.g. when running from a source checkout).
+BUILTIN_PLATFORMS: dict[str, str] = {
+    "batocera": "rom_library_organizer.platforms.batocera:BatoceraPlatformOrganizer",
+    "knulli": "rom_library_organizer.platforms.knulli:KnulliPlatformOrganizer",
+    "nextui": "rom_library_organizer.platforms.nextui:NextUIPlatformOrganizer",
+    "romm": "rom_library_organizer.platforms.romm:ROMMPlatformOrganizer",
+}
+
+
+class UnknownPlatformError(LookupError):
+    """Raised when no organizer is registered under a name."""
+
+
+def default_manifest_path() -> Path:
+    """Return the manifest location inside the user's cache directory."""
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "rom-library-organizer" / "platforms.json"
+
+
+def _fingerprint() -> list[object]:
+    """Describe the import environment so a stale manifest can be detected."""
+
+    entries: list[object] = [sys.version]
+    for entry in sys.path:
+        try:
+            entries.append([entry, os.stat(entry or ".").st_mtime_ns])
+        except OSError:
+            entries.append([entry, None])
+    return entries
+
+
+def _discover_entry_points() -> dict[str, str]:
+    from importlib.metadata import entry_points
+
+    return {ep.name: ep.value for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+class PlatformRegistry:
+    """Map platform names to organizer classes, importing them on demand.
+
+    Parameters
+    ----------
+    manifest_path:
+        Where the entry point manifest is cached. ``None`` uses
+        :func:`default_manifest_path`.
+    use_cache:
+        When ``False`` entry points are discovered on every first lookup and
+        no manifest is read or written.
+    """
+
+    def __init__(self, manifest_path: str | Path | None = None, *, use_cache: bool = True) -> None:
+        self.manifest_path: Path | None = None
+        if use_cache:
+            self.manifest_path = Path(manifest_path or default_manifest_path())
+        self._targets: dict[str, str] | None = None
+        self._classes: dict[str, type[PlatformOrganizer]] = {}
+
+    def _load_manifest(self) -> dict[str, str] | None:
+        if self.manifest_path is None:
+            return None
+        try:
+            data = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if data.get("fingerprint") != _fingerprint():
+            return None
+        return data.get("platforms")
+
+    def _save_manifest(self, discovered: dict[str, str]) -> None:
+        if self.manifest_path is None:
+            return
+        payload = json.dumps({"fingerprint": _fingerprint(), "platforms": discovered})
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            partial = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+            partial.write_text(payload)
+            os.replace(partial, self.manifest_path)
+        except OSError:
+            # Caching is an optimisation; a read-only home must not break the CLI.
+            pass
+
+    def targets(self) -> dict[str, str]:
+        """Return ``{name: "module:ClassName"}`` for every known platform."""
+
+        if self._targets is None:
+            discovered = self._load_manifest()
+            if discovered is None:
+                discovered = _discover_entry_points()
+                self._save_manifest(discovered)
+            self._targets = {**discovered, **BUILTIN_PLATFORMS}
+        return self._targets
+
+    def names(self) -> list[str]:
+        """Return the sorted names of all registered platforms."""
+
+        return sorted(self.targets())
+
+    def load(self, name: str) -> type[PlatformOrganizer]:
+        """Import and return the organizer class registered as ``name``."""
+
+        cls = self._classes.get(name)
+        if cls is not None:
+            return cls
+        target = self.targets().get(name)
+        if target is None:
+            raise UnknownPlatformError(f"Unknown platform: {name}")
+        module_name, _, attr = target.partition(":")
+        obj = import_module(module_name)
+        for part in attr.split(".") if attr else ():
+            obj = getattr(obj, part)
+
+        from .platforms import PlatformOrganizer
+
+        if not (isinstance(obj, type) and issubclass(obj, PlatformOrganizer)):
+            raise ValueError(f"{target} is not a PlatformOrganizer subclass")
+        self._classes[name] = obj
+        return obj
+
+    def create(self, name: str) -> PlatformOrganizer:
+        """Return a new instance of the organizer registered as ``name``."""
+
+        return self.load(name)()
+
+
+#: Shared registry used by the command-line interface.
+registry = PlatformRegistry()
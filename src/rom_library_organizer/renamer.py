@@ -6,11 +6,29 @@ These helpers strip characters that are problematic on common file systems
 and normalise whitespace, producing tidy, portable file names.
 """
 
-import re
+from functools import lru_cache
 
 # Characters disallowed on Windows filesystems. Using a conservative set keeps
-# the resulting names portable across platforms.
-_INVALID_CHARS_RE = re.compile(r"[\\/:*?\"<>|]")
+# the resulting names portable across platforms. They are compiled once into
+# a translation table that maps each of them to a space.
+_INVALID_CHARS = "\\/:*?\"<>|"
+_INVALID_CHARS_TABLE = str.maketrans(_INVALID_CHARS, " " * len(_INVALID_CHARS))
+
+#: Maximum number of distinct values remembered by :func:`sanitize_component`.
+SANITIZE_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=SANITIZE_CACHE_SIZE)
+def sanitize_component(value: str) -> str:
+    """Return a filesystem-safe version of a single path component.
+
+    Disallowed characters become spaces, runs of whitespace collapse into a
+    single space and leading/trailing spaces are trimmed. Results are
+    memoised because libraries repeat the same platform, region and title
+    strings many times.
+    """
+
+    return " ".join(value.translate(_INVALID_CHARS_TABLE).split())
 
 
 def sanitize_filename(name: str) -> str:
@@ -20,10 +38,5 @@ def sanitize_filename(name: str) -> str:
     collapses consecutive whitespace and trims leading/trailing spaces.
     """
 
-    # Replace invalid characters with a space to keep word boundaries.
-    cleaned = _INVALID_CHARS_RE.sub(" ", name)
-    # Collapse any run of whitespace into a single space and strip edges.
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
     # Avoid stray spaces before file extensions (e.g. "name .ext").
-    cleaned = cleaned.replace(" .", ".")
-    return cleaned
+    return sanitize_component(name).replace(" .", ".")
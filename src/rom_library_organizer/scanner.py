@@ -5,11 +5,28 @@ from __future__ import annotations
 The :func:`scan_roms` generator walks a directory tree and yields
 information about each ROM file that it finds. Files with unrecognised
 extensions are ignored.
+
+Directories are listed with :func:`os.scandir` so the file type and stat data
+cached on each :class:`os.DirEntry` are reused instead of issuing separate
+``is_file``/``stat`` calls per path. Subtrees are listed concurrently by a
+bounded pool of worker threads while results are streamed to the caller.
 """
 
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Generator
+from stat import S_ISDIR, S_ISREG
+from typing import TYPE_CHECKING, Any, Generator, Iterable
+
+from . import profiling
+from .nointro import parse_name
+
+if TYPE_CHECKING:
+    from .filters import PathFilter
 
 # Common ROM file extensions. This list is intentionally conservative and can
 # be expanded in the future as new formats are supported.
@@ -28,18 +45,145 @@ ROM_EXTENSIONS: set[str] = {
     ".bin",
 }
 
+#: Archive formats whose members :mod:`rom_library_organizer.archives` can
+#: list without decompressing them.
+ARCHIVE_EXTENSIONS: set[str] = {".zip"}
+
+#: Default number of directory listing threads used by :func:`scan_roms`.
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
 
-@dataclass
+
+@dataclass(slots=True)
 class RomInfo:
-    """Metadata about a ROM file discovered during scanning."""
+    """Metadata about a ROM file discovered during scanning.
+
+    Records use ``__slots__`` to stay small while streaming; for bulk
+    storage of a whole scan see :class:`rom_library_organizer.table.RomTable`.
+    """
 
     path: Path
     extension: str
     size: int
     name: str
+    #: System the file belongs to, when a later stage has identified it.
+    platform: str | None = None
+
+    def metadata(self) -> dict[str, Any]:
+        """Return ``file_metadata`` for :meth:`PlatformOrganizer.rename`.
 
+        Only what the scan knows is filled in: the fields that
+        :func:`~rom_library_organizer.nointro.parse_name` extracts from the
+        file name (``name`` with every tag but region and disc, the bare
+        ``title``, ``region``, ``disc`` and so on), the
+        extension, the size, the source path and the platform once one has
+        been identified.
+        """
+
+        metadata = parse_name(os.path.splitext(self.name)[0]).metadata()
+        metadata["extension"] = self.extension
+        metadata["size"] = self.size
+        metadata["path"] = self.path
+        if self.platform:
+            metadata["platform"] = self.platform
+        return metadata
+
+
+def _relative_prefix(path: str, root: str) -> str:
+    """Return ``path`` relative to ``root`` with ``/`` separators and a trailing ``/``."""
+
+    if path == root:
+        return ""
+    relative = path[len(root) :].lstrip(os.sep)
+    if os.sep != "/":
+        relative = relative.replace(os.sep, "/")
+    return relative + "/"
+
+
+def _list_dir(
+    path: str,
+    ordered: bool,
+    extensions: set[str] = ROM_EXTENSIONS,
+    path_filter: PathFilter | None = None,
+    prefix: str = "",
+) -> tuple[list[tuple[os.DirEntry[str], str, os.stat_result]], list[str]]:
+    """List ``path`` once and return its ROM entries and subdirectories.
+
+    Files are kept when their extension is in ``extensions``. Each one is
+    returned with its lower-cased extension and stat result.
+    Symlinked directories are not followed, matching :meth:`Path.rglob`.
+    Entries that vanish or cannot be read while listing are skipped.
+    ``path_filter`` is asked about each entry as ``prefix`` plus its name,
+    before any stat, and rejected directories are not returned.
+    """
 
-def scan_roms(root_path: str | Path) -> Generator[RomInfo, None, None]:
+    files: list[tuple[os.DirEntry[str], str, os.stat_result]] = []
+    subdirs: list[str] = []
+    try:
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name) if ordered else list(it)
+    except OSError:
+        return files, subdirs
+
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if path_filter is None or path_filter.admits_dir(prefix + entry.name):
+                    subdirs.append(entry.path)
+                continue
+            # Check the extension first so non-ROM files never cost a stat.
+            ext = os.path.splitext(entry.name)[1].lower()
+            if ext not in extensions or not entry.is_file():
+                continue
+            if path_filter is not None and not path_filter.admits_file(prefix + entry.name):
+                continue
+            stat = entry.stat()
+            if path_filter is not None and not path_filter.admits_size(stat.st_size):
+                continue
+            # Share one string per extension instead of one per file.
+            ext = sys.intern(ext)
+        except OSError:
+            continue
+        files.append((entry, ext, stat))
+    return files, subdirs
+
+
+def _scan_dir(
+    path: str,
+    ordered: bool,
+    extensions: set[str],
+    path_filter: PathFilter | None = None,
+    root: str = "",
+) -> tuple[list[RomInfo], list[str]]:
+    """Return :class:`RomInfo` records and subdirectories for ``path``."""
+
+    profiler = profiling.active
+    start = time.perf_counter() if profiler is not None else 0.0
+    prefix = _relative_prefix(path, root) if path_filter is not None else ""
+    files, subdirs = _list_dir(path, ordered, extensions, path_filter, prefix)
+    roms = [
+        RomInfo(path=Path(entry.path), extension=ext, size=stat.st_size, name=entry.name)
+        for entry, ext, stat in files
+    ]
+    if profiler is not None:
+        profiler.record(
+            "scan",
+            start,
+            time.perf_counter(),
+            items=len(roms),
+            bytes=sum(rom.size for rom in roms),
+            syscalls={"scandir": 1, "stat": len(files)},
+        )
+    return roms, subdirs
+
+
+def scan_roms(
+    root_path: str | Path,
+    *,
+    workers: int | None = None,
+    ordered: bool = False,
+    archives: bool = False,
+    path_filter: PathFilter | None = None,
+) -> Generator[RomInfo, None, None]:
     """Yield information for ROM files under ``root_path``.
 
     Parameters
@@ -47,6 +191,22 @@ def scan_roms(root_path: str | Path) -> Generator[RomInfo, None, None]:
     root_path:
         Directory to search for ROM files. Subdirectories are traversed
         recursively.
+    workers:
+        Maximum number of threads listing directories concurrently. Defaults
+        to :data:`DEFAULT_WORKERS`; ``1`` scans in the calling thread.
+    ordered:
+        When ``True`` results are produced in a deterministic order: entries
+        are sorted by name within each directory and directories are emitted
+        breadth-first in the order they were discovered.
+    archives:
+        When ``True`` files with an extension in :data:`ARCHIVE_EXTENSIONS`
+        are reported as well. Pass the results through
+        :func:`rom_library_organizer.archives.expand_archives` to replace
+        them with their ROM members.
+    path_filter:
+        Include and exclude rules from :mod:`rom_library_organizer.filters`,
+        matched against paths relative to ``root_path``. Excluded
+        directories are pruned without being listed.
 
     Yields
     ------
@@ -59,11 +219,82 @@ def scan_roms(root_path: str | Path) -> Generator[RomInfo, None, None]:
     if not root.exists():
         return
 
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        ext = path.suffix.lower()
-        if ext not in ROM_EXTENSIONS:
+    extensions = ROM_EXTENSIONS | ARCHIVE_EXTENSIONS if archives else ROM_EXTENSIONS
+    if path_filter is not None and path_filter.extensions is not None:
+        extensions = extensions & path_filter.extensions
+    workers = DEFAULT_WORKERS if workers is None else max(1, workers)
+    if workers == 1:
+        pending = deque([str(root)])
+        while pending:
+            roms, subdirs = _scan_dir(
+                pending.popleft(), ordered, extensions, path_filter, str(root)
+            )
+            yield from roms
+            pending.extend(subdirs)
+        return
+
+    # Bound the number of listings in flight so very wide trees do not queue
+    # an unbounded number of futures.
+    limit = workers * 4
+    queued: deque[str] = deque([str(root)])
+    in_flight: deque[Future[tuple[list[RomInfo], list[str]]]] = deque()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan_roms")
+    try:
+        while queued or in_flight:
+            while queued and len(in_flight) < limit:
+                future = executor.submit(
+                    _scan_dir, queued.popleft(), ordered, extensions, path_filter, str(root)
+                )
+                in_flight.append(future)
+            if ordered:
+                done = [in_flight.popleft()]
+            else:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                done = [future for future in in_flight if future in finished]
+                for future in done:
+                    in_flight.remove(future)
+            for future in done:
+                roms, subdirs = future.result()
+                queued.extend(subdirs)
+                yield from roms
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def scan_paths(
+    paths: Iterable[str | Path],
+    *,
+    workers: int | None = None,
+    path_filter: PathFilter | None = None,
+    root: str | Path | None = None,
+) -> Generator[RomInfo, None, None]:
+    """Yield :class:`RomInfo` for specific files and directories.
+
+    Files are reported when their extension is in :data:`ROM_EXTENSIONS`;
+    directories are walked with :func:`scan_roms`. Missing paths are
+    skipped. This lets callers that already know what changed, such as the
+    watcher, avoid rescanning a whole library. ``path_filter`` rules are
+    matched relative to ``root``, which is required with a filter.
+    """
+
+    if path_filter is not None and root is None:
+        raise ValueError("scan_paths needs a root to apply a path filter")
+    base = os.path.abspath(root) if root is not None else ""
+    for path in paths:
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except OSError:
             continue
-        stat = path.stat()
-        yield RomInfo(path=path, extension=ext, size=stat.st_size, name=path.name)
+        if S_ISDIR(stat.st_mode):
+            roms: Iterable[RomInfo] = scan_roms(path, workers=workers)
+        else:
+            ext = path.suffix.lower()
+            if ext not in ROM_EXTENSIONS or not S_ISREG(stat.st_mode):
+                continue
+            roms = [RomInfo(path=path, extension=ext, size=stat.st_size, name=path.name)]
+        for rom in roms:
+            if path_filter is None or path_filter.admits(
+                _relative_prefix(os.path.abspath(rom.path), base).rstrip("/"), rom.size
+            ):
+                yield rom
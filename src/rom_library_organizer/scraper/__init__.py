@@ -0,0 +1,304 @@
+"""Fetch game metadata from online providers.
+
+A :class:`Provider` turns a ROM's ``file_metadata`` into a request URL and
+the response into extra metadata fields. :class:`Scraper` runs providers
+concurrently on an asyncio event loop:
+
+* requests go through :class:`~.http.HTTPClient`, which keeps a pool of
+  keep-alive connections per host;
+* every provider has its own :class:`~.http.TokenBucket` rate limit;
+* transient failures (connection errors, timeouts, 429 and 5xx responses)
+  are retried with exponential backoff, honouring ``Retry-After``;
+* responses, including "not found", are stored in a :class:`~.cache.DiskCache`,
+  so repeated runs never contact a provider for a title already seen.
+
+:meth:`Scraper.enrich` has the batch signature expected by the ``enrich``
+argument of :func:`~rom_library_organizer.mover.plan_moves`, so scraped
+fields reach :meth:`PlatformOrganizer.rename` without changing organizers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Mapping, Sequence
+from urllib.parse import quote
+
+from .cache import DiskCache, default_cache_path
+from .http import HTTPClient, Response, TokenBucket
+
+__all__ = [
+    "DiskCache",
+    "HTTPClient",
+    "JSONProvider",
+    "Provider",
+    "Scraper",
+    "TokenBucket",
+    "default_cache_path",
+]
+
+#: Statuses that are retried; everything else is final.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+#: Final statuses that are cached as "no metadata for this title".
+NOT_FOUND_STATUSES = frozenset({404, 410})
+
+#: Fields parsed from the file name that scraped values do not replace unless
+#: :class:`Scraper` is told to ``override`` them.
+IDENTITY_FIELDS = frozenset({"name", "title", "platform", "region", "disc"})
+
+
+class Provider(ABC):
+    """A metadata source.
+
+    Subclasses set :attr:`name` (used in cache keys), the allowed request
+    :attr:`rate` per second and :attr:`burst`, and implement :meth:`url` and
+    :meth:`parse`.
+    """
+
+    name = "provider"
+    rate = 1.0
+    burst = 1
+    headers: Mapping[str, str] = {}
+
+    @abstractmethod
+    def url(self, file_metadata: Mapping[str, Any]) -> str | None:
+        """Return the URL to query for ``file_metadata``, or ``None`` to skip it."""
+
+    @abstractmethod
+    def parse(self, body: bytes) -> dict[str, Any]:
+        """Return the metadata fields found in a successful response ``body``."""
+
+
+class _Quoted(dict):
+    """Template namespace that URL-quotes values and leaves missing ones empty."""
+
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
+class JSONProvider(Provider):
+    """Query a JSON API through a URL template.
+
+    ``url_template`` is formatted with the URL-quoted ``file_metadata``, e.g.
+    ``"https://example.com/games?title={title}&platform={platform}"``. The
+    response may be an object or a list whose first item is used. ``fields``
+    maps response keys to metadata keys; only non-empty values are kept.
+    """
+
+    DEFAULT_FIELDS: Mapping[str, str] = {
+        key: key
+        for key in ("name", "region", "platform", "disc", "year", "genre", "developer", "publisher")
+    }
+
+    def __init__(
+        self,
+        url_template: str,
+        *,
+        name: str = "json",
+        fields: Mapping[str, str] | None = None,
+        rate: float = 1.0,
+        burst: int = 1,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        self.url_template = url_template
+        self.name = name
+        self.fields = dict(fields or self.DEFAULT_FIELDS)
+        self.rate = rate
+        self.burst = burst
+        self.headers = dict(headers or {})
+
+    def url(self, file_metadata: Mapping[str, Any]) -> str | None:
+        values = _Quoted((k, quote(str(v), safe="")) for k, v in file_metadata.items())
+        return self.url_template.format_map(values)
+
+    def parse(self, body: bytes) -> dict[str, Any]:
+        data = json.loads(body)
+        if isinstance(data, list):
+            data = data[0] if data else {}
+        if not isinstance(data, dict):
+            return {}
+        return {
+            target: data[source]
+            for source, target in self.fields.items()
+            if data.get(source) not in (None, "", [])
+        }
+
+
+class Scraper:
+    """Fill in metadata from ``providers``, in order of precedence.
+
+    Parameters
+    ----------
+    providers:
+        Providers queried for every title. Fields from earlier providers win.
+    cache:
+        Optional :class:`DiskCache` consulted before any request is made.
+    client:
+        HTTP client to use; by default one is created and closed with the
+        scraper.
+    concurrency:
+        Maximum number of titles scraped at the same time.
+    retries, backoff:
+        A failed request is retried up to ``retries`` times, waiting
+        ``backoff * 2**attempt`` seconds (with jitter) in between.
+    override:
+        When ``False`` (the default) scraped values never replace the
+        :data:`IDENTITY_FIELDS` already in ``file_metadata``, so the name
+        keeps tags such as ``Rev 1`` or ``Beta``; they are added as
+        ``scraped_<field>`` instead. When ``True`` they replace them.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Provider],
+        *,
+        cache: DiskCache | None = None,
+        client: HTTPClient | None = None,
+        concurrency: int = 16,
+        retries: int = 3,
+        backoff: float = 0.5,
+        override: bool = False,
+    ) -> None:
+        self.providers = list(providers)
+        self.cache = cache
+        self._owns_client = client is None
+        self.client = client or HTTPClient()
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.override = override
+        #: Requests actually sent, and requests that failed after all retries.
+        self.requests = 0
+        self.failures = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._buckets: dict[int, TokenBucket] = {}
+        self._inflight: dict[str, asyncio.Future[tuple[int, bytes] | None]] = {}
+
+    def _bucket(self, provider: Provider) -> TokenBucket:
+        bucket = self._buckets.get(id(provider))
+        if bucket is None:
+            bucket = self._buckets[id(provider)] = TokenBucket(provider.rate, provider.burst)
+        return bucket
+
+    async def _request(self, provider: Provider, url: str) -> tuple[int, bytes] | None:
+        for attempt in range(self.retries + 1):
+            await self._bucket(provider).acquire()
+            self.requests += 1
+            delay = self.backoff * 2**attempt * (0.5 + random.random() / 2)
+            try:
+                response: Response = await self.client.get(url, provider.headers)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                pass
+            else:
+                if response.status not in RETRY_STATUSES:
+                    return response.status, response.body
+                retry_after = response.headers.get("retry-after", "")
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+        self.failures += 1
+        return None
+
+    async def fetch(self, provider: Provider, url: str) -> tuple[int, bytes] | None:
+        """Return ``(status, body)`` for ``url`` from the cache or the network.
+
+        Concurrent requests for the same URL share one network request.
+        ``None`` means every attempt failed; such results are not cached.
+        """
+
+        key = f"{provider.name} {url}"
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._request(provider, url)
+            if result is not None and self.cache is not None:
+                status, body = result
+                if status < 300 or status in NOT_FOUND_STATUSES:
+                    self.cache.put(key, status, body)
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when no other task is waiting.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def scrape(self, file_metadata: Mapping[str, Any]) -> dict[str, Any]:
+        """Return ``file_metadata`` updated with the fields found by the providers.
+
+        Identity fields already present are kept unless :attr:`override` is
+        set; see :class:`Scraper`.
+        """
+
+        found: dict[str, Any] = {}
+        for provider in self.providers:
+            url = provider.url(file_metadata)
+            if url is None:
+                continue
+            result = await self.fetch(provider, url)
+            if result is None or result[0] >= 300:
+                continue
+            try:
+                fields = provider.parse(result[1])
+            except ValueError:
+                continue
+            for key, value in fields.items():
+                if (
+                    not self.override
+                    and key in IDENTITY_FIELDS
+                    and file_metadata.get(key) not in (None, "")
+                ):
+                    key = f"scraped_{key}"
+                found.setdefault(key, value)
+        return {**file_metadata, **found}
+
+    async def scrape_many(self, items: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        """Scrape ``items`` concurrently and return the results in order."""
+
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def one(item: Mapping[str, Any]) -> dict[str, Any]:
+            async with slots:
+                return await self.scrape(item)
+
+        return list(await asyncio.gather(*(one(item) for item in items)))
+
+    def enrich(self, items: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        """Blocking :meth:`scrape_many` that reuses one event loop across calls.
+
+        Keeping the loop alive between batches keeps pooled connections open.
+        """
+
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.scrape_many(items))
+
+    def close(self) -> None:
+        """Close pooled connections and the event loop used by :meth:`enrich`."""
+
+        if self._owns_client:
+            self.client.close()
+        if self._loop is not None:
+            # Let closed transports finish before the loop goes away.
+            self._loop.run_until_complete(asyncio.sleep(0))
+            self._loop.close()
+            self._loop = None
+
+    def __enter__(self) -> Scraper:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
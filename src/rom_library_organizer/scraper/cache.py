@@ -0,0 +1,129 @@
+"""On-disk cache of provider responses with a TTL and a size limit."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+#: Entries older than this many seconds are refetched.
+DEFAULT_TTL = 30 * 24 * 3600
+
+#: Least recently used entries are evicted above this many bytes of bodies.
+DEFAULT_MAX_BYTES = 256 << 20
+
+
+def default_cache_path() -> Path:
+    """Return the response cache location inside the user's cache directory."""
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "rom-library-organizer" / "scraper.sqlite"
+
+
+class DiskCache:
+    """SQLite cache of ``(status, body)`` pairs keyed by request.
+
+    Entries expire ``ttl`` seconds after they were stored. When the stored
+    bodies exceed ``max_bytes``, the least recently read entries are evicted
+    until the total is back under 90% of the limit.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        commit_every: int = 100,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._commit_every = commit_every
+        self._pending = 0
+        if str(db_path) != ":memory:":
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, status INTEGER NOT NULL, body BLOB NOT NULL,"
+            " size INTEGER NOT NULL, stored REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        (self.size,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    def get(self, key: str) -> tuple[int, bytes] | None:
+        """Return the cached ``(status, body)`` for ``key`` unless it expired."""
+
+        row = self._conn.execute(
+            "SELECT status, body, size, stored FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, body, size, stored = row
+        now = time.time()
+        if now - stored > self.ttl:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.size -= size
+            self._written()
+            return None
+        self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self._written()
+        return status, body
+
+    def put(self, key: str, status: int, body: bytes) -> None:
+        """Store ``body`` for ``key``, evicting old entries when over the limit."""
+
+        old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (key, status, body, len(body), now, now),
+        )
+        self.size += len(body) - (old[0] if old else 0)
+        if self.size > self.max_bytes:
+            self.evict(int(self.max_bytes * 0.9))
+        self._written()
+
+    def evict(self, target: int) -> None:
+        """Drop least recently read entries until at most ``target`` bytes remain."""
+
+        doomed = []
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed")
+        for key, size in rows:
+            if self.size <= target:
+                break
+            doomed.append((key,))
+            self.size -= size
+        rows.close()
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _written(self) -> None:
+        self._pending += 1
+        if self._pending >= self._commit_every:
+            self.commit()
+
+    def commit(self) -> None:
+        """Flush pending cache writes to disk."""
+
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        """Commit outstanding entries and close the database."""
+
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self) -> DiskCache:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,231 @@
+"""Minimal asyncio HTTP/1.1 client with per-host keep-alive pools.
+
+Only what metadata providers need is implemented: ``GET`` requests,
+``Content-Length``, chunked and close-delimited bodies, and TLS. Each host
+gets a :class:`ConnectionPool` of at most ``connections_per_host`` sockets
+that are reused across requests, so scraping thousands of titles costs a
+handful of TCP and TLS handshakes instead of one per title.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+import time
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+from urllib.parse import urlsplit
+
+#: Sent with every request unless overridden.
+USER_AGENT = "rom-library-organizer/0.1"
+
+
+@dataclass
+class Response:
+    """A complete HTTP response. Header names are lower case."""
+
+    status: int
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class TokenBucket:
+    """Allow ``rate`` acquisitions per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class _Connection:
+    """One keep-alive connection to a host."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+    async def get(self, target: str, headers: Mapping[str, str]) -> tuple[Response, bool]:
+        """Send a ``GET`` request and return the response and keep-alive flag."""
+
+        lines = [f"GET {target} HTTP/1.1"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by peer")
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        response = Response(int(status))
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response.headers[name.strip().lower()] = value.strip()
+
+        keep_alive = (
+            version == "HTTP/1.1" and response.headers.get("connection", "").lower() != "close"
+        )
+        if "chunked" in response.headers.get("transfer-encoding", "").lower():
+            response.body = await self._read_chunked()
+        elif "content-length" in response.headers:
+            response.body = await self.reader.readexactly(int(response.headers["content-length"]))
+        elif response.status in (204, 304) or 100 <= response.status < 200:
+            response.body = b""
+        else:
+            response.body = await self.reader.read()
+            keep_alive = False
+        return response, keep_alive
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b";", 1)[0], 16)
+            if size == 0:
+                # Skip trailers up to the terminating blank line.
+                while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+
+class ConnectionPool:
+    """Keep-alive connections to a single ``host:port``."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        tls: bool = False,
+        size: int = 4,
+        timeout: float = 30.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._ssl = ssl.create_default_context() if tls else None
+        self._idle: list[_Connection] = []
+        self._slots = asyncio.Semaphore(size)
+        #: Number of connections opened, useful to verify reuse.
+        self.opened = 0
+
+    async def _connect(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self._ssl, server_hostname=self.host if self._ssl else None
+        )
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    async def get(self, target: str, headers: Mapping[str, str]) -> Response:
+        """Send a request on an idle or new connection.
+
+        A request on a reused connection that the server has meanwhile
+        closed is retried once on a fresh connection.
+        """
+
+        async with self._slots:
+            while True:
+                reused = bool(self._idle)
+                conn = self._idle.pop() if reused else await self._connect()
+                try:
+                    response, keep_alive = await asyncio.wait_for(
+                        conn.get(target, headers), self.timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn.close()
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    conn.close()
+                    raise
+                if keep_alive:
+                    self._idle.append(conn)
+                else:
+                    conn.close()
+                return response
+
+    def close(self) -> None:
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+
+
+class HTTPClient:
+    """``GET`` client that pools connections per scheme, host and port.
+
+    Parameters
+    ----------
+    connections_per_host:
+        Maximum number of concurrent connections to one host.
+    timeout:
+        Seconds allowed for a single request and response.
+    """
+
+    def __init__(self, *, connections_per_host: int = 4, timeout: float = 30.0) -> None:
+        self.connections_per_host = connections_per_host
+        self.timeout = timeout
+        self._pools: dict[tuple[str, str, int], ConnectionPool] = {}
+
+    def pool(self, scheme: str, host: str, port: int) -> ConnectionPool:
+        key = (scheme, host, port)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = ConnectionPool(
+                host,
+                port,
+                tls=scheme == "https",
+                size=self.connections_per_host,
+                timeout=self.timeout,
+            )
+        return pool
+
+    async def get(self, url: str, headers: Mapping[str, str] | None = None) -> Response:
+        """Fetch ``url`` and return the complete response."""
+
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        request_headers = {"Host": host, "User-Agent": USER_AGENT, "Accept": "application/json"}
+        request_headers.update(headers or {})
+        return await self.pool(parts.scheme, parts.hostname, port).get(target, request_headers)
+
+    def close(self) -> None:
+        """Close every idle connection."""
+
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
@@ -0,0 +1,383 @@
+"""Delta sync of an organized layout to device mounts.
+
+Each device keeps a manifest, :data:`MANIFEST_NAME` at its root, that lists
+every file the sync placed there with the size and modification time its
+source had when copied, and optionally its SHA1::
+
+    {"format": "rom-library-organizer-manifest", "version": 1,
+     "files": {"roms/snes/Zelda (USA).sfc": {"size": 1048576,
+                                             "mtime_ns": 1700000000000000000}}}
+
+:func:`plan_layout` computes the layout once with the organizer's
+:meth:`~rom_library_organizer.platforms.PlatformOrganizer.rename` and
+:func:`plan_sync` compares it with a device's manifest: files whose source is unchanged are
+left alone, new or changed ones are copied and files the manifest lists
+but the layout no longer contains are deleted. Files the manifest does not
+list, such as saves, are never touched: one that sits where the layout
+would place a file is reported and the layout's file is not copied.
+:func:`sync_devices` runs the copies for several devices on one thread
+pool, with a bounded number of concurrent copies per device, and rewrites
+each manifest atomically at the end. With hashes, every source is hashed at
+most once, however many devices it is synced to.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from .collisions import resolve_collisions
+from .hashing import hash_file
+from .mover import DeviceLimiter, Enricher, _device_of, copy_file, plan_moves
+from .platforms import PlatformOrganizer
+from .scanner import RomInfo
+
+MANIFEST_NAME = ".rlo-manifest.json"
+MANIFEST_FORMAT = "rom-library-organizer-manifest"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ManifestEntry:
+    """What a device file was copied from."""
+
+    size: int
+    mtime_ns: int
+    sha1: str | None = None
+
+    def to_json(self) -> dict[str, int | str]:
+        record: dict[str, int | str] = {"size": self.size, "mtime_ns": self.mtime_ns}
+        if self.sha1 is not None:
+            record["sha1"] = self.sha1
+        return record
+
+
+def read_manifest(device: str | Path) -> dict[str, ManifestEntry]:
+    """Return the manifest of ``device``, empty if it has none.
+
+    Raises
+    ------
+    ValueError
+        If the manifest exists but was not written by this tool.
+    """
+
+    path = Path(device, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+    except FileNotFoundError:
+        return {}
+    if data.get("format") != MANIFEST_FORMAT:
+        raise ValueError(f"{path} is not a sync manifest")
+    if data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version: {data.get('version')}")
+    return {
+        name: ManifestEntry(record["size"], record["mtime_ns"], record.get("sha1"))
+        for name, record in data["files"].items()
+    }
+
+
+def write_manifest(device: str | Path, entries: dict[str, ManifestEntry]) -> None:
+    """Replace the manifest of ``device`` with ``entries``."""
+
+    path = Path(device, MANIFEST_NAME)
+    partial = path.with_name(f".{path.name}.part")
+    data = {
+        "format": MANIFEST_FORMAT,
+        "version": MANIFEST_VERSION,
+        "files": {name: entry.to_json() for name, entry in sorted(entries.items())},
+    }
+    try:
+        with open(partial, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, separators=(",", ":"))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+
+@dataclass
+class Layout:
+    """Files of an organized library, keyed by device-relative path."""
+
+    sources: dict[str, Path] = field(default_factory=dict)
+    stats: dict[str, os.stat_result] = field(default_factory=dict)
+    _sha1: dict[str, Future[str]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def sha1(self, name: str) -> str:
+        """Return the SHA1 of ``name``'s source, hashing it only the first time.
+
+        Safe to call from several threads; later callers wait for the first.
+        """
+
+        with self._lock:
+            first = name not in self._sha1
+            digest = self._sha1.setdefault(name, Future())
+        if first:
+            try:
+                digest.set_result(hash_file(self.sources[name]).sha1)
+            except BaseException as exc:
+                digest.set_exception(exc)
+        return digest.result()
+
+
+def plan_layout(
+    roms: Iterable[RomInfo],
+    organizer: PlatformOrganizer,
+    *,
+    on_collision: str = "error",
+    enrich: Enricher | None = None,
+) -> Layout:
+    """Rename ``roms`` once for ``organizer`` and stat every source.
+
+    ``on_collision`` and ``enrich`` are as for
+    :func:`~rom_library_organizer.collisions.resolve_collisions` and
+    :func:`~rom_library_organizer.mover.plan_moves`.
+
+    Raises
+    ------
+    CollisionError
+        With the ``"error"`` policy, if two files map to the same path.
+    """
+
+    layout = Layout()
+    moves = resolve_collisions(
+        plan_moves(roms, organizer, "", enrich=enrich),
+        policy=on_collision,
+        check_existing=False,
+    )
+    for move in moves:
+        try:
+            stat = os.stat(move.source)
+        except OSError:
+            continue
+        name = move.destination.as_posix()
+        layout.sources[name] = move.source
+        layout.stats[name] = stat
+    return layout
+
+
+@dataclass
+class SyncPlan:
+    """Work needed to bring one device in line with a :class:`Layout`."""
+
+    device: Path
+    manifest: dict[str, ManifestEntry]
+    #: Files to copy, with the manifest entry recorded once copied.
+    copy: dict[str, ManifestEntry] = field(default_factory=dict)
+    delete: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    #: Layout paths taken by a file the manifest does not list.
+    unmanaged: list[str] = field(default_factory=list)
+
+    @property
+    def bytes_to_copy(self) -> int:
+        return sum(entry.size for entry in self.copy.values())
+
+
+def plan_sync(layout: Layout, device: str | Path, *, hashes: bool = False) -> SyncPlan:
+    """Compare ``layout`` with the manifest of ``device``.
+
+    A file is unchanged when its source has the size and modification time
+    recorded in the manifest and the device copy still exists. With
+    ``hashes``, a source whose modification time changed but whose
+    size did not is hashed and left alone if its SHA1 matches the recorded
+    one. A file at a layout path that the manifest does not list was not
+    placed by the sync; it is added to :attr:`SyncPlan.unmanaged` instead of
+    being replaced.
+    """
+
+    device = Path(device)
+    manifest = read_manifest(device)
+    plan = SyncPlan(device, manifest)
+    for name, stat in layout.stats.items():
+        entry = ManifestEntry(stat.st_size, stat.st_mtime_ns)
+        known = manifest.get(name)
+        if known is not None and os.path.exists(device / name):
+            if (known.size, known.mtime_ns) == (entry.size, entry.mtime_ns):
+                plan.unchanged += 1
+                continue
+            if hashes and known.sha1 and known.size == entry.size:
+                entry.sha1 = layout.sha1(name)
+                if entry.sha1 == known.sha1:
+                    manifest[name] = entry
+                    plan.unchanged += 1
+                    continue
+        elif known is None and os.path.lexists(device / name):
+            plan.unmanaged.append(name)
+            continue
+        plan.copy[name] = entry
+    plan.delete = [name for name in manifest if name not in layout.stats]
+    return plan
+
+
+@dataclass
+class SyncReport:
+    """Outcome of syncing one device."""
+
+    device: Path
+    copied: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    bytes_copied: int = 0
+    errors: list[tuple[str, OSError]] = field(default_factory=list)
+    #: Layout paths left alone because the sync did not place their file.
+    unmanaged: list[str] = field(default_factory=list)
+
+
+def _remove_empty_parents(path: Path, root: Path) -> None:
+    for parent in path.parents:
+        if parent == root or not parent.is_relative_to(root):
+            return
+        try:
+            parent.rmdir()
+        except OSError:
+            return
+
+
+def _interleave(
+    plans: Sequence[SyncPlan], reports: Sequence[SyncReport]
+) -> Iterator[tuple[SyncPlan, SyncReport, str]]:
+    """Yield the files to copy one device at a time, round robin.
+
+    Copies queued for a single device would otherwise occupy every worker
+    while waiting for that device's slots.
+    """
+
+    queues = [(plan, report, iter(plan.copy)) for plan, report in zip(plans, reports)]
+    while queues:
+        remaining = []
+        for plan, report, names in queues:
+            name = next(names, None)
+            if name is not None:
+                yield plan, report, name
+                remaining.append((plan, report, names))
+        queues = remaining
+
+
+def sync_devices(
+    layout: Layout,
+    devices: Sequence[str | Path],
+    *,
+    workers: int = 8,
+    per_device: int = 2,
+    hashes: bool = False,
+    dry_run: bool = False,
+) -> list[SyncReport]:
+    """Bring every device of ``devices`` in line with ``layout``.
+
+    Parameters
+    ----------
+    layout:
+        The organized library, from :func:`plan_layout`.
+    devices:
+        Mount points to sync; each keeps its own manifest.
+    workers:
+        Threads copying files, shared by all devices.
+    per_device:
+        Maximum number of concurrent copies reading from or writing to any
+        single device.
+    hashes:
+        Store the SHA1 of every copied file in the manifest and compare
+        sources whose modification time changed by SHA1 before copying
+        them again (see :func:`plan_sync`).
+    dry_run:
+        Only compute what would be copied and deleted.
+
+    Returns
+    -------
+    list[SyncReport]
+        One report per device, in order. Copy and delete failures are
+        reported there; the file keeps its previous manifest entry, if any,
+        so the next sync retries it. Files the manifest does not list are
+        never replaced; those in the way of the layout are listed in
+        :attr:`SyncReport.unmanaged`.
+    """
+
+    plans = [plan_sync(layout, device, hashes=hashes) for device in devices]
+    if dry_run:
+        return [
+            SyncReport(
+                plan.device,
+                copied=len(plan.copy),
+                deleted=len(plan.delete),
+                unchanged=plan.unchanged,
+                bytes_copied=plan.bytes_to_copy,
+                unmanaged=plan.unmanaged,
+            )
+            for plan in plans
+        ]
+
+    # All sources usually live on one library volume; only devices are limited.
+    limiter = DeviceLimiter(max(1, workers), per_device)
+
+    def copy(plan: SyncPlan, name: str) -> ManifestEntry:
+        source = layout.sources[name]
+        destination = plan.device / name
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with limiter.hold(layout.stats[name].st_dev, _device_of(destination.parent)):
+            # Only a file the sync placed itself may be replaced.
+            copy_file(source, destination, replace=name in plan.manifest)
+        entry = plan.copy[name]
+        if hashes and entry.sha1 is None:
+            entry.sha1 = layout.sha1(name)
+        return entry
+
+    reports = [
+        SyncReport(plan.device, unchanged=plan.unchanged, unmanaged=plan.unmanaged)
+        for plan in plans
+    ]
+    for plan, report in zip(plans, reports):
+        for name in plan.delete:
+            try:
+                os.unlink(plan.device / name)
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                report.errors.append((name, exc))
+                continue
+            del plan.manifest[name]
+            _remove_empty_parents(plan.device / name, plan.device)
+            report.deleted += 1
+
+    def finish(
+        future: Future[ManifestEntry], plan: SyncPlan, report: SyncReport, name: str
+    ) -> None:
+        try:
+            entry = future.result()
+        except OSError as exc:
+            # The previous manifest entry, if any, makes the next sync retry.
+            report.errors.append((name, exc))
+            return
+        plan.manifest[name] = entry
+        report.copied += 1
+        report.bytes_copied += entry.size
+
+    limit = max(1, workers) * 4
+    pending: deque[tuple[Future[ManifestEntry], SyncPlan, SyncReport, str]] = deque()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="sync") as pool:
+            for plan, report, name in _interleave(plans, reports):
+                pending.append((pool.submit(copy, plan, name), plan, report, name))
+                if len(pending) >= limit:
+                    finish(*pending.popleft())
+            while pending:
+                finish(*pending.popleft())
+    finally:
+        # Record whatever was copied, even after an interruption.
+        for plan in plans:
+            write_manifest(plan.device, plan.manifest)
+    return reports
@@ -0,0 +1,189 @@
+"""Compact columnar storage for large scan results.
+
+A list of :class:`~rom_library_organizer.scanner.RomInfo` keeps a ``Path``
+object, a name string and an extension string alive for every file, which
+adds up to several hundred bytes per entry. :class:`RomTable` stores the
+same information in a few flat columns instead:
+
+* parent directories, extensions and platforms are interned once and
+  referenced by small integer ids held in :class:`array.array` columns;
+* sizes are an ``array('q')``;
+* file names are concatenated into one UTF-8 buffer with an offset column.
+
+Rows are turned back into ``RomInfo`` (and ``Path``) objects only when they
+are accessed, while :meth:`RomTable.filter`, :meth:`RomTable.group_by_platform`
+and :meth:`RomTable.total_size` work on the columns directly.
+"""
+
+from __future__ import annotations
+
+import os
+from array import array
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .scanner import RomInfo
+
+
+class _Interned:
+    """Bidirectional mapping between values and dense integer ids."""
+
+    def __init__(self, *initial: str | None) -> None:
+        self.values: list[str | None] = []
+        self.ids: dict[str | None, int] = {}
+        for value in initial:
+            self.id(value)
+
+    def id(self, value: str | None) -> int:
+        ident = self.ids.get(value)
+        if ident is None:
+            ident = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return ident
+
+
+class RomTable:
+    """Column store of scanned ROM files.
+
+    Only the fields of :class:`RomInfo` itself are kept; subclasses carrying
+    extra fields, such as archive members, are rejected.
+    """
+
+    def __init__(self, roms: Iterable[RomInfo] = ()) -> None:
+        self._dirs = _Interned()
+        self._exts = _Interned()
+        # Platform id 0 is "not identified".
+        self._platforms = _Interned(None)
+        self._dir = array("I")
+        self._ext = array("H")
+        self._platform = array("H")
+        self._size = array("q")
+        self._names = bytearray()
+        self._offsets = array("q", [0])
+        self.extend(roms)
+
+    def _empty_like(self) -> RomTable:
+        """Return an empty table sharing this table's interned values."""
+
+        table = RomTable()
+        table._dirs, table._exts, table._platforms = self._dirs, self._exts, self._platforms
+        return table
+
+    def append(self, rom: RomInfo) -> None:
+        """Add one scanned file."""
+
+        if type(rom) is not RomInfo:
+            raise TypeError(f"RomTable only stores RomInfo records, not {type(rom).__name__}")
+        self._dir.append(self._dirs.id(os.path.dirname(rom.path)))
+        self._ext.append(self._exts.id(rom.extension))
+        self._platform.append(self._platforms.id(rom.platform))
+        self._size.append(rom.size)
+        self._names += rom.name.encode("utf-8", "surrogateescape")
+        self._offsets.append(len(self._names))
+
+    def extend(self, roms: Iterable[RomInfo]) -> None:
+        """Add every file of ``roms``, e.g. straight from ``scan_roms``."""
+
+        for rom in roms:
+            self.append(rom)
+
+    def __len__(self) -> int:
+        return len(self._size)
+
+    def name(self, index: int) -> str:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._names[start:end].decode("utf-8", "surrogateescape")
+
+    def path(self, index: int) -> Path:
+        """Build the ``Path`` of row ``index``."""
+
+        return Path(self._dirs.values[self._dir[index]], self.name(index))
+
+    def __getitem__(self, index: int) -> RomInfo:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("RomTable index out of range")
+        name = self.name(index)
+        return RomInfo(
+            path=Path(self._dirs.values[self._dir[index]], name),
+            extension=self._exts.values[self._ext[index]],
+            size=self._size[index],
+            name=name,
+            platform=self._platforms.values[self._platform[index]],
+        )
+
+    def __iter__(self) -> Iterator[RomInfo]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def sizes(self) -> array:
+        """The size column, in row order."""
+
+        return self._size
+
+    def total_size(self) -> int:
+        """Return the combined size of every file in bytes."""
+
+        return sum(self._size)
+
+    def take(self, indices: Iterable[int]) -> RomTable:
+        """Return a new table holding rows ``indices`` in the given order."""
+
+        table = self._empty_like()
+        names, offsets = self._names, self._offsets
+        for index in indices:
+            table._dir.append(self._dir[index])
+            table._ext.append(self._ext[index])
+            table._platform.append(self._platform[index])
+            table._size.append(self._size[index])
+            table._names += names[offsets[index] : offsets[index + 1]]
+            table._offsets.append(len(table._names))
+        return table
+
+    def filter(
+        self,
+        predicate: Callable[[RomInfo], bool] | None = None,
+        *,
+        extensions: Iterable[str] | None = None,
+        platforms: Iterable[str | None] | None = None,
+        min_size: int | None = None,
+        max_size: int | None = None,
+    ) -> RomTable:
+        """Return the rows matching every given condition.
+
+        Extension, platform and size conditions are evaluated on the
+        columns; ``predicate`` is only called, with a materialized
+        :class:`RomInfo`, for rows that pass them.
+        """
+
+        indices: Iterable[int] = range(len(self))
+        if extensions is not None:
+            ext_ids = {self._exts.ids[e] for e in extensions if e in self._exts.ids}
+            column = self._ext
+            indices = [i for i in indices if column[i] in ext_ids]
+        if platforms is not None:
+            platform_ids = {self._platforms.ids[p] for p in platforms if p in self._platforms.ids}
+            column = self._platform
+            indices = [i for i in indices if column[i] in platform_ids]
+        if min_size is not None:
+            sizes = self._size
+            indices = [i for i in indices if sizes[i] >= min_size]
+        if max_size is not None:
+            sizes = self._size
+            indices = [i for i in indices if sizes[i] <= max_size]
+        if predicate is not None:
+            indices = [i for i in indices if predicate(self[i])]
+        return self.take(indices)
+
+    def group_by_platform(self) -> dict[str | None, RomTable]:
+        """Split the rows by platform; unidentified files are under ``None``."""
+
+        groups: dict[int, list[int]] = {}
+        for index, platform_id in enumerate(self._platform):
+            groups.setdefault(platform_id, []).append(index)
+        return {
+            self._platforms.values[platform_id]: self.take(indices)
+            for platform_id, indices in groups.items()
+        }
@@ -0,0 +1,333 @@
+"""User-defined destination layouts.
+
+A template is a destination path with fields taken from ``file_metadata``::
+
+    {platform}/{name|initial}/{name}[ ({region})][ - Disc {disc}]{extension}
+
+* ``{field}`` inserts a metadata value; ``/`` in the template separates
+  directories.
+* ``{field|filter|...}`` passes the value through filters, in order:
+  ``lower``, ``upper``, ``title``, ``initial`` (first letter or digit,
+  upper-cased, ``#`` otherwise), ``sanitize``, ``raw`` and
+  ``default:TEXT``.
+* ``[...]`` is an optional segment, rendered only when every field in it has
+  a value; segments may be nested.
+* A backslash makes the following brace, bracket or backslash literal.
+
+Every value is made safe for a single path component with
+:func:`~rom_library_organizer.renamer.sanitize_component` after its filters,
+and a value that is empty or only dots becomes ``_``, so metadata such as a
+scraped ``..`` cannot leave the output directory. ``raw`` skips that. The
+rendered path then has its empty and dot-only components replaced by ``_``,
+which also covers literal dots left next to an optional segment that did
+not render, as in ``a/.[{x}]./b``. A required field without a value renders
+as its ``default``, or ``Unknown``.
+
+:class:`Template` validates the source and compiles it once into a Python
+function, so rendering costs about as much as a hand-written
+:meth:`~rom_library_organizer.platforms.PlatformOrganizer.rename`.
+:class:`TemplatePlatformOrganizer` uses a template as an organizer.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, Union
+
+from . import profiling
+from .platforms.base import DEFAULT_EXTENSIONS, PlatformOrganizer
+from .renamer import SANITIZE_CACHE_SIZE, sanitize_component
+
+#: Filters accepted after ``|``; ``default`` takes an argument.
+FILTERS = ("lower", "upper", "title", "initial", "sanitize", "raw", "default")
+
+#: Text rendered for a required field without a value and without ``default``.
+MISSING = "Unknown"
+
+
+class TemplateError(ValueError):
+    """A template is malformed; the message points at the offending column."""
+
+
+@dataclass
+class _Field:
+    name: str
+    filters: list[tuple[str, str | None]] = field(default_factory=list)
+
+    @property
+    def default(self) -> str | None:
+        for name, argument in self.filters:
+            if name == "default":
+                return argument
+        return None
+
+
+@dataclass
+class _Optional:
+    nodes: list[_Node]
+
+
+_Node = Union[str, _Field, _Optional]
+
+
+def _initial(value: str) -> str:
+    for char in value:
+        if char.isalnum():
+            return char.upper() if char.isalpha() else "#"
+    return "#"
+
+
+@lru_cache(maxsize=SANITIZE_CACHE_SIZE)
+def _component(value: str) -> str:
+    """Sanitize ``value`` as one path component that is never ``.`` or ``..``."""
+
+    value = sanitize_component(value)
+    return value if value.strip(".") else "_"
+
+
+def _relative(path: str) -> str:
+    """Return ``path`` with components that could leave its root replaced by ``_``."""
+
+    # Empty and dot-only components always start at the beginning or after a "/".
+    if not (path.startswith((".", "/")) or path.endswith("/") or "/." in path or "//" in path):
+        if "\\" not in path:
+            return path
+    parts = path.replace("\\", "/").split("/")
+    return "/".join(part if part.strip(".") else "_" for part in parts)
+
+
+def _parse(source: str) -> list[_Node]:
+    """Parse ``source`` into literal strings, fields and optional segments."""
+
+    stack: list[tuple[list[_Node], int]] = [([], -1)]
+    literal: list[str] = []
+    i, n = 0, len(source)
+
+    def flush() -> None:
+        if literal:
+            stack[-1][0].append("".join(literal))
+            literal.clear()
+
+    while i < n:
+        char = source[i]
+        if char == "\\" and i + 1 < n and source[i + 1] in "{}[]\\":
+            literal.append(source[i + 1])
+            i += 2
+        elif char == "{":
+            end = source.find("}", i)
+            if end == -1:
+                raise TemplateError(f"Unclosed '{{' at column {i + 1}")
+            flush()
+            stack[-1][0].append(_parse_field(source[i + 1 : end], i + 1))
+            i = end + 1
+        elif char == "}":
+            raise TemplateError(f"Unmatched '}}' at column {i + 1}")
+        elif char == "[":
+            flush()
+            stack.append(([], i))
+            i += 1
+        elif char == "]":
+            if len(stack) == 1:
+                raise TemplateError(f"Unmatched ']' at column {i + 1}")
+            flush()
+            nodes, start = stack.pop()
+            if not any(_gates(node) for node in nodes):
+                raise TemplateError(f"Optional segment at column {start + 1} has no field")
+            stack[-1][0].append(_Optional(nodes))
+            i += 1
+        else:
+            literal.append(char)
+            i += 1
+    if len(stack) > 1:
+        raise TemplateError(f"Unclosed '[' at column {stack[-1][1] + 1}")
+    flush()
+    return stack[0][0]
+
+
+def _gates(node: _Node) -> bool:
+    """Whether ``node`` can make its optional segment disappear."""
+
+    return isinstance(node, _Optional) or (isinstance(node, _Field) and node.default is None)
+
+
+def _parse_field(text: str, column: int) -> _Field:
+    name, *filters = (part.strip() for part in text.split("|"))
+    if not name.isidentifier():
+        raise TemplateError(f"Invalid field name {name!r} at column {column}")
+    parsed = _Field(name)
+    for spec in filters:
+        filter_name, colon, argument = spec.partition(":")
+        if filter_name not in FILTERS:
+            raise TemplateError(f"Unknown filter: {filter_name} (at column {column})")
+        if (filter_name == "default") != bool(colon):
+            expected = "an" if filter_name == "default" else "no"
+            raise TemplateError(f"Filter {filter_name} takes {expected} argument")
+        if colon and ("/" in argument or (argument and not argument.strip("."))):
+            raise TemplateError(f"Invalid default {argument!r} at column {column}")
+        parsed.filters.append((filter_name, argument if colon else None))
+    return parsed
+
+
+class _Compiler:
+    """Generate the source of a render function from parsed nodes."""
+
+    def __init__(self) -> None:
+        self.lines = ["def render(metadata):", "    get = metadata.get"]
+        self.constants: dict[str, Any] = {}
+        self.counter = 0
+
+    def name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, value: Any) -> str:
+        key = self.name("c")
+        self.constants[key] = value
+        return key
+
+    def transform(self, variable: str, spec: _Field) -> str:
+        """Return an expression applying ``spec``'s filters to ``variable``."""
+
+        expression = f"str({variable})"
+        sanitized = False
+        for filter_name, _ in spec.filters:
+            if filter_name in ("lower", "upper", "title"):
+                expression = f"{expression}.{filter_name}()"
+                sanitized = False
+            elif filter_name == "initial":
+                expression = f"_initial({expression})"
+                sanitized = True
+            elif filter_name == "sanitize":
+                expression = f"_component({expression})"
+                sanitized = True
+            elif filter_name == "raw":
+                sanitized = True
+        return expression if sanitized else f"_component({expression})"
+
+    def emit(self, nodes: list[_Node], indent: str) -> str:
+        """Emit statements for ``nodes`` and return their concatenation expression."""
+
+        parts = []
+        for node in nodes:
+            if isinstance(node, str):
+                parts.append(self.constant(node))
+            elif isinstance(node, _Field):
+                variable = self.name("v")
+                default = node.default
+                fallback = self.constant(MISSING if default is None else default)
+                self.lines.append(f"{indent}{variable} = get({node.name!r})")
+                self.lines.append(
+                    f"{indent}{variable} = {self.transform(variable, node)} "
+                    f"if {variable} is not None and {variable} != '' else {fallback}"
+                )
+                parts.append(variable)
+            else:
+                parts.append(self.emit_optional(node, indent))
+        return " + ".join(parts) if parts else "''"
+
+    def emit_optional(self, node: _Optional, indent: str) -> str:
+        """Emit an optional segment and return the variable holding its text."""
+
+        segment = self.name("s")
+        self.lines.append(f"{indent}{segment} = ''")
+        values = {}
+        for child in node.nodes:
+            if isinstance(child, _Field) and child.default is None:
+                variable = self.name("v")
+                self.lines.append(f"{indent}{variable} = get({child.name!r})")
+                values[id(child)] = variable
+        condition = " and ".join(f"{v} is not None and {v} != ''" for v in values.values())
+        self.lines.append(f"{indent}if {condition or 'True'}:")
+        inner = indent + "    "
+        parts, nested = [], []
+        for child in node.nodes:
+            if id(child) in values:
+                parts.append(self.transform(values[id(child)], child))
+            elif isinstance(child, _Optional):
+                nested.append(self.emit_optional(child, inner))
+                parts.append(nested[-1])
+            else:
+                parts.append(self.emit([child], inner))
+        text = " + ".join(parts)
+        if not values:
+            # Without fields of its own, a segment shows when a nested one does.
+            text = f"({text}) if {' or '.join(nested)} else ''"
+        self.lines.append(f"{inner}{segment} = {text}")
+        return segment
+
+
+def _fields(nodes: Iterable[_Node]) -> Iterable[str]:
+    for node in nodes:
+        if isinstance(node, _Field):
+            yield node.name
+        elif isinstance(node, _Optional):
+            yield from _fields(node.nodes)
+
+
+class Template:
+    """A parsed, validated and compiled template.
+
+    Raises
+    ------
+    TemplateError
+        If ``source`` is malformed, or is absolute or contains ``..``.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        if not source.strip():
+            raise TemplateError("Empty template")
+        if source.startswith("/") or ".." in source.split("/"):
+            raise TemplateError("Templates must be relative paths without '..'")
+        nodes = _parse(source)
+        #: Names of every field the template uses.
+        self.fields = frozenset(_fields(nodes))
+        compiler = _Compiler()
+        result = compiler.emit(nodes, "    ")
+        compiler.lines.append(f"    return _relative({result})")
+        namespace: dict[str, Any] = {
+            "_component": _component,
+            "_relative": _relative,
+            "_initial": _initial,
+            **compiler.constants,
+        }
+        exec(compile("\n".join(compiler.lines), f"<template {source!r}>", "exec"), namespace)
+        #: The compiled function: ``render(file_metadata) -> str``.
+        self.render: Callable[[Mapping[str, Any]], str] = namespace["render"]
+
+    def __call__(self, file_metadata: Mapping[str, Any]) -> str:
+        return self.render(file_metadata)
+
+    def __repr__(self) -> str:
+        return f"Template({self.source!r})"
+
+
+class TemplatePlatformOrganizer(PlatformOrganizer):
+    """Organizer whose layout is a :class:`Template`.
+
+    Handles the same extensions as the built-in frontends.
+    """
+
+    SUPPORTED_EXTENSIONS = DEFAULT_EXTENSIONS
+
+    def __init__(self, template: str | Template) -> None:
+        self.template = template if isinstance(template, Template) else Template(template)
+        self._render = self.template.render
+
+    @classmethod
+    def is_supported(cls, file: Path) -> bool:
+        """Return ``True`` if ``file`` has a recognised ROM extension."""
+
+        return file.suffix.lower() in cls.SUPPORTED_EXTENSIONS
+
+    def rename(self, file_metadata: Mapping[str, Any]) -> str:
+        """Return the template rendered for ``file_metadata``."""
+
+        return self._render(file_metadata)
+
+    def rename_many(self, items: Iterable[Mapping[str, Any]]) -> list[str]:
+        if profiling.active is not None:
+            return super().rename_many(items)
+        return list(map(self._render, items))
@@ -0,0 +1,322 @@
+"""Watch a directory tree and report files once they have finished changing.
+
+On Linux :class:`Watcher` uses inotify through :mod:`ctypes`, so an idle
+folder costs no CPU: the process sleeps in :func:`select.select` until the
+kernel reports an event. Directories renamed or moved away lose their
+watches, and are watched again under their new path if that is still in the
+tree. Elsewhere, or when inotify is unavailable, it falls back to polling
+with an in-memory :class:`~rom_library_organizer.index.ScanIndex`, which
+only relists directories whose modification time changed. Both backends
+skip excluded and filtered-out directories without listing them.
+
+Writes in progress are debounced: a path is reported only after it has seen
+no new events, and its size and modification time have not changed, for
+``settle`` seconds.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from .index import ScanIndex
+from .scanner import _relative_prefix
+
+if TYPE_CHECKING:
+    from .filters import PathFilter
+
+# Event masks from <sys/inotify.h>.
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal recursive inotify wrapper."""
+
+    def __init__(self) -> None:
+        name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(name or "libc.so.6", use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+        self._paths: dict[int, str] = {}
+
+    def add_tree(self, root: str, skip: Callable[[str], bool]) -> list[str]:
+        """Watch ``root`` and every directory below it not matched by ``skip``.
+
+        Returns the files already present, which may have been created
+        before their directory was watched.
+        """
+
+        files: list[str] = []
+        for directory, dirs, names in os.walk(root):
+            dirs[:] = [d for d in dirs if not skip(os.path.join(directory, d))]
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                continue
+            self._paths[wd] = directory
+            files.extend(os.path.join(directory, name) for name in names)
+        return files
+
+    def remove_tree(self, root: str) -> None:
+        """Stop watching ``root`` and every directory below it.
+
+        Used when ``root`` was moved: its watches would otherwise keep
+        reporting events under the old path.
+        """
+
+        prefix = root + os.sep
+        for wd, directory in list(self._paths.items()):
+            if directory == root or directory.startswith(prefix):
+                del self._paths[wd]
+                self._libc.inotify_rm_watch(self.fd, wd)
+
+    def wait(self, timeout: float | None) -> bool:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(readable)
+
+    def read(self) -> Iterator[tuple[str, int]]:
+        """Yield ``(path, mask)`` for every queued event."""
+
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_IGNORED:
+                    self._paths.pop(wd, None)
+                    continue
+                if mask & IN_Q_OVERFLOW:
+                    yield "", mask
+                    continue
+                directory = self._paths.get(wd)
+                if directory is None:
+                    continue
+                # Events without a name concern the watched directory itself.
+                if not name:
+                    if mask & IN_MOVE_SELF:
+                        yield directory, mask | IN_ISDIR
+                    continue
+                yield os.path.join(directory, os.fsdecode(name)), mask
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Watcher:
+    """Report settled new or changed paths below ``root``.
+
+    Parameters
+    ----------
+    root:
+        Directory to watch recursively.
+    settle:
+        Seconds a path must stay unchanged before it is reported.
+    poll_interval:
+        Seconds between scans when the polling backend is used.
+    backend:
+        ``"inotify"``, ``"poll"`` or ``"auto"`` (inotify when available).
+    exclude:
+        Paths whose subtrees are ignored, e.g. an output folder inside
+        ``root``.
+    path_filter:
+        Rules relative to ``root``; directories it does not admit are
+        neither watched nor listed. Files are not checked here.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        settle: float = 2.0,
+        poll_interval: float = 1.0,
+        backend: str = "auto",
+        exclude: Iterable[str | Path] = (),
+        path_filter: PathFilter | None = None,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        self.path_filter = path_filter
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self._exclude = tuple(os.path.abspath(path) for path in exclude)
+        # Path -> (time of last change, (size, mtime_ns) at that time).
+        self._pending: dict[str, tuple[float, tuple[int, int] | None]] = {}
+        self._inotify: _Inotify | None = None
+        self._index: ScanIndex | None = None
+        if backend not in ("auto", "inotify", "poll"):
+            raise ValueError(f"Unknown watch backend: {backend}")
+        if backend != "poll":
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                if backend == "inotify":
+                    raise
+        if self._inotify is not None:
+            self._inotify.add_tree(self.root, self._skipped)
+        else:
+            self._index = ScanIndex(":memory:")
+            self._index.rescan(self.root, skip=self._skipped)
+        self._next_poll = time.monotonic() + poll_interval
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "poll"
+
+    def close(self) -> None:
+        """Release the inotify descriptor or polling index."""
+
+        if self._inotify is not None:
+            self._inotify.close()
+        if self._index is not None:
+            self._index.close()
+
+    def __enter__(self) -> Watcher:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _excluded(self, path: str) -> bool:
+        return any(path == ex or path.startswith(ex + os.sep) for ex in self._exclude)
+
+    def _skipped(self, directory: str) -> bool:
+        """Whether ``directory`` is excluded or not admitted by the path filter."""
+
+        if self._excluded(directory):
+            return True
+        if self.path_filter is None:
+            return False
+        return not self.path_filter.admits_dir(_relative_prefix(directory, self.root)[:-1])
+
+    def _touch(self, path: str, now: float) -> None:
+        if not self._excluded(path):
+            self._pending[path] = (now, _signature(path))
+
+    def _collect_inotify(self, timeout: float | None) -> None:
+        assert self._inotify is not None
+        if not self._inotify.wait(timeout):
+            return
+        now = time.monotonic()
+        for path, mask in self._inotify.read():
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost; treat the whole tree as changed.
+                for directory, _, names in os.walk(self.root):
+                    for name in names:
+                        self._touch(os.path.join(directory, name), now)
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_MOVED_FROM | IN_MOVE_SELF):
+                    self._inotify.remove_tree(path)
+                elif mask & (IN_CREATE | IN_MOVED_TO) and not self._skipped(path):
+                    for existing in self._inotify.add_tree(path, self._skipped):
+                        self._touch(existing, now)
+                continue
+            if mask & (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE):
+                self._touch(path, now)
+
+    def _collect_poll(self, timeout: float | None) -> None:
+        assert self._index is not None
+        now = time.monotonic()
+        delay = max(0.0, self._next_poll - now)
+        if timeout is not None and timeout < delay:
+            time.sleep(timeout)
+            return
+        time.sleep(delay)
+        now = time.monotonic()
+        self._next_poll = now + self.poll_interval
+        changes = self._index.rescan(self.root, skip=self._skipped)
+        for rom in (*changes.added, *changes.modified):
+            self._touch(str(rom.path), now)
+
+    def _settled(self) -> tuple[list[Path], float | None]:
+        """Return settled paths and the seconds until the next may settle."""
+
+        now = time.monotonic()
+        ready: list[Path] = []
+        wait: float | None = None
+        for path, (changed, signature) in list(self._pending.items()):
+            remaining = changed + self.settle - now
+            if remaining > 0:
+                wait = remaining if wait is None else min(wait, remaining)
+                continue
+            current = _signature(path)
+            if current is None:
+                del self._pending[path]
+            elif current != signature:
+                # Still being written without generating events we saw.
+                self._pending[path] = (now, current)
+                wait = self.settle if wait is None else min(wait, self.settle)
+            else:
+                del self._pending[path]
+                ready.append(Path(path))
+        return sorted(ready), wait
+
+    def poll(self, timeout: float | None = None) -> list[Path]:
+        """Wait up to ``timeout`` seconds and return paths that settled.
+
+        ``None`` blocks until at least one path is ready.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            ready, wait = self._settled()
+            if ready:
+                return ready
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if remaining == 0.0:
+                return []
+            if wait is not None:
+                remaining = wait if remaining is None else min(wait, remaining)
+            if self._inotify is not None:
+                self._collect_inotify(remaining)
+            else:
+                self._collect_poll(remaining)
+
+
+def _signature(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError as exc:
+        if exc.errno in (errno.ENOENT, errno.ENOTDIR):
+            return None
+        raise
+    return stat.st_size, stat.st_mtime_ns
+
@@ -0,0 +1,93 @@
+import zipfile
+import zlib
+from pathlib import Path
+
+from rom_library_organizer import hashing
+from rom_library_organizer.archives import ArchiveRomInfo, expand_archives, scan_archive
+from rom_library_organizer.dat import DatEntry, DatIndex
+from rom_library_organizer.scanner import scan_roms
+
+ROM_DATA = b"\x80\x37\x12\x40" + b"n64" * 100
+
+
+def _make_zip(path: Path) -> None:
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as handle:
+        handle.writestr("Super Mario 64 (USA).z64", ROM_DATA)
+        handle.writestr("readme.txt", "not a rom")
+        handle.writestr("extras/", "")
+
+
+def test_scan_archive_reads_central_directory(tmp_path: Path) -> None:
+    archive = tmp_path / "sm64.zip"
+    _make_zip(archive)
+
+    members = list(scan_archive(archive))
+
+    assert members == [
+        ArchiveRomInfo(
+            path=archive,
+            extension=".z64",
+            size=len(ROM_DATA),
+            name="Super Mario 64 (USA).z64",
+            member="Super Mario 64 (USA).z64",
+            crc32=f"{zlib.crc32(ROM_DATA):08x}",
+        )
+    ]
+    assert members[0].metadata()["name"] == "Super Mario 64"
+    assert members[0].metadata()["region"] == "USA"
+
+
+def test_expand_archives_after_scan(tmp_path: Path) -> None:
+    _make_zip(tmp_path / "sm64.zip")
+    (tmp_path / "broken.zip").write_bytes(b"not a zip")
+    (tmp_path / "Tetris.gb").write_bytes(b"gb")
+
+    assert [rom.name for rom in scan_roms(tmp_path)] == ["Tetris.gb"]
+    names = sorted(rom.name for rom in expand_archives(scan_roms(tmp_path, archives=True)))
+    assert names == ["Super Mario 64 (USA).z64", "Tetris.gb"]
+
+
+def test_identify_archive_members_without_hashing(tmp_path: Path, monkeypatch) -> None:
+    _make_zip(tmp_path / "sm64.zip")
+    entry = DatEntry(
+        game="Super Mario 64 (USA)",
+        rom_name="Super Mario 64 (USA).z64",
+        platform="Nintendo 64",
+        size=len(ROM_DATA),
+        crc32=f"{zlib.crc32(ROM_DATA):08x}",
+        sha1="",
+    )
+
+    def fail(path, chunk_size=0):
+        raise AssertionError("archive members must not be hashed")
+
+    monkeypatch.setattr(hashing, "hash_file", fail)
+    results = list(DatIndex([entry]).identify(expand_archives(scan_roms(tmp_path, archives=True))))
+
+    assert [(rom.member, match) for rom, match in results] == [("Super Mario 64 (USA).z64", entry)]
+
+
+def test_identify_yields_archive_members_as_they_arrive(tmp_path: Path) -> None:
+    crc32 = f"{zlib.crc32(ROM_DATA):08x}"
+    entry = DatEntry("Game", "Game.z64", "Nintendo 64", len(ROM_DATA), crc32, "")
+    pulled = 0
+
+    def members():
+        nonlocal pulled
+        for number in range(1000):
+            pulled += 1
+            name = f"Game {number}.z64"
+            yield ArchiveRomInfo(
+                path=tmp_path / f"{number}.zip",
+                extension=".z64",
+                size=len(ROM_DATA),
+                name=name,
+                member=name,
+                crc32=crc32,
+            )
+
+    results = DatIndex([entry]).identify(members())
+
+    rom, match = next(results)
+    assert (rom.member, match) == ("Game 0.z64", entry)
+    assert pulled == 1
@@ -0,0 +1,116 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from rom_library_organizer.cli import main
+from rom_library_organizer.collisions import CollisionError, resolve_collisions
+from rom_library_organizer.mover import Move
+
+
+def _plan(out: Path) -> list[Move]:
+    return [
+        Move(Path("/src/b/Game.gba"), out / "gba" / "Game.gba"),
+        Move(Path("/src/a/game.GBA"), out / "gba" / "game.gba"),
+        # "é" precomposed and as "e" plus a combining accent.
+        Move(Path("/src/Pokémon.gb"), out / "gb" / "Pokémon.gb"),
+        Move(Path("/src/Pokémon.gb"), out / "gb" / "Pokémon.gb"),
+        Move(Path("/src/Tetris.gb"), out / "gb" / "Tetris.gb"),
+        Move(Path("/src/Tetris.gb"), out / "gb" / "Tetris.gb"),
+    ]
+
+
+def test_error_policy_reports_every_collision(tmp_path: Path) -> None:
+    with pytest.raises(CollisionError) as info:
+        resolve_collisions(_plan(tmp_path))
+    found = [[str(move.source) for move in c.moves] for c in info.value.collisions]
+    assert found == [
+        ["/src/Pokémon.gb", "/src/Pokémon.gb"],
+        ["/src/a/game.GBA", "/src/b/Game.gba"],
+    ]
+    # Case-sensitive comparison still catches the Unicode duplicate.
+    with pytest.raises(CollisionError) as info:
+        resolve_collisions(_plan(tmp_path), case_insensitive=False)
+    assert len(info.value.collisions) == 1
+
+
+def test_skip_and_suffix_policies_are_deterministic(tmp_path: Path) -> None:
+    (tmp_path / "gb").mkdir()
+    (tmp_path / "gb" / "TETRIS.gb").write_bytes(b"old")
+    (tmp_path / "gb" / "Tetris (2).gb").write_bytes(b"old")
+
+    skipped = resolve_collisions(_plan(tmp_path), policy="skip")
+    assert [str(m.source) for m in skipped] == ["/src/a/game.GBA", "/src/Pokémon.gb"]
+
+    suffixed = resolve_collisions(list(reversed(_plan(tmp_path))), policy="suffix")
+    names = {str(m.source): m.destination.name for m in suffixed}
+    assert names == {
+        "/src/Tetris.gb": "Tetris (3).gb",
+        "/src/Pokémon.gb": "Pokémon.gb",
+        "/src/Pokémon.gb": "Pokémon (2).gb",
+        "/src/a/game.GBA": "game.gba",
+        "/src/b/Game.gba": "Game (2).gba",
+    }
+    assert len(suffixed) == 5
+
+
+def test_cli_aborts_before_placing_anything(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    (source / "usa").mkdir(parents=True)
+    (source / "eur").mkdir()
+    (source / "usa" / "Tetris.gb").write_bytes(b"usa")
+    (source / "eur" / "tetris.gb").write_bytes(b"eur")
+    (source / "Zelda.gb").write_bytes(b"rom")
+    out = tmp_path / "out"
+
+    main([str(source), "batocera", "--output", str(out), "--no-detect"])
+    assert "1 destination collisions; nothing was placed." in capsys.readouterr().out
+    assert not out.exists()
+
+    main([str(source), "batocera", "--output", str(out), "--on-collision", "suffix"])
+    placed = sorted(p.name for p in (out / "unknown").iterdir())
+    # "eur/tetris.gb" sorts first and keeps the name.
+    assert placed == ["Tetris (2).gb", "Zelda.gb", "tetris.gb"]
+
+
+def test_files_placed_by_an_earlier_run_are_not_collisions(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    (source / "usa").mkdir(parents=True)
+    (source / "eur").mkdir()
+    (source / "usa" / "Tetris.gb").write_bytes(b"usa")
+    (source / "eur" / "tetris.gb").write_bytes(b"eur")
+    out = tmp_path / "out"
+
+    for mode in ("hardlink", "copy"):
+        args = [str(source), "batocera", "romm", "--output", str(out / mode), "--mode", mode]
+        main([*args, "--on-collision", "suffix"])
+        main([*args, "--on-collision", "suffix"])
+        output = capsys.readouterr().out
+        assert "Skipped 4 files already placed by an earlier run." in output
+        assert "collisions" not in output
+        placed = sorted(p.name for p in (out / mode / "batocera" / "unknown").iterdir())
+        assert placed == ["Tetris (2).gb", "tetris.gb"]
+
+    # A different file at the destination still collides.
+    (source / "eur" / "tetris.gb").write_bytes(b"changed")
+    main([str(source), "batocera", "--output", str(out / "copy" / "batocera"), "--mode", "copy"])
+    assert "destination collisions; nothing was placed." in capsys.readouterr().out
+
+
+def test_a_different_dump_with_the_same_size_and_time_collides(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Tetris.gb").write_bytes(b"rev0")
+    out = tmp_path / "out"
+    existing = out / "unknown" / "Tetris.gb"
+    existing.parent.mkdir(parents=True)
+    existing.write_bytes(b"rev1")
+    # TorrentZip'd sets share one timestamp, and dumps a power-of-two size.
+    for path in (source / "Tetris.gb", existing):
+        os.utime(path, ns=(0, 1_000_000_000))
+
+    main([str(source), "batocera", "--output", str(out), "--mode", "copy"])
+    output = capsys.readouterr().out
+    assert "already placed" not in output
+    assert "destination collisions; nothing was placed." in output
+    assert existing.read_bytes() == b"rev1"
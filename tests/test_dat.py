@@ -0,0 +1,94 @@
+import hashlib
+import zlib
+from dataclasses import replace
+from pathlib import Path
+
+from rom_library_organizer.dat import DatIndex, parse_dat
+from rom_library_organizer.platforms.batocera import BatoceraPlatformOrganizer
+from rom_library_organizer.scanner import scan_roms
+
+DISC_DATA = b"disc two contents"
+CART_DATA = b"cartridge"
+
+
+def _write_dat(path: Path) -> None:
+    path.write_text(
+        f"""<?xml version="1.0"?>
+<datafile>
+  <header><name>Sony - PlayStation</name></header>
+  <game name="Final Fantasy VII (USA) (Disc 2)">
+    <rom name="Final Fantasy VII (USA) (Disc 2).bin" size="{len(DISC_DATA)}"
+         crc="{zlib.crc32(DISC_DATA):08X}" sha1="{hashlib.sha1(DISC_DATA).hexdigest()}"/>
+  </game>
+  <game name="Other Game (Japan)">
+    <rom name="Other Game (Japan).bin" size="{len(CART_DATA)}" crc="{zlib.crc32(CART_DATA):08X}"/>
+  </game>
+</datafile>
+"""
+    )
+
+
+def test_parse_dat_streams_entries(tmp_path: Path) -> None:
+    dat = tmp_path / "psx.dat"
+    _write_dat(dat)
+
+    entries = list(parse_dat(dat))
+
+    assert [entry.game for entry in entries] == [
+        "Final Fantasy VII (USA) (Disc 2)",
+        "Other Game (Japan)",
+    ]
+    assert entries[0].platform == "PlayStation"
+    assert entries[1].sha1 == ""
+
+
+def test_identify_fills_rename_metadata(tmp_path: Path) -> None:
+    dat = tmp_path / "psx.dat"
+    _write_dat(dat)
+    library = tmp_path / "roms"
+    library.mkdir()
+    (library / "ff7_2.bin").write_bytes(DISC_DATA)
+    (library / "unknown.bin").write_bytes(b"no entry has this size at all")
+
+    index = DatIndex.from_files(dat)
+    results = list(index.identify(scan_roms(library), processes=0))
+
+    assert len(results) == 1
+    rom, entry = results[0]
+    assert rom.name == "ff7_2.bin"
+    metadata = entry.metadata()
+    assert metadata == {
+        "name": "Final Fantasy VII",
+        "title": "Final Fantasy VII",
+        "platform": "PlayStation",
+        "extension": ".bin",
+        "region": "USA",
+        "disc": "2",
+    }
+    assert BatoceraPlatformOrganizer().rename(metadata) == "psx/Final Fantasy VII (USA) (Disc 2).bin"
+
+
+def test_lookup_by_size_and_crc(tmp_path: Path) -> None:
+    dat = tmp_path / "psx.dat"
+    _write_dat(dat)
+    index = DatIndex.from_files(dat)
+
+    entry = index.lookup(len(CART_DATA), crc32=f"{zlib.crc32(CART_DATA):08x}")
+
+    assert entry is not None and entry.game == "Other Game (Japan)"
+    assert index.lookup(len(CART_DATA) + 1, crc32=f"{zlib.crc32(CART_DATA):08x}") is None
+    assert not index.has_size(1)
+
+
+def test_first_entry_for_a_key_wins(tmp_path: Path) -> None:
+    dat = tmp_path / "psx.dat"
+    _write_dat(dat)
+    entries = list(parse_dat(dat))
+    renamed = [replace(entry, game=f"{entry.game} [alt]") for entry in entries]
+
+    index = DatIndex(entries + renamed)
+
+    assert len(index) == 4
+    disc = index.lookup(len(DISC_DATA), sha1=hashlib.sha1(DISC_DATA).hexdigest())
+    assert disc is entries[0]
+    assert index.lookup(len(CART_DATA), crc32=f"{zlib.crc32(CART_DATA):08x}") is entries[1]
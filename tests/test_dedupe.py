@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+
+from rom_library_organizer import dedupe
+from rom_library_organizer.dedupe import find_duplicates, hardlink_duplicates
+from rom_library_organizer.mover import MoveResult
+from rom_library_organizer.scanner import scan_roms
+
+
+def _library(tmp_path: Path) -> Path:
+    root = tmp_path / "roms"
+    root.mkdir()
+    big = os.urandom(300_000)
+    (root / "Game (USA).bin").write_bytes(big)
+    (root / "Game (Copy).bin").write_bytes(big)
+    # Same size and ends as ``big`` but a different middle byte.
+    (root / "Near Miss.bin").write_bytes(big[:150_000] + bytes([big[150_000] ^ 1]) + big[150_001:])
+    (root / "small.gb").write_bytes(b"cart" * 100)
+    (root / "small copy.gb").write_bytes(b"cart" * 100)
+    (root / "unique.nes").write_bytes(b"x" * 123)
+    os.link(root / "Game (USA).bin", root / "Game (Linked).bin")
+    return root
+
+
+def test_find_duplicates_stages(tmp_path: Path) -> None:
+    root = _library(tmp_path)
+    report = find_duplicates(scan_roms(root))
+
+    sets = {frozenset(rom.path.name for rom in dup.files) for dup in report.sets}
+    # The near miss only differs in the middle; the existing hardlink is no waste.
+    assert sets == {
+        frozenset({"Game (USA).bin", "Game (Linked).bin", "Game (Copy).bin"}),
+        frozenset({"small copy.gb", "small.gb"}),
+    }
+    assert report.wasted == 300_000 + 400
+    # The near miss shares its ends, so all three large files are hashed in full;
+    # the file with a unique size is never read.
+    assert report.bytes_read == 3 * 2 * dedupe.SAMPLE_SIZE + 3 * 300_000 + 800
+
+
+def test_unique_sizes_are_not_opened(tmp_path: Path, monkeypatch) -> None:
+    root = _library(tmp_path)
+    sampled = []
+    original = dedupe._sample
+    monkeypatch.setattr(
+        dedupe, "_sample", lambda path, *args: sampled.append(path.name) or original(path, *args)
+    )
+    find_duplicates(scan_roms(root))
+    assert "unique.nes" not in sampled
+
+
+def test_hardlink_duplicates(tmp_path: Path) -> None:
+    root = _library(tmp_path)
+    report = find_duplicates(scan_roms(root))
+    assert hardlink_duplicates(report.sets, dry_run=True) == report.wasted
+    assert hardlink_duplicates(report.sets) == report.wasted
+
+    for dup in report.sets:
+        inodes = {os.stat(rom.path).st_ino for rom in dup.files}
+        assert len(inodes) == 1
+    assert (root / "small copy.gb").read_bytes() == b"cart" * 100
+    assert not list(root.glob(".*"))
+    assert not find_duplicates(scan_roms(root)).sets
+
+
+def test_hardlink_duplicates_survives_leftovers_and_vanished_files(tmp_path: Path) -> None:
+    root = _library(tmp_path)
+    report = find_duplicates(scan_roms(root))
+    # Left by an interrupted run with the old fixed temporary name.
+    (root / ".small copy.gb.dedupe").write_bytes(b"stale")
+    (root / "Game (USA).bin").unlink()
+
+    failed: list[MoveResult] = []
+    assert hardlink_duplicates(report.sets, failed=failed) == report.wasted
+    assert [result.move.destination.name for result in failed] == ["Game (USA).bin"]
+    assert isinstance(failed[0].error, FileNotFoundError)
+    assert os.stat(root / "small copy.gb").st_ino == os.stat(root / "small.gb").st_ino
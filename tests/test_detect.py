@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from rom_library_organizer import detect
+from rom_library_organizer.detect import SignatureTable, detect_platform, detect_platforms
+from rom_library_organizer.platforms.batocera import BatoceraPlatformOrganizer
+from rom_library_organizer.scanner import scan_roms
+
+
+def _write(path: Path, size: int, patches: dict[int, bytes]) -> Path:
+    data = bytearray(size)
+    for offset, magic in patches.items():
+        data[offset : offset + len(magic)] = magic
+    path.write_bytes(bytes(data))
+    return path
+
+
+def test_detect_platform_from_fixed_offsets(tmp_path: Path) -> None:
+    cases = {
+        "Nintendo Entertainment System": (0x4000, {0: b"NES\x1a"}),
+        "Nintendo 64": (0x1000, {0: b"\x37\x80\x40\x12"}),
+        "Sega Genesis": (0x400, {0x100: b"SEGA MEGA DRIVE"}),
+        "Game Boy Color": (0x8000, {0x104: b"\xce\xed\x66\x66\xcc\x0d\x00\x0b", 0x143: b"\xc0"}),
+        "Sony PlayStation": (0x10000, {0x8000: b"\x01CD001", 0x8008: b"PLAYSTATION"}),
+    }
+    for platform, (size, patches) in cases.items():
+        assert detect_platform(_write(tmp_path / "game.bin", size, patches)) == platform
+    assert detect_platform(_write(tmp_path / "blank.bin", 64, {})) is None
+
+
+def test_signature_table_coalesces_reads() -> None:
+    table = SignatureTable()
+    # Cartridge headers share one window; the two PVD locations add two more.
+    assert len(table.windows) == 3
+    assert table.windows[0][0] == 0
+
+
+def test_detect_platforms_reads_only_headers(tmp_path: Path, monkeypatch) -> None:
+    _write(tmp_path / "disc.bin", 0x40000, {0x10: b"SEGA SEGASATURN "})
+    _write(tmp_path / "cart.bin", 0x400, {0x100: b"SEGA GENESIS"})
+    reads = []
+    real_pread = detect.os.pread
+
+    def pread(fd: int, length: int, offset: int) -> bytes:
+        reads.append(length)
+        return real_pread(fd, length, offset)
+
+    monkeypatch.setattr(detect.os, "pread", pread)
+    roms = list(detect_platforms(scan_roms(tmp_path)))
+
+    assert [(rom.name, rom.platform) for rom in roms] == [
+        ("cart.bin", "Sega Genesis"),
+        ("disc.bin", "Sega Saturn"),
+    ]
+    assert sum(reads) < 1024
+    organizer = BatoceraPlatformOrganizer()
+    assert organizer.rename(roms[1].metadata()) == "saturn/disc.bin"
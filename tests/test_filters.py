@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+
+from rom_library_organizer import scanner
+from rom_library_organizer.cli import main
+from rom_library_organizer.filters import PRESETS, PathFilter, parse_size
+from rom_library_organizer.scanner import scan_paths, scan_roms
+
+
+def test_gitignore_rules() -> None:
+    rules = PathFilter(
+        [
+            "media/",
+            "*.bak",
+            "/bios",
+            "**/cache/**",
+            "saves/*.sav",
+            "\\#snapshot/",
+            "*.iso",
+            "!Keep*.iso",
+            "!/gba/media/",
+        ]
+    )
+    assert not rules.admits_dir("media")
+    assert not rules.admits_dir("snes/media")
+    assert rules.admits_file("snes/media")  # directory-only rule
+    assert rules.admits_dir("gba/media")  # re-included, the last match wins
+    assert not rules.admits_file("snes/Game.sfc.bak")
+    assert not rules.admits_dir("bios") and rules.admits_dir("snes/bios")
+    assert rules.admits_dir("a/cache") and not rules.admits_file("a/cache/b/x.gb")
+    assert not rules.admits_file("saves/x.sav") and rules.admits_file("gba/saves/x.sav")
+    assert not rules.admits_dir("#snapshot")
+    assert not rules.admits_file("psx/Game.iso") and rules.admits_file("psx/Keep Me.iso")
+    assert not rules.admits("snes/media/Game.sfc", 10)
+
+    sized = PathFilter(extensions=["GBA"], min_size=parse_size("1K"), max_size=parse_size("2K"))
+    assert sized.admits_file("a/Game.gba") and not sized.admits_file("a/Game.nes")
+    assert not sized.admits_size(1023) and sized.admits_size(2048)
+    assert parse_size("1.5M") == 3 << 19
+    with pytest.raises(ValueError):
+        parse_size("big")
+
+
+def test_scan_prunes_excluded_directories(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "snes" / "images").mkdir(parents=True)
+    (tmp_path / "snes" / "videos").mkdir()
+    (tmp_path / "snes" / "Zelda.sfc").write_bytes(b"x" * 100)
+    (tmp_path / "snes" / "Tiny.sfc").write_bytes(b"x")
+    (tmp_path / "snes" / "images" / "Zelda.sfc").write_bytes(b"x" * 100)
+    (tmp_path / "snes" / "videos" / "Zelda.sfc").write_bytes(b"x" * 100)
+
+    listed = []
+    original = scanner._list_dir
+
+    def spy(path, *args):
+        listed.append(Path(path).name)
+        return original(path, *args)
+
+    monkeypatch.setattr(scanner, "_list_dir", spy)
+    path_filter = PathFilter(PRESETS["batocera"], min_size=10)
+    roms = list(scan_roms(tmp_path, workers=1, path_filter=path_filter))
+    assert [rom.name for rom in roms] == ["Zelda.sfc"]
+    assert sorted(listed) == sorted([tmp_path.name, "snes"])
+
+    changed = [tmp_path / "snes" / "images", tmp_path / "snes" / "Zelda.sfc"]
+    found = list(scan_paths(changed, path_filter=path_filter, root=tmp_path))
+    assert [rom.path for rom in found] == [tmp_path / "snes" / "Zelda.sfc"]
+
+
+def test_cli_filter_options(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    (source / "media").mkdir(parents=True)
+    (source / "Metroid.nes").write_bytes(b"rom")
+    (source / "Tetris.gb").write_bytes(b"rom")
+    (source / "media" / "Mario.nes").write_bytes(b"rom")
+    output = tmp_path / "out"
+
+    main(
+        [str(source), "batocera", "--output", str(output), "--mode", "copy"]
+        + ["--filter-preset", "batocera", "--extension", "nes"]
+    )
+    assert sorted(p.name for p in output.rglob("*.*")) == ["Metroid.nes"]
+    with pytest.raises(SystemExit):
+        main([str(source), "batocera", "--min-size", "2K", "--max-size", "1K"])
+    assert "exceeds" in capsys.readouterr().err
@@ -0,0 +1,116 @@
+from pathlib import Path
+
+from rom_library_organizer.cli import main
+from rom_library_organizer.gamelist import Game, merge_gamelist, read_games
+from rom_library_organizer.platforms.batocera import BatoceraPlatformOrganizer
+from rom_library_organizer.platforms.knulli import KnulliPlatformOrganizer
+
+EXISTING = """<?xml version="1.0"?>
+<gameList>
+\t<provider><System>snes</System></provider>
+\t<game id="1">
+\t\t<path>./Zelda (USA).sfc</path>
+\t\t<name>The Legend of Zelda</name>
+\t\t<desc>Scraped &amp; kept</desc>
+\t</game>
+\t<game>
+\t\t<path>Old.sfc</path>
+\t\t<name>Old</name>
+\t</game>
+\t<game>
+\t\t<path>./Gone.sfc</path>
+\t\t<name>Gone</name>
+\t</game>
+</gameList>
+"""
+
+
+def test_merge_keeps_untouched_entries(tmp_path: Path) -> None:
+    path = tmp_path / "gamelist.xml"
+    path.write_text(EXISTING)
+    stats = merge_gamelist(
+        path,
+        added=[
+            Game("Zelda (USA).sfc", {"name": "Zelda", "region": "USA"}),
+            Game("./Metroid.sfc", {"name": "Super Metroid"}),
+        ],
+        moved={"./Old.sfc": "New.sfc"},
+        removed=["Gone.sfc"],
+    )
+    assert (stats.added, stats.updated, stats.moved, stats.removed) == (1, 1, 1, 1)
+    assert not stats.appended
+    games = {game.path: game.fields for game in read_games(path)}
+    assert games == {
+        "./Zelda (USA).sfc": {
+            "name": "The Legend of Zelda",
+            "desc": "Scraped & kept",
+            "region": "USA",
+        },
+        "./New.sfc": {"name": "Old"},
+        "./Metroid.sfc": {"name": "Super Metroid"},
+    }
+    text = path.read_text()
+    assert '<game id="1">' in text and "<System>snes</System>" in text
+    assert not list(tmp_path.glob(".*.part"))
+
+
+def test_new_games_are_appended_without_parsing(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "gamelist.xml"
+    path.write_text(EXISTING)
+    monkeypatch.setattr(
+        "rom_library_organizer.gamelist._top_level",
+        lambda path: (_ for _ in ()).throw(AssertionError("parsed")),
+    )
+    stats = merge_gamelist(path, added=[Game.from_metadata("Chrono Trigger (USA).sfc")])
+    assert stats.appended and stats.added == 1
+    assert path.read_text().startswith(EXISTING.removesuffix("</gameList>\n"))
+    monkeypatch.undo()
+    games = list(read_games(path))
+    expected = Game("./Chrono Trigger (USA).sfc", {"name": "Chrono Trigger", "region": "USA"})
+    assert games[-1] == expected
+    assert len(games) == 4
+
+    # An already listed game needs the full merge.
+    stats = merge_gamelist(path, added=[Game.from_metadata("Zelda (USA).sfc")])
+    assert not stats.appended and stats.updated == 1
+
+
+def test_merge_keeps_declaration_root_attributes_and_comments(tmp_path: Path) -> None:
+    path = tmp_path / "gamelist.xml"
+    path.write_bytes(
+        "<?xml version='1.0' encoding='ISO-8859-1'?>\n"
+        "<!-- Written by a scraper -->\n"
+        '<gameList version="2" source="Screenscraper">\n'
+        "\t<!-- Favourites first -->\n"
+        "\t<game><path>./Pokémon.gb</path><name>Pokémon</name></game>\n"
+        "\t<game><path>./Gone.gb</path></game>\n"
+        "</gameList>\n".encode("latin-1")
+    )
+
+    merge_gamelist(path, added=[Game("Ōkami.gb", {"name": "Ōkami"})], removed=["Gone.gb"])
+
+    text = path.read_bytes().decode("latin-1")
+    assert text.startswith(
+        "<?xml version='1.0' encoding='ISO-8859-1'?>\n"
+        "<!-- Written by a scraper -->\n"
+        '<gameList version="2" source="Screenscraper">\n'
+        "\t<!-- Favourites first -->\n"
+        "\t<game><path>./Pokémon.gb</path><name>Pokémon</name></game>\n"
+    )
+    assert "Gone" not in text
+    games = {game.path: game.fields["name"] for game in read_games(path)}
+    assert games == {"./Pokémon.gb": "Pokémon", "./Ōkami.gb": "Ōkami"}
+
+
+def test_cli_updates_system_gamelists(tmp_path: Path) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Metroid (USA).nes").write_bytes(b"rom")
+    output = tmp_path / "out"
+
+    main([str(source), "batocera", "--output", str(output), "--mode", "copy", "--gamelist"])
+    assert [g.path for g in read_games(output / "unknown" / "gamelist.xml")] == [
+        "./Metroid (USA).nes"
+    ]
+    assert BatoceraPlatformOrganizer().gamelist_dir("bios/scph1001.bin") is None
+    assert KnulliPlatformOrganizer().gamelist_dir("roms/snes/Zelda.sfc") == "roms/snes"
@@ -0,0 +1,46 @@
+import hashlib
+import zlib
+from pathlib import Path
+
+from rom_library_organizer import hashing
+from rom_library_organizer.hashing import HashCache, hash_file, hash_roms
+from rom_library_organizer.scanner import scan_roms
+
+
+def test_hash_file_single_pass_matches_hashlib(tmp_path: Path) -> None:
+    data = bytes(range(256)) * 1000
+    rom = tmp_path / "game.gba"
+    rom.write_bytes(data)
+
+    hashes = hash_file(rom, chunk_size=4096)
+
+    assert hashes.crc32 == f"{zlib.crc32(data):08x}"
+    assert hashes.md5 == hashlib.md5(data).hexdigest()
+    assert hashes.sha1 == hashlib.sha1(data).hexdigest()
+
+
+def test_hash_roms_uses_process_pool_for_large_files(tmp_path: Path) -> None:
+    (tmp_path / "small.nes").write_bytes(b"small")
+    (tmp_path / "disc.iso").write_bytes(b"large" * 100)
+
+    results = {rom.name: hashes for rom, hashes in hash_roms(scan_roms(tmp_path), processes=1)}
+
+    assert results["small.nes"].sha1 == hashlib.sha1(b"small").hexdigest()
+    assert results["disc.iso"].sha1 == hashlib.sha1(b"large" * 100).hexdigest()
+
+
+def test_hash_roms_skips_cached_files(tmp_path: Path, monkeypatch) -> None:
+    rom = tmp_path / "game.sfc"
+    rom.write_bytes(b"rom data")
+
+    with HashCache(tmp_path / "hashes.db") as cache:
+        first = list(hash_roms(scan_roms(tmp_path), cache=cache, processes=0))
+
+    def fail(path, chunk_size=0):
+        raise AssertionError(f"{path} hashed again")
+
+    monkeypatch.setattr(hashing, "hash_file", fail)
+    with HashCache(tmp_path / "hashes.db") as cache:
+        second = list(hash_roms(scan_roms(tmp_path), cache=cache, processes=0))
+
+    assert first == second
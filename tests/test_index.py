@@ -0,0 +1,68 @@
+import os
+from pathlib import Path
+
+from rom_library_organizer.index import ScanIndex
+
+
+def _bump_mtime(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_rescan_reports_added_removed_and_modified(tmp_path: Path) -> None:
+    library = tmp_path / "roms"
+    (library / "snes").mkdir(parents=True)
+    (library / "gba").mkdir()
+    keep = library / "snes" / "keep.sfc"
+    keep.write_bytes(b"a")
+    gone = library / "gba" / "gone.gba"
+    gone.write_bytes(b"b")
+
+    with ScanIndex(tmp_path / "index.db") as index:
+        first = index.rescan(library)
+        assert {rom.name for rom in first.added} == {"keep.sfc", "gone.gba"}
+
+        gone.unlink()
+        new = library / "snes" / "new.sfc"
+        new.write_bytes(b"c")
+        keep.write_bytes(b"longer")
+        _bump_mtime(keep)
+
+        second = index.rescan(library)
+        assert [rom.path for rom in second.added] == [new]
+        assert [rom.path for rom in second.removed] == [gone]
+        assert [rom.path for rom in second.modified] == [keep]
+        assert {rom.name for rom in index.roms(library)} == {"keep.sfc", "new.sfc"}
+
+
+def test_rescan_skips_unchanged_directories(tmp_path: Path) -> None:
+    library = tmp_path / "roms"
+    (library / "a" / "b").mkdir(parents=True)
+    (library / "a" / "b" / "game.nes").write_bytes(b"x")
+
+    with ScanIndex(tmp_path / "index.db") as index:
+        index.rescan(library)
+        changes = index.rescan(library)
+
+    assert not changes
+    assert changes.listed_dirs == 0
+    assert changes.skipped_dirs == 3
+
+
+def test_rescan_reports_removed_subtree(tmp_path: Path) -> None:
+    library = tmp_path / "roms"
+    (library / "psx" / "disc").mkdir(parents=True)
+    rom = library / "psx" / "disc" / "game.bin"
+    rom.write_bytes(b"x")
+    (library / "psx-extra").mkdir()
+    other = library / "psx-extra" / "other.bin"
+    other.write_bytes(b"y")
+
+    with ScanIndex(tmp_path / "index.db") as index:
+        index.rescan(library)
+        rom.unlink()
+        (library / "psx" / "disc").rmdir()
+        (library / "psx").rmdir()
+        changes = index.rescan(library)
+        assert [r.path for r in changes.removed] == [rom]
+        assert [r.path for r in index.roms()] == [other]
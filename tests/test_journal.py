@@ -0,0 +1,150 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from rom_library_organizer.cli import main
+from rom_library_organizer.journal import Journal, apply_journaled, read_journal, undo
+from rom_library_organizer.mover import Move, move_file
+
+
+def _moves(tmp_path: Path, count: int) -> list[Move]:
+    source = tmp_path / "in"
+    source.mkdir()
+    moves = []
+    for i in range(count):
+        (source / f"Game {i}.gba").write_bytes(b"x" * i)
+        moves.append(Move(source / f"Game {i}.gba", tmp_path / "out" / "gba" / f"Game {i}.gba"))
+    return moves
+
+
+def test_intents_are_committed_in_groups(tmp_path: Path) -> None:
+    moves = _moves(tmp_path, 10)
+    with Journal(tmp_path / "run.journal", batch_size=4) as journal:
+        results = list(apply_journaled(moves, journal, workers=2))
+        # Three batches of intents plus the final commit of done records.
+        assert journal.syncs == 4
+    assert all(result.ok for result in results)
+    records = [json.loads(line) for line in (tmp_path / "run.journal").read_text().splitlines()]
+    assert [r["id"] for r in records if "id" in r] == list(range(1, 11))
+    assert {e.state for e in read_journal(tmp_path / "run.journal")} == {"done"}
+
+
+def test_interrupted_run_resumes_and_undoes(tmp_path: Path) -> None:
+    moves = _moves(tmp_path, 4)
+    path = tmp_path / "run.journal"
+    with Journal(path) as journal:
+        journal.intend(moves[:3], "move")
+        # Crash after two moves, before their done records; the last line is torn.
+        move_file(moves[0].source, moves[0].destination)
+        move_file(moves[1].source, moves[1].destination)
+    with open(path, "a") as handle:
+        handle.write('{"done": 1, "meth')
+
+    with Journal(path) as journal:
+        assert [e.state for e in journal.entries] == ["pending"] * 3
+        results = list(apply_journaled(moves, journal))
+        assert journal.skipped == 2
+    assert [r.move for r in results] == moves[2:]
+    assert all(m.destination.exists() for m in moves)
+    assert [e.state for e in read_journal(path)] == ["done"] * 4
+
+    with Journal(path) as journal:
+        reverted = list(undo(journal))
+    assert len(reverted) == 4 and all(r.ok for r in reverted)
+    assert all(m.source.exists() and not m.destination.exists() for m in moves)
+    with Journal(path) as journal:
+        assert list(undo(journal)) == []
+
+
+def test_cli_journal_and_undo(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Metroid.nes").write_bytes(b"rom")
+    journal = tmp_path / "run.journal"
+    output = tmp_path / "out"
+
+    main([str(source), "batocera", "--output", str(output), "--journal", str(journal)])
+    assert not (source / "Metroid.nes").exists()
+    main([str(source), "batocera", "--output", str(output), "--journal", str(journal)])
+
+    main(["undo", str(journal)])
+    assert "Reverted 1 files (0 failed)." in capsys.readouterr().out
+    assert (source / "Metroid.nes").read_bytes() == b"rom"
+    assert not list(output.rglob("*.nes"))
+
+
+def test_cli_resume_in_copy_mode(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    for name in ("Metroid.nes", "Zelda.nes"):
+        (source / name).write_bytes(name.encode())
+    journal = tmp_path / "run.journal"
+    args = [str(source), "batocera", "--output", str(tmp_path / "out"), "--mode", "copy"]
+
+    main([*args, "--journal", str(journal)])
+    # The journal, not the file's timestamps, shows the copy as done.
+    os.utime(source / "Zelda.nes", (1, 1))
+    main([*args, "--journal", str(journal)])
+    output = capsys.readouterr().out
+    assert "collisions" not in output
+    assert "Skipped 2 files already placed by an earlier run." in output
+
+    with pytest.raises(SystemExit) as exc:
+        main([*args, "--journal", str(journal), "--normalize"])
+    assert exc.value.code == 2
+    assert "not allowed with argument" in capsys.readouterr().err
+
+
+def test_undo_leaves_files_the_run_did_not_place(tmp_path: Path) -> None:
+    source = tmp_path / "in" / "src.gb"
+    source.parent.mkdir()
+    source.write_bytes(b"rom")
+    existing = tmp_path / "out" / "dst.gb"
+    existing.parent.mkdir()
+    existing.write_bytes(b"own")
+    stat = source.stat()
+    os.utime(existing, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    path = tmp_path / "run.journal"
+
+    with Journal(path) as journal:
+        (result,) = apply_journaled([Move(source, existing)], journal, mode="copy")
+    assert isinstance(result.error, FileExistsError)
+    assert [e.state for e in read_journal(path)] == ["failed"]
+
+    with Journal(path) as journal:
+        assert list(undo(journal)) == []
+    assert existing.read_bytes() == b"own"
+
+
+def test_undo_does_not_remove_a_replaced_file(tmp_path: Path) -> None:
+    moves = _moves(tmp_path, 1)
+    path = tmp_path / "run.journal"
+    with Journal(path) as journal:
+        list(apply_journaled(moves, journal, mode="copy"))
+    # Another file now sits at the destination.
+    (tmp_path / "other.gba").write_bytes(b"")
+    os.replace(tmp_path / "other.gba", moves[0].destination)
+
+    with Journal(path) as journal:
+        (result,) = undo(journal)
+    assert not result.ok
+    assert moves[0].destination.exists()
+
+
+def test_resume_finishes_an_interrupted_cross_device_move(tmp_path: Path) -> None:
+    moves = _moves(tmp_path, 2)
+    path = tmp_path / "run.journal"
+    with Journal(path) as journal:
+        journal.intend(moves, "move")
+    # Crash after copying the second file, before unlinking its source.
+    moves[1].destination.parent.mkdir(parents=True)
+    moves[1].destination.write_bytes(moves[1].source.read_bytes())
+
+    with Journal(path) as journal:
+        results = list(apply_journaled(moves, journal))
+        assert journal.skipped == 1
+    assert [r.move for r in results] == moves[:1] and results[0].ok
+    assert not any(m.source.exists() for m in moves)
+    assert [e.state for e in read_journal(path)] == ["done", "done"]
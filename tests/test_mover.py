@@ -0,0 +1,209 @@
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from rom_library_organizer import mover
+from rom_library_organizer.cli import main
+from rom_library_organizer.mover import (
+    Move,
+    apply_moves,
+    copy_file,
+    link_file,
+    move_file,
+    plan_fanout,
+    plan_moves,
+)
+from rom_library_organizer.platforms.batocera import BatoceraPlatformOrganizer
+from rom_library_organizer.platforms.romm import ROMMPlatformOrganizer
+from rom_library_organizer.scanner import scan_roms
+
+
+def test_plan_and_apply_moves(tmp_path: Path) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Metroid.nes").write_bytes(b"rom")
+    (source / "notes.txt").write_text("skip")
+
+    moves = list(plan_moves(scan_roms(source), ROMMPlatformOrganizer(), tmp_path / "out"))
+    results = list(apply_moves(moves, workers=2))
+
+    dest = tmp_path / "out" / "Unknown Platform" / "Metroid" / "Metroid.nes"
+    assert [r.move.destination for r in results] == [dest]
+    assert results[0].ok and results[0].method == "rename"
+    assert dest.read_bytes() == b"rom"
+    assert not (source / "Metroid.nes").exists()
+
+
+def test_move_file_never_overwrites(tmp_path: Path) -> None:
+    src = tmp_path / "a.gba"
+    src.write_bytes(b"new")
+    dst = tmp_path / "b.gba"
+    dst.write_bytes(b"old")
+
+    with pytest.raises(FileExistsError):
+        move_file(src, dst)
+
+    results = list(apply_moves([Move(src, dst)]))
+    assert isinstance(results[0].error, FileExistsError)
+    assert dst.read_bytes() == b"old"
+
+
+def test_cross_device_move_copies_then_unlinks(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "disc.iso"
+    data = os.urandom(3 * mover.COPY_CHUNK_SIZE + 17)
+    src.write_bytes(data)
+    os.utime(src, (1_000_000, 1_000_000))
+    dst = tmp_path / "sd" / "disc.iso"
+
+    rename_noreplace = mover.rename_noreplace
+
+    def exdev(a, b):
+        if Path(a) == src:
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        rename_noreplace(a, b)
+
+    monkeypatch.setattr(mover, "rename_noreplace", exdev)
+    method = move_file(src, dst)
+
+    assert method in {"copy_file_range", "sendfile", "copy"}
+    assert dst.read_bytes() == data
+    assert dst.stat().st_mtime == 1_000_000
+    assert not src.exists()
+    assert list(dst.parent.iterdir()) == [dst]
+
+
+def test_concurrent_moves_to_one_destination_lose_nothing(tmp_path: Path) -> None:
+    moves = []
+    for mode in ("move", "copy"):
+        for i in range(200):
+            src = tmp_path / mode / f"{i}.gb"
+            src.parent.mkdir(exist_ok=True)
+            src.write_bytes(str(i).encode() * 1000)
+            moves.append(Move(src, tmp_path / "out" / mode / f"{i % 2}.gb"))
+
+    for mode in ("move", "copy"):
+        selected = [m for m in moves if m.source.parent.name == mode]
+        results = list(apply_moves(selected, mode=mode, workers=32))
+        placed = [r for r in results if r.ok]
+        assert len(placed) == 2
+        assert all(isinstance(r.error, FileExistsError) for r in results if not r.ok)
+        for result in placed:
+            expected = result.move.source.stem.encode() * 1000
+            assert result.move.destination.read_bytes() == expected
+        assert sorted(p.name for p in (tmp_path / "out" / mode).iterdir()) == ["0.gb", "1.gb"]
+    # Every source that was not placed is still there.
+    assert len(list((tmp_path / "move").iterdir())) == 198
+
+
+def test_copy_file_chunked_fallback(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delattr(mover.os, "copy_file_range", raising=False)
+    monkeypatch.delattr(mover.os, "sendfile", raising=False)
+    src = tmp_path / "game.n64"
+    src.write_bytes(b"x" * (mover.COPY_CHUNK_SIZE + 5))
+
+    assert copy_file(src, tmp_path / "copy.n64") == "copy"
+    assert (tmp_path / "copy.n64").read_bytes() == src.read_bytes()
+
+
+def test_cli_output_moves_files(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Tetris.gb").write_bytes(b"rom")
+
+    main([str(source), "knulli", "--output", str(tmp_path / "out")])
+
+    assert (tmp_path / "out" / "roms" / "unknown" / "Tetris.gb").exists()
+    assert "Placed 1 files (0 failed)." in capsys.readouterr().out
+
+
+def test_fanout_hardlinks_every_layout_from_one_scan(tmp_path: Path) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    rom = source / "Zelda.sfc"
+    rom.write_bytes(b"rom")
+    organizers = {"batocera": BatoceraPlatformOrganizer(), "romm": ROMMPlatformOrganizer()}
+
+    moves = list(plan_fanout(scan_roms(source), organizers, tmp_path / "out"))
+    results = list(apply_moves(moves, mode="hardlink"))
+
+    assert [r.method for r in results] == ["hardlink", "hardlink"]
+    batocera = tmp_path / "out" / "batocera" / "unknown" / "Zelda.sfc"
+    romm = tmp_path / "out" / "romm" / "Unknown Platform" / "Zelda" / "Zelda.sfc"
+    assert batocera.stat().st_ino == romm.stat().st_ino == rom.stat().st_ino
+    assert rom.exists()
+
+
+def test_link_file_falls_back_to_copy(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "game.gba"
+    src.write_bytes(b"data")
+
+    def no_links(a, b):
+        raise OSError(errno.EPERM, "Operation not permitted")
+
+    monkeypatch.setattr(mover.os, "link", no_links)
+    method = link_file(src, tmp_path / "sd" / "game.gba")
+
+    assert method in {"reflink", "copy_file_range", "sendfile", "copy"}
+    assert (tmp_path / "sd" / "game.gba").read_bytes() == b"data"
+    assert (tmp_path / "sd" / "game.gba").stat().st_ino != src.stat().st_ino
+
+
+def test_cli_multiple_platforms_need_non_moving_mode(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Tetris.gb").write_bytes(b"rom")
+    out = tmp_path / "out"
+
+    main([str(source), "knulli", "nextui", "--output", str(out)])
+    assert "Multiple platforms need" in capsys.readouterr().out
+
+    main([str(source), "knulli", "nextui", "--output", str(out), "--mode", "copy"])
+    assert (out / "knulli" / "roms" / "unknown" / "Tetris.gb").exists()
+    assert (out / "nextui" / "Unknown Platform" / "Unknown Region" / "Tetris.gb").exists()
+    assert (source / "Tetris.gb").exists()
+
+
+def test_cli_detects_platform_from_header(tmp_path: Path) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Sonic.bin").write_bytes(bytes(0x100) + b"SEGA GENESIS" + bytes(0x100))
+    out = tmp_path / "out"
+
+    main([str(source), "batocera", "--output", str(out), "--mode", "copy", "--detect"])
+    main([str(source), "romm", "--output", str(tmp_path / "raw")])
+
+    assert (out / "megadrive" / "Sonic.bin").exists()
+    assert (tmp_path / "raw" / "Unknown Platform" / "Sonic" / "Sonic.bin").exists()
+
+
+def test_short_kernel_copy_is_completed_or_fails(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "game.gba"
+    data = os.urandom(100_000)
+    src.write_bytes(data)
+    real = os.copy_file_range
+
+    def short(source, destination, count):
+        # Stop after the first 4 KiB as if the kernel copy hit end of file.
+        if os.lseek(source, 0, os.SEEK_CUR) >= 4096:
+            return 0
+        return real(source, destination, min(count, 4096))
+
+    monkeypatch.setattr(mover.os, "copy_file_range", short, raising=False)
+    assert copy_file(src, tmp_path / "done.gba") == "copy"
+    assert (tmp_path / "done.gba").read_bytes() == data
+
+    # The source shrinks between stat and copy: the move must fail and keep it.
+    monkeypatch.setattr(mover.os, "copy_file_range", lambda s, d, n: 0, raising=False)
+    claimed = os.stat_result((0,) * 6 + (10**6,) + (0,) * 3)
+    monkeypatch.setattr(mover.os, "fstat", lambda fd: claimed)
+    monkeypatch.setattr(mover, "rename_noreplace", _exdev)
+    with pytest.raises(OSError, match="Short copy"):
+        move_file(src, tmp_path / "sd" / "game.gba")
+    assert src.read_bytes() == data
+    assert not (tmp_path / "sd" / "game.gba").exists()
+
+
+def _exdev(a, b):
+    raise OSError(errno.EXDEV, "Invalid cross-device link")
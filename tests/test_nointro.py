@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from rom_library_organizer.nointro import ParsedName, parse_name, parse_roms
+from rom_library_organizer.platforms.batocera import BatoceraPlatformOrganizer
+from rom_library_organizer.platforms.nextui import NextUIPlatformOrganizer
+from rom_library_organizer.scanner import scan_roms
+
+
+def test_parse_name_extracts_tags() -> None:
+    parsed = parse_name("Game (USA, Europe) (En,Fr,De) (Disc 2) (Rev A) (Beta) [!]")
+    assert parsed == ParsedName(
+        title="Game",
+        regions=("USA", "Europe"),
+        languages=("En", "Fr", "De"),
+        disc="2",
+        revision="A",
+        flags=("Beta", "!"),
+    )
+    assert parsed.region == "USA, Europe"
+    assert parse_name("Final Fantasy VII (Japan) (Disc 1 of 3)").disc == "1"
+    assert parse_name("Tetris") == ParsedName("Tetris")
+    assert parse_name("(Unl)").title == "(Unl)"
+
+
+def test_parse_name_is_memoised() -> None:
+    parse_name.cache_clear()
+    for _ in range(3):
+        parse_name("Sonic the Hedgehog (World) (Rev 1)")
+    info = parse_name.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+
+def test_scan_metadata_uses_parsed_fields(tmp_path: Path) -> None:
+    (tmp_path / "Metroid Prime (USA) (Disc 2) [!].iso").write_bytes(b"x")
+    (rom, parsed), = parse_roms(scan_roms(tmp_path))
+    assert parsed.title == "Metroid Prime"
+
+    metadata = rom.metadata()
+    assert (metadata["title"], metadata["region"], metadata["disc"]) == ("Metroid Prime", "USA", "2")
+    metadata["platform"] = "GameCube"
+    expected = "GameCube/USA/Metroid Prime [!] - Disc 2.iso"
+    assert NextUIPlatformOrganizer().rename(metadata) == expected
+
+
+def test_revisions_and_flags_stay_in_the_name(tmp_path: Path) -> None:
+    for name in ("Zelda (USA)", "Zelda (USA) (Rev 1)", "Zelda (USA) (Beta)", "Zelda (Japan) [b]"):
+        (tmp_path / f"{name}.sfc").write_bytes(b"x")
+    organizer = BatoceraPlatformOrganizer()
+    renamed = sorted(organizer.rename(rom.metadata()) for rom in scan_roms(tmp_path))
+    assert renamed == [
+        "unknown/Zelda (Beta) (USA).sfc",
+        "unknown/Zelda (Rev 1) (USA).sfc",
+        "unknown/Zelda (USA).sfc",
+        "unknown/Zelda [b] (Japan).sfc",
+    ]
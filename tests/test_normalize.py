@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from rom_library_organizer import normalize
+from rom_library_organizer.cli import main
+from rom_library_organizer.mover import Move
+from rom_library_organizer.normalize import inspect, normalize_file, normalize_moves
+
+Z64 = bytes([0x80, 0x37, 0x12, 0x40]) + bytes(range(256)) * 16 + b"\x01\x02\x03"
+
+
+def _v64(data: bytes) -> bytes:
+    return b"".join(data[i : i + 2][::-1] for i in range(0, len(data), 2))
+
+
+def _n64(data: bytes) -> bytes:
+    return b"".join(data[i : i + 4][::-1] for i in range(0, len(data), 4))
+
+
+def test_n64_orders_and_smc_header(tmp_path: Path, monkeypatch) -> None:
+    # Small chunks exercise the boundaries between reads.
+    monkeypatch.setattr(normalize, "CHUNK_SIZE", 64)
+    aligned = Z64[:-3]
+    for name, data in [("a.v64", _v64(aligned)), ("b.n64", _n64(aligned))]:
+        (tmp_path / name).write_bytes(data)
+        result = normalize_file(tmp_path / name, tmp_path / "out.z64", replace=True)
+        assert result is not None and result.extension == ".z64"
+        assert (tmp_path / "out.z64").read_bytes() == aligned
+
+    # A truncated final word is kept as it is.
+    (tmp_path / "odd.n64").write_bytes(_n64(aligned) + b"\x01\x02\x03")
+    normalize_file(tmp_path / "odd.n64", tmp_path / "odd.z64")
+    assert (tmp_path / "odd.z64").read_bytes() == Z64
+
+    (tmp_path / "game.z64").write_bytes(Z64)
+    assert inspect(tmp_path / "game.z64") is None
+
+    rom = bytes(range(256)) * 8
+    (tmp_path / "Zelda.smc").write_bytes(b"\0" * 512 + rom)
+    (tmp_path / "Clean.smc").write_bytes(rom)
+    assert inspect(tmp_path / "Clean.smc") is None
+    normalize_file(tmp_path / "Zelda.smc", tmp_path / "Zelda.sfc")
+    assert (tmp_path / "Zelda.sfc").read_bytes() == rom
+
+
+def test_normalize_moves_in_process_pool(tmp_path: Path) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Mario.v64").write_bytes(_v64(Z64[:-3]))
+    (source / "Kart.n64").write_bytes(Z64[:-3])
+    (source / "Tetris.gb").write_bytes(b"gb")
+    out = tmp_path / "out"
+    moves = [Move(path, out / path.name) for path in sorted(source.iterdir())]
+
+    results = list(normalize_moves(moves, mode="copy", processes=1))
+    methods = {r.move.destination.name: r.method for r in results}
+    assert all(r.ok for r in results)
+    assert methods["Mario.z64"] == "n64-byteswap"
+    assert methods["Kart.z64"] in ("copy_file_range", "sendfile", "copy")
+    assert methods["Tetris.gb"] is not None
+    assert (out / "Mario.z64").read_bytes() == Z64[:-3]
+    assert (source / "Mario.v64").exists()
+
+
+def test_cli_normalize(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Zelda (USA).smc").write_bytes(b"\0" * 512 + b"x" * 1024)
+    output = tmp_path / "out"
+
+    main([str(source), "batocera", "--output", str(output), "--normalize", "--no-detect"])
+    placed = list(output.rglob("*.sfc"))
+    assert [p.name for p in placed] == ["Zelda (USA).sfc"]
+    assert placed[0].read_bytes() == b"x" * 1024
+    assert not (source / "Zelda (USA).smc").exists()
+
+    # The normalized name is checked for collisions before anything is placed.
+    (source / "Mario (USA).v64").write_bytes(_v64(Z64[:-3]))
+    (source / "Mario (USA).z64").write_bytes(Z64[:-3])
+    args = [str(source), "batocera", "--output", str(output), "--normalize", "--no-detect"]
+    main(args)
+    assert "1 destination collisions; nothing was placed." in capsys.readouterr().out
+    assert len(list(source.iterdir())) == 2
+
+    main([*args, "--on-collision", "suffix"])
+    placed = sorted(p.name for p in output.rglob("Mario*"))
+    assert placed == ["Mario (USA) (2).z64", "Mario (USA).z64"]
+    assert all(p.read_bytes() == Z64[:-3] for p in output.rglob("Mario*"))
@@ -0,0 +1,137 @@
+import json
+import tracemalloc
+from itertools import islice
+from pathlib import Path
+
+import pytest
+
+from rom_library_organizer.cli import main
+from rom_library_organizer.collisions import CollisionError
+from rom_library_organizer.platforms.batocera import BatoceraPlatformOrganizer
+from rom_library_organizer.plan import PlanReader, write_plan
+from rom_library_organizer.scanner import RomInfo, scan_roms
+
+
+def _library(root: Path, count: int = 5) -> None:
+    (root / "gba").mkdir(parents=True)
+    for i in range(count):
+        (root / "gba" / f"Game {i} (USA).gba").write_bytes(b"x" * (i + 1))
+
+
+def test_plan_roundtrip_streams_from_any_offset(tmp_path: Path) -> None:
+    source = tmp_path / "nas"
+    _library(source)
+    plan = tmp_path / "library.plan"
+    organizers = {"batocera": BatoceraPlatformOrganizer()}
+    roms = scan_roms(source, ordered=True)
+    assert write_plan(plan, roms, organizers, source, batch_size=2) == 5
+
+    lines = plan.read_text().splitlines()
+    assert json.loads(lines[0])["root"] == str(source)
+    assert json.loads(lines[1])["source"] == str(Path("gba", "Game 0 (USA).gba"))
+
+    reader = PlanReader(plan)
+    assert reader.platforms == ["batocera"]
+    entries = list(reader.entries())
+    assert [e.rom.size for e in entries] == [1, 2, 3, 4, 5]
+    assert entries[0].rom.path == source / "gba" / "Game 0 (USA).gba"
+
+    mounted = tmp_path / "mnt"
+    moves = list(reader.moves(tmp_path / "out", start=3, source_root=mounted))
+    assert [m.source for m in moves] == [
+        mounted / "gba" / "Game 3 (USA).gba",
+        mounted / "gba" / "Game 4 (USA).gba",
+    ]
+    assert all(m.destination.is_relative_to(tmp_path / "out") for m in moves)
+
+
+def test_colliding_plan_is_not_written(tmp_path: Path) -> None:
+    source = tmp_path / "nas"
+    (source / "a").mkdir(parents=True)
+    (source / "b").mkdir()
+    (source / "a" / "Tetris.gb").write_bytes(b"a")
+    (source / "b" / "TETRIS.gb").write_bytes(b"b")
+    plan = tmp_path / "library.plan"
+    organizers = {"batocera": BatoceraPlatformOrganizer()}
+
+    with pytest.raises(CollisionError):
+        write_plan(plan, scan_roms(source, ordered=True), organizers, source)
+    assert list(tmp_path.iterdir()) == [source]
+
+    count = write_plan(
+        plan, scan_roms(source, ordered=True), organizers, source, on_collision="suffix"
+    )
+    assert count == 2
+    names = [Path(m.destination).name for m in PlanReader(plan).moves(tmp_path / "out")]
+    assert names == ["Tetris.gb", "TETRIS (2).gb"]
+
+
+def test_cli_plan_then_apply(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "nas"
+    _library(source, count=3)
+    plan = tmp_path / "library.plan"
+    output = tmp_path / "out"
+
+    main(["plan", str(source), "batocera", "--output", str(plan), "--no-detect"])
+    assert "Planned 3 files" in capsys.readouterr().out
+
+    main(["apply", str(plan), "--output", str(output), "--mode", "copy", "--start", "1"])
+    assert "Placed 2 files (0 failed)." in capsys.readouterr().out
+    placed = sorted(p.name for p in output.rglob("*.gba"))
+    assert placed == ["Game 1 (USA).gba", "Game 2 (USA).gba"]
+    assert len(list(source.rglob("*.gba"))) == 3
+
+
+def test_plan_resolves_collisions_like_organizing(tmp_path: Path) -> None:
+    source = tmp_path / "nas"
+    (source / "a").mkdir(parents=True)
+    (source / "b").mkdir()
+    (source / "a" / "Tetris.gb").write_bytes(b"a")
+    (source / "b" / "TETRIS.gb").write_bytes(b"b")
+    plan = tmp_path / "library.plan"
+    organizers = {"batocera": BatoceraPlatformOrganizer()}
+
+    # The smallest source path keeps the name whatever the scan order.
+    roms = sorted(scan_roms(source), key=lambda rom: str(rom.path), reverse=True)
+    assert write_plan(plan, roms, organizers, source, on_collision="suffix") == 2
+    moves = {m.source.name: m.destination.name for m in PlanReader(plan).moves(tmp_path / "out")}
+    assert moves == {"Tetris.gb": "Tetris.gb", "TETRIS.gb": "TETRIS (2).gb"}
+
+    assert write_plan(plan, roms, organizers, source, on_collision="skip") == 1
+    assert [entry.rom.name for entry in PlanReader(plan).entries()] == ["Tetris.gb"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["library.plan", "nas"]
+
+
+def test_cli_directory_named_like_a_command(tmp_path: Path, monkeypatch, capsys) -> None:
+    _library(tmp_path / "plan", count=1)
+    monkeypatch.chdir(tmp_path)
+
+    main(["./plan", "batocera", "--output", "out", "--no-detect"])
+    assert len(list((tmp_path / "out").rglob("*.gba"))) == 1
+    with pytest.raises(SystemExit):
+        main(["plan", "batocera"])
+    assert "write ./plan" in capsys.readouterr().out
+
+
+def test_write_plan_memory_stays_flat(tmp_path: Path) -> None:
+    organizers = {"batocera": BatoceraPlatformOrganizer()}
+    plan = tmp_path / "library.plan"
+    names = [f"Game {i} (USA).gba" for i in range(8_000)]
+    # Built before tracing, so only what write_plan itself holds is measured.
+    roms = [
+        RomInfo(path=tmp_path / "nas" / name, extension=".gba", size=i, name=name)
+        for i, name in enumerate(names)
+    ]
+
+    def peak(count: int) -> int:
+        tracemalloc.start()
+        try:
+            write_plan(plan, islice(roms, count), organizers, tmp_path / "nas", batch_size=128)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # Fill the bounded name caches first.
+    write_plan(plan, roms, organizers, tmp_path / "nas")
+    small, large = peak(1_000), peak(8_000)
+    assert large < small * 1.25
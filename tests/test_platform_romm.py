@@ -32,3 +32,13 @@ def test_rename_and_place(tmp_path: Path) -> None:
     assert dest.name == "Legend of Zelda Ocarina of Time (USA).z64"
     assert dest.parent.name == "Legend of Zelda Ocarina of Time (USA)"
     assert dest.parent.parent.name == "Nintendo 64"
+
+
+def test_rename_many_matches_rename() -> None:
+    organizer = ROMMPlatformOrganizer()
+    items = [
+        {"platform": "SNES", "name": f"Game {i}", "region": "USA", "extension": ".sfc"}
+        for i in range(3)
+    ]
+    assert organizer.rename_many(items) == [organizer.rename(item) for item in items]
+    assert organizer.rename_many(iter(items))[0] == "SNES/Game 0 (USA)/Game 0 (USA).sfc"
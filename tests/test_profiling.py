@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+from rom_library_organizer import profiling
+from rom_library_organizer.cli import main
+from rom_library_organizer.profiling import Histogram
+
+
+def _library(root: Path) -> Path:
+    for sub in ("a", "b"):
+        (root / sub).mkdir(parents=True)
+        for i in range(3):
+            (root / sub / f"Game {sub}{i}.gba").write_bytes(b"x" * 100)
+    (root / "readme.txt").write_text("not a rom")
+    return root
+
+
+def test_histogram_percentiles() -> None:
+    histogram = Histogram()
+    for _ in range(99):
+        histogram.record(0.000_010)
+    histogram.record(0.5)
+    assert histogram.percentile(0.5) == 16 / 1e6
+    assert 0.5 <= histogram.percentile(1.0) < 1.1
+    assert Histogram().percentile(0.5) == 0.0
+
+
+def test_cli_profile_and_trace(tmp_path: Path, capsys) -> None:
+    source = _library(tmp_path / "in")
+    trace = tmp_path / "trace.json"
+
+    out_dir = str(tmp_path / "out")
+    args = ["--output", out_dir, "--detect", "--profile", "--trace", str(trace)]
+    main([str(source), "batocera", *args])
+
+    assert profiling.active is None
+    out = capsys.readouterr().out
+    lines = {line.split()[0]: line for line in out.splitlines() if line}
+    assert "scandir=3" in lines["scan"] and "stat=6" in lines["scan"]
+    assert lines["rename"].split()[3] == "6"
+    assert "rename=6" in lines["apply"]
+    assert lines["detect"].split()[3] == "6"
+
+    events = json.loads(trace.read_text())["traceEvents"]
+    names = [event["name"] for event in events]
+    assert names.count("scan") == 3 and names.count("apply") == 6
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+
+def test_profiling_is_off_by_default(tmp_path: Path) -> None:
+    source = _library(tmp_path / "in")
+    assert profiling.active is None
+    main([str(source), "batocera", "--output", str(tmp_path / "out")])
+    assert profiling.active is None
+    assert len(list((tmp_path / "out").rglob("*.gba"))) == 6
@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from rom_library_organizer import cli, collisions, filters, mover, registry as registry_module
+from rom_library_organizer.platforms.batocera import BatoceraPlatformOrganizer
+from rom_library_organizer.registry import PlatformRegistry, UnknownPlatformError
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+
+def test_load_builtin_platform(tmp_path: Path) -> None:
+    registry = PlatformRegistry(tmp_path / "platforms.json")
+
+    assert registry.load("batocera") is BatoceraPlatformOrganizer
+    assert {"batocera", "knulli", "nextui", "romm"} <= set(registry.names())
+    with pytest.raises(UnknownPlatformError):
+        registry.load("does-not-exist")
+
+
+def test_manifest_caches_entry_point_discovery(tmp_path: Path, monkeypatch) -> None:
+    manifest = tmp_path / "platforms.json"
+    calls = []
+
+    def discover() -> dict[str, str]:
+        calls.append(1)
+        return {"extra": "rom_library_organizer.platforms.romm:ROMMPlatformOrganizer"}
+
+    monkeypatch.setattr(registry_module, "_discover_entry_points", discover)
+    assert "extra" in PlatformRegistry(manifest).names()
+    assert "extra" in PlatformRegistry(manifest).names()
+    assert len(calls) == 1
+    assert json.loads(manifest.read_text())["platforms"] == discover()
+
+
+def test_cli_modes_match_mover() -> None:
+    assert cli.MODES == mover.MODES
+    assert cli.COLLISION_POLICIES == collisions.POLICIES
+    assert cli.FILTER_PRESETS == tuple(filters.PRESETS)
+
+
+def test_list_platforms_imports_no_organizer(tmp_path: Path) -> None:
+    code = (
+        "import sys\n"
+        "from rom_library_organizer.cli import main\n"
+        "main(['--list-platforms'])\n"
+        "loaded = [m for m in sys.modules if m.startswith('rom_library_organizer.')]\n"
+        "print(sorted(loaded))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONPATH": SRC, "XDG_CACHE_HOME": str(tmp_path)},
+    )
+    lines = result.stdout.splitlines()
+    assert lines[:4] == ["batocera", "knulli", "nextui", "romm"]
+    assert lines[-1] == "['rom_library_organizer.cli', 'rom_library_organizer.registry']"
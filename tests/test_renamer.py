@@ -1,4 +1,4 @@
-from rom_library_organizer.renamer import sanitize_filename
+from rom_library_organizer.renamer import sanitize_component, sanitize_filename
 
 
 def test_sanitize_filename_removes_invalid_characters() -> None:
@@ -9,3 +9,9 @@ def test_sanitize_filename_removes_invalid_characters() -> None:
 def test_sanitize_filename_collapses_whitespace() -> None:
     original = "Foo   Bar\tBaz\n"
     assert sanitize_filename(original) == "Foo Bar Baz"
+
+
+def test_sanitize_component_matches_organizer_rules() -> None:
+    assert sanitize_component('Legend of Zelda: "Ocarina" <USA>') == "Legend of Zelda Ocarina USA"
+    assert sanitize_component("  a\\b/c  ") == "a b c"
+    assert sanitize_component.cache_info().maxsize is not None
@@ -18,3 +18,38 @@ def test_scan_roms_filters_and_reports(tmp_path: Path) -> None:
     assert info.name == "game.nes"
     # ensure unknown file is not included
     assert all(res.path != ignored for res in results)
+
+
+def _make_tree(root: Path) -> set[Path]:
+    expected = set()
+    for directory in ("a", "a/b", "c", "c/d/e"):
+        (root / directory).mkdir(parents=True, exist_ok=True)
+        for name in ("x.gba", "y.SFC", "z.txt"):
+            path = root / directory / name
+            path.write_bytes(b"data")
+            if not name.endswith(".txt"):
+                expected.add(path)
+    return expected
+
+
+def test_scan_roms_walks_subdirectories_with_pool(tmp_path: Path) -> None:
+    expected = _make_tree(tmp_path)
+
+    serial = {info.path for info in scan_roms(tmp_path, workers=1)}
+    pooled = {info.path for info in scan_roms(tmp_path, workers=4)}
+
+    assert serial == pooled == expected
+
+
+def test_scan_roms_ordered_is_deterministic(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    first = [info.path for info in scan_roms(tmp_path, workers=4, ordered=True)]
+    second = [info.path for info in scan_roms(tmp_path, workers=1, ordered=True)]
+
+    assert first == second
+    assert first[:2] == [tmp_path / "a" / "x.gba", tmp_path / "a" / "y.SFC"]
+
+
+def test_scan_roms_missing_root(tmp_path: Path) -> None:
+    assert list(scan_roms(tmp_path / "missing")) == []
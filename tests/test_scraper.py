@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from rom_library_organizer.cli import main
+from rom_library_organizer.scraper import DiskCache, HTTPClient, JSONProvider, Scraper
+
+GAMES = {
+    "tetris": {"name": "Tetris", "region": "World", "year": 1989},
+    "zelda": {"name": "The Legend of Zelda", "region": "USA", "platform": "NES"},
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.server.requests += 1
+        query = parse_qs(urlsplit(self.path).query)
+        name = query.get("name", [""])[0].lower()
+        if name == "flaky" and self.server.failures < 2:
+            self.server.failures += 1
+            self._send(503, b"busy", {"Retry-After": "0"})
+        elif name == "flaky":
+            self._send(200, json.dumps([{"name": "Flaky"}]).encode(), chunked=True)
+        elif name in GAMES:
+            self._send(200, json.dumps(GAMES[name]).encode())
+        else:
+            self._send(404, b"{}")
+
+    def _send(self, status: int, body: bytes, headers=None, chunked: bool = False) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(body), 4):
+                part = body[i : i + 4]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.requests = httpd.connections = httpd.failures = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _provider(server, **kwargs) -> JSONProvider:
+    port = server.server_address[1]
+    return JSONProvider(f"http://127.0.0.1:{port}/games?name={{title}}", **kwargs)
+
+
+def test_scraper_pools_connections_and_caches(server, tmp_path: Path) -> None:
+    items = [{"title": name, "extension": ".nes"} for name in ["tetris", "zelda", "missing"] * 10]
+    provider = _provider(server, rate=1000, burst=100)
+
+    with DiskCache(tmp_path / "cache.sqlite") as cache:
+        client = HTTPClient(connections_per_host=2)
+        with Scraper([provider], cache=cache, client=client, concurrency=8) as scraper:
+            results = scraper.enrich(items)
+            assert scraper.enrich(items[:3]) == results[:3]
+            client.close()
+
+    assert results[0] == {
+        "title": "tetris",
+        "name": "Tetris",
+        "region": "World",
+        "year": 1989,
+        "extension": ".nes",
+    }
+    assert results[1]["platform"] == "NES"
+    assert results[2] == {"title": "missing", "extension": ".nes"}
+    # Identical titles share a request and at most two sockets are opened.
+    assert server.requests == 3
+    assert server.connections <= 2
+
+    with DiskCache(tmp_path / "cache.sqlite") as cache:
+        with Scraper([provider], cache=cache) as scraper:
+            assert scraper.enrich(items) == results
+            assert scraper.requests == 0
+    assert server.requests == 3
+
+
+def test_scraper_retries_and_rate_limits(server) -> None:
+    provider = _provider(server, rate=20, burst=1)
+    with Scraper([provider], backoff=0) as scraper:
+        start = time.monotonic()
+        (result,) = scraper.enrich([{"title": "flaky"}])
+        elapsed = time.monotonic() - start
+    assert result == {"title": "flaky", "name": "Flaky"}
+    assert scraper.requests == 3 and scraper.failures == 0
+    # Three requests at 20 per second with no burst take at least 0.1 s.
+    assert elapsed >= 0.09
+
+
+def test_scraper_keeps_parsed_identity_unless_overriding(server) -> None:
+    item = {"name": "Zelda (Rev 1)", "title": "zelda", "region": "Europe"}
+    with Scraper([_provider(server, rate=1000, burst=10)]) as scraper:
+        (kept,) = scraper.enrich([item])
+    with Scraper([_provider(server, rate=1000, burst=10)], override=True) as scraper:
+        (replaced,) = scraper.enrich([item])
+
+    assert kept == {
+        **item,
+        "platform": "NES",
+        "scraped_name": "The Legend of Zelda",
+        "scraped_region": "USA",
+    }
+    assert replaced == {**item, "name": "The Legend of Zelda", "region": "USA", "platform": "NES"}
+
+
+def test_disk_cache_ttl_and_eviction(tmp_path: Path) -> None:
+    with DiskCache(tmp_path / "c.sqlite", max_bytes=100) as cache:
+        for i in range(5):
+            cache.put(f"k{i}", 200, bytes(30))
+            cache.get("k0")
+        # k0 is read after every insert, so the others are evicted first.
+        assert cache.get("k0") == (200, bytes(30))
+        assert cache.size <= 100 and len(cache) == 3
+
+    time.sleep(0.1)
+    with DiskCache(tmp_path / "c.sqlite", ttl=0.05) as cache:
+        assert cache.get("k0") is None
+        assert cache.size < 100
+
+
+def test_cli_scrape_fills_rename_metadata(server, tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "zelda.nes").write_bytes(b"rom")
+    url = f"http://127.0.0.1:{server.server_address[1]}/games?name={{title}}"
+
+    main([str(source), "nextui", "--output", str(tmp_path / "kept"), "--scrape", url])
+    (tmp_path / "kept" / "NES" / "USA" / "zelda.nes").rename(source / "zelda.nes")
+    out = tmp_path / "out"
+    main([str(source), "nextui", "--output", str(out), "--scrape", url, "--scrape-override"])
+
+    assert (out / "NES" / "USA" / "The Legend of Zelda.nes").exists()
+    assert (tmp_path / "cache" / "rom-library-organizer" / "scraper.sqlite").exists()
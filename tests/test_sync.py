@@ -0,0 +1,111 @@
+import os
+from pathlib import Path
+
+from rom_library_organizer.cli import main
+from rom_library_organizer.platforms.knulli import KnulliPlatformOrganizer
+from rom_library_organizer.scanner import scan_roms
+from rom_library_organizer.sync import MANIFEST_NAME, plan_layout, read_manifest, sync_devices
+
+
+def _library(root: Path) -> None:
+    root.mkdir()
+    for name in ("Metroid.nes", "Tetris.gb", "Zelda.sfc"):
+        (root / name).write_bytes(name.encode())
+
+
+def test_sync_copies_only_changes(tmp_path: Path) -> None:
+    library = tmp_path / "library"
+    _library(library)
+    cards = [tmp_path / "card1", tmp_path / "card2"]
+    for card in cards:
+        card.mkdir()
+    organizer = KnulliPlatformOrganizer()
+
+    reports = sync_devices(plan_layout(scan_roms(library), organizer), cards, per_device=1)
+    assert [(r.copied, r.deleted, r.unchanged) for r in reports] == [(3, 0, 0), (3, 0, 0)]
+    manifest = read_manifest(cards[0])
+    assert sorted(manifest) == [
+        "roms/unknown/Metroid.nes",
+        "roms/unknown/Tetris.gb",
+        "roms/unknown/Zelda.sfc",
+    ]
+    (cards[0] / "roms" / "unknown" / "Metroid.srm").write_bytes(b"save")
+
+    (library / "Tetris.gb").unlink()
+    (library / "Zelda.sfc").write_bytes(b"Zelda DX")
+    os.utime(library / "Zelda.sfc", ns=(1, 2))
+    (library / "Kirby.gb").write_bytes(b"Kirby")
+    layout = plan_layout(scan_roms(library), organizer)
+
+    dry = sync_devices(layout, cards[:1], dry_run=True)[0]
+    assert (dry.copied, dry.deleted, dry.unchanged) == (2, 1, 1)
+    assert (cards[0] / "roms" / "unknown" / "Tetris.gb").exists()
+
+    report = sync_devices(layout, cards[:1])[0]
+    assert (report.copied, report.deleted, report.unchanged) == (2, 1, 1)
+    assert report.bytes_copied == len(b"Zelda DX") + len(b"Kirby")
+    device = cards[0] / "roms" / "unknown"
+    assert not (device / "Tetris.gb").exists()
+    assert (device / "Zelda.sfc").read_bytes() == b"Zelda DX"
+    # Files the sync did not place are left alone.
+    assert (device / "Metroid.srm").read_bytes() == b"save"
+    assert read_manifest(cards[0])["roms/unknown/Zelda.sfc"].mtime_ns == 2
+
+
+def test_hash_skips_touched_files(tmp_path: Path) -> None:
+    library = tmp_path / "library"
+    _library(library)
+    card = tmp_path / "card"
+    card.mkdir()
+    organizer = KnulliPlatformOrganizer()
+    sync_devices(plan_layout(scan_roms(library), organizer), [card], hashes=True)
+    assert read_manifest(card)["roms/unknown/Zelda.sfc"].sha1
+
+    os.utime(library / "Zelda.sfc", ns=(1, 2))
+    report = sync_devices(plan_layout(scan_roms(library), organizer), [card], hashes=True)[0]
+    assert (report.copied, report.unchanged) == (0, 3)
+    assert read_manifest(card)["roms/unknown/Zelda.sfc"].mtime_ns == 2
+
+
+def test_cli_sync(tmp_path: Path, capsys) -> None:
+    library = tmp_path / "library"
+    _library(library)
+    card = tmp_path / "card"
+    card.mkdir()
+
+    main(["sync", str(library), "knulli", "--device", str(card), "--no-detect"])
+    assert "Copied 3 files" in capsys.readouterr().out
+    main(["sync", str(library), "knulli", "--device", str(card), "--no-detect"])
+    assert "Copied 0 files (0 bytes), deleted 0, 3 unchanged" in capsys.readouterr().out
+    assert (card / MANIFEST_NAME).exists()
+
+
+def test_files_not_in_the_manifest_are_never_replaced(tmp_path: Path, capsys) -> None:
+    library = tmp_path / "library"
+    _library(library)
+    card = tmp_path / "card"
+    (card / "roms" / "unknown").mkdir(parents=True)
+    (card / "roms" / "unknown" / "Zelda.sfc").write_bytes(b"my own dump")
+
+    main(["sync", str(library), "knulli", "--device", str(card), "--no-detect"])
+    out = capsys.readouterr().out
+    assert "Not replacing" in out and "Copied 2 files" in out
+    assert (card / "roms" / "unknown" / "Zelda.sfc").read_bytes() == b"my own dump"
+    assert "roms/unknown/Zelda.sfc" not in read_manifest(card)
+
+
+def test_hash_each_source_once(tmp_path: Path, monkeypatch) -> None:
+    from rom_library_organizer import sync
+
+    library = tmp_path / "library"
+    _library(library)
+    cards = [tmp_path / f"card{i}" for i in range(3)]
+    for card in cards:
+        card.mkdir()
+    hashed = []
+    hash_file = sync.hash_file
+    monkeypatch.setattr(sync, "hash_file", lambda path: hashed.append(path) or hash_file(path))
+
+    sync_devices(plan_layout(scan_roms(library), KnulliPlatformOrganizer()), cards, hashes=True)
+    assert len(hashed) == 3
+    assert all(read_manifest(card)["roms/unknown/Zelda.sfc"].sha1 for card in cards)
@@ -0,0 +1,83 @@
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from rom_library_organizer.archives import ArchiveRomInfo
+from rom_library_organizer.scanner import RomInfo, scan_roms
+from rom_library_organizer.table import RomTable
+
+
+def _roms(count: int) -> list[RomInfo]:
+    roms = []
+    for i in range(count):
+        ext = sys.intern(".sfc" if i % 3 else ".gba")
+        name = f"Some Game Title {i} (USA){ext}"
+        roms.append(
+            RomInfo(
+                path=Path(f"/srv/roms/collection/set {i % 50}/{name}"),
+                extension=ext,
+                size=1 << 20 | i,
+                name=name,
+                platform="Game Boy Advance" if ext == ".gba" else None,
+            )
+        )
+    return roms
+
+
+def test_table_round_trips_scan_results(tmp_path: Path) -> None:
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "Pokémon.gb").write_bytes(b"x" * 10)
+    (tmp_path / "Zelda.sfc").write_bytes(b"x" * 20)
+    roms = list(scan_roms(tmp_path, ordered=True))
+
+    table = RomTable(roms)
+
+    assert list(table) == roms
+    assert table[-1] == roms[-1]
+    assert table.path(0) == roms[0].path
+    assert table.total_size() == 30
+    with pytest.raises(IndexError):
+        table[2]
+    with pytest.raises(TypeError):
+        table.append(ArchiveRomInfo(tmp_path / "a.zip", ".gb", 1, "a.gb", member="a.gb"))
+
+
+def test_filter_and_group_by_platform() -> None:
+    roms = _roms(300)
+    table = RomTable(roms)
+
+    gba = table.filter(extensions=[".gba"])
+    assert len(gba) == 100
+    assert gba.total_size() == sum(rom.size for rom in roms if rom.extension == ".gba")
+    large = table.filter(min_size=(1 << 20) + 250, max_size=(1 << 20) + 260)
+    assert [rom.name for rom in large][:2] == [roms[250].name, roms[251].name]
+    assert len(table.filter(lambda rom: rom.name.startswith("Some Game Title 1"))) == 111
+
+    groups = table.group_by_platform()
+    assert {platform: len(group) for platform, group in groups.items()} == {
+        "Game Boy Advance": 100,
+        None: 200,
+    }
+    assert list(groups["Game Boy Advance"]) == [rom for rom in roms if rom.platform]
+
+
+def _allocated(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return value, size
+
+
+def test_table_uses_five_times_less_memory() -> None:
+    count = 10_000
+    roms, list_size = _allocated(lambda: _roms(count))
+    table, table_size = _allocated(lambda: RomTable(_roms(count)))
+    assert len(table) == len(roms) == count
+    assert list_size >= 5 * table_size
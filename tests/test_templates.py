@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+
+from rom_library_organizer.cli import main
+from rom_library_organizer.platforms.romm import ROMMPlatformOrganizer
+from rom_library_organizer.templates import Template, TemplateError, TemplatePlatformOrganizer
+
+ROMM = (
+    "{platform|default:Unknown Platform}/{name|default:Unknown Game}[ ({region})]/"
+    "{name|default:Unknown Game}[ ({region})]{extension|raw|default:}"
+)
+
+
+def test_render_fields_filters_and_optional_segments() -> None:
+    template = Template(
+        r"{platform|lower}/{name|initial}/{name}[ ({region})][ - Disc {disc}]{extension|raw}"
+    )
+    assert template.fields == {"platform", "name", "region", "disc", "extension"}
+    metadata = {"platform": "SNES", "name": "zelda: a/b", "region": "USA", "extension": ".sfc"}
+    assert template(metadata) == "snes/Z/zelda a b (USA).sfc"
+    assert template({"name": "1942", "disc": 2, "extension": ".cue"}) == (
+        "Unknown/#/1942 - Disc 2.cue"
+    )
+
+    # Nested segments, literal brackets and defaults.
+    nested = Template(r"x[ a[{b}][{c|upper}]]/\{{d|default:none}\}")
+    assert nested({"b": "1"}) == "x a1/{none}"
+    assert nested({}) == "x/{none}"
+
+    organizers = (ROMMPlatformOrganizer(), TemplatePlatformOrganizer(ROMM))
+    items = [
+        {"platform": "Super Nintendo", "name": "Zelda", "region": "USA", "extension": ".sfc"},
+        {"name": "Tetris?", "extension": ".gb"},
+        {},
+    ]
+    assert organizers[0].rename_many(items) == organizers[1].rename_many(items)
+
+
+def test_rendered_values_stay_below_the_root() -> None:
+    metadata = {"platform": "..", "name": ".", "extension": "/../../x"}
+    assert Template("{platform}/{name}{extension}")(metadata) == "_/_.. .. x"
+    rendered = Template("{platform}/{name}{extension|raw}")(metadata)
+    assert rendered == "_/_/_/_/x"
+    assert ".." not in Path(rendered).parts
+
+
+def test_literal_dots_around_missing_optional_segments() -> None:
+    assert Template("a/.[{x}]./b")({}) == "a/_/b"
+    assert Template("a/.[{x}]./b")({"x": "y"}) == "a/.y./b"
+    assert Template("[.{x}].")({}) == "_"
+    assert Template("{name}/.[{x}].")({"name": "n"}) == "n/_"
+
+
+@pytest.mark.parametrize(
+    "source, message",
+    [
+        ("{name", "Unclosed '{' at column 1"),
+        ("{name}]", "Unmatched ']' at column 7"),
+        ("[{name}", "Unclosed '[' at column 1"),
+        ("[ - {disc|default:1}]", "has no field"),
+        ("{name|shout}", "Unknown filter: shout"),
+        ("{name|default}", "takes an argument"),
+        ("{1st}", "Invalid field name"),
+        ("../{name}", "relative paths"),
+        ("{name|default:..}", "Invalid default"),
+    ],
+)
+def test_invalid_templates(source: str, message: str) -> None:
+    with pytest.raises(TemplateError, match=message.replace("[", r"\[").replace("{", r"\{")):
+        Template(source)
+
+
+def test_cli_template(tmp_path: Path, capsys) -> None:
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "Zelda (USA).sfc").write_bytes(b"rom")
+    out = tmp_path / "out"
+    main([str(source), "--template", "{name}[ ({region})]/{name}{extension}", "--output", str(out)])
+    assert (out / "Zelda (USA)" / "Zelda.sfc").read_bytes() == b"rom"
+
+    with pytest.raises(SystemExit):
+        main([str(source), "--template", "{name|shout}", "--output", str(out)])
+    assert "Unknown filter: shout" in capsys.readouterr().err
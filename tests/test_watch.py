@@ -0,0 +1,79 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from rom_library_organizer.filters import PathFilter
+from rom_library_organizer.watch import Watcher
+
+
+@pytest.mark.parametrize("backend", ["inotify", "poll"])
+def test_watcher_reports_settled_files(tmp_path: Path, backend: str) -> None:
+    (tmp_path / "existing.nes").write_bytes(b"old")
+    try:
+        watcher = Watcher(tmp_path, settle=0.2, poll_interval=0.05, backend=backend)
+    except OSError:
+        pytest.skip("inotify unavailable")
+
+    with watcher:
+        assert watcher.poll(timeout=0.3) == []
+
+        (tmp_path / "new").mkdir()
+        rom = tmp_path / "new" / "Metroid.nes"
+        with open(rom, "wb") as handle:
+            handle.write(b"partial")
+            handle.flush()
+            time.sleep(0.1)
+            # Still inside the settle window: nothing may be reported yet.
+            assert watcher.poll(timeout=0.05) == []
+            handle.write(b" rest")
+
+        ready = watcher.poll(timeout=3)
+
+    assert ready == [rom]
+
+
+def test_watcher_ignores_excluded_subtree(tmp_path: Path) -> None:
+    output = tmp_path / "out"
+    output.mkdir()
+    with Watcher(tmp_path, settle=0.1, poll_interval=0.05, backend="poll", exclude=[output]) as w:
+        (output / "placed.gba").write_bytes(b"x")
+        (tmp_path / "incoming.gba").write_bytes(b"y")
+        assert w.poll(timeout=2) == [tmp_path / "incoming.gba"]
+
+
+def test_poll_backend_does_not_list_filtered_directories(tmp_path: Path) -> None:
+    (tmp_path / "media").mkdir()
+    (tmp_path / "media" / "cover.gba").write_bytes(b"x")
+    path_filter = PathFilter(["media/"])
+    with Watcher(
+        tmp_path, settle=0.1, poll_interval=0.05, backend="poll", path_filter=path_filter
+    ) as watcher:
+        assert watcher._index is not None
+        assert list(watcher._index.roms()) == []
+        (tmp_path / "media" / "more.gba").write_bytes(b"x")
+        (tmp_path / "incoming.gba").write_bytes(b"y")
+        assert watcher.poll(timeout=2) == [tmp_path / "incoming.gba"]
+
+
+def test_inotify_forgets_directories_moved_away(tmp_path: Path) -> None:
+    root, outside = tmp_path / "in", tmp_path / "outside"
+    (root / "a" / "b").mkdir(parents=True)
+    outside.mkdir()
+    try:
+        watcher = Watcher(root, settle=0.1, backend="inotify")
+    except OSError:
+        pytest.skip("inotify unavailable")
+
+    with watcher:
+        assert watcher._inotify is not None
+        (root / "a").rename(root / "c")
+        assert watcher.poll(timeout=0.2) == []
+        watched = sorted(watcher._inotify._paths.values())
+        assert watched == [str(root), str(root / "c"), str(root / "c" / "b")]
+
+        (root / "c").rename(outside / "c")
+        (outside / "c" / "b" / "lost.gba").write_bytes(b"x")
+        (root / "kept.gba").write_bytes(b"y")
+        assert watcher.poll(timeout=2) == [root / "kept.gba"]
+        assert list(watcher._inotify._paths.values()) == [str(root)]